@@ -32,7 +32,7 @@ modules_to_reload = [
     "ffmpeg.ffmpeg_downloader",
     "ffmpeg.ffmpeg_manager",
     "ffmpeg.gpu_detector",
-    "ffmpeg.process_manager",
+    "ffmpeg.process_supervisor",
     "ffmpeg.verification_manager",
     "ffmpeg.video_analyzer",
     "database",
@@ -16,6 +16,8 @@ from channel_manager import ChannelManager
 from role_manager import RoleManager
 from settings_formatter import SettingsFormatter
 from validation_manager import ValidationManager
+from message_filter import MessageFilter
+from guild_settings import GuildSettings
 
 # except ImportError:
 # Fall back to absolute imports if relative imports fail
@@ -33,6 +35,8 @@ from validation_manager import ValidationManager
 # from videoarchiver.config.role_manager import RoleManager
 # from videoarchiver.config.settings_formatter import SettingsFormatter
 # from videoarchiver.config.validation_manager import ValidationManager
+# from videoarchiver.config.message_filter import MessageFilter
+# from videoarchiver.config.guild_settings import GuildSettings
 
 __all__ = [
     "ConfigurationError",
@@ -47,4 +51,6 @@ __all__ = [
     "RoleManager",
     "SettingsFormatter",
     "ValidationManager",
+    "MessageFilter",
+    "GuildSettings",
 ]
@@ -85,7 +85,7 @@ class ChannelManager:
         """
         try:
             settings = await self.config_manager.get_guild_settings(guild.id)
-            monitored_channel_ids = settings["monitored_channels"]
+            monitored_channel_ids = settings.channel_ids
 
             # If no channels are set to be monitored, return all text channels
             if not monitored_channel_ids:
@@ -99,7 +99,7 @@ class ChannelManager:
             channels: List[discord.TextChannel] = []
             invalid_channels: List[int] = []
 
-            for channel_id in monitored_channel_ids:
+            for channel_id in sorted(monitored_channel_ids):
                 channel = guild.get_channel(channel_id)
                 if channel and isinstance(channel, discord.TextChannel):
                     channels.append(channel)
@@ -0,0 +1,72 @@
+"""Module for immutable snapshots of guild settings"""
+
+import re
+from types import MappingProxyType
+from typing import Any, FrozenSet, Iterator, Mapping, Optional, Pattern
+
+
+class GuildSettings(Mapping[str, Any]):
+    """Read-only snapshot of one guild's settings
+
+    Behaves like the settings dict Red's Config returns, with list settings
+    stored as tuples so a snapshot can be shared between callers without
+    copying. Structures derived from the settings are built once per
+    snapshot instead of on every message.
+    """
+
+    __slots__ = ("guild_id", "_values", "channel_ids", "role_ids", "site_filter")
+
+    def __init__(self, guild_id: int, values: Mapping[str, Any]) -> None:
+        """Create a snapshot
+
+        Args:
+            guild_id: Discord guild ID
+            values: Guild settings as stored in Config
+        """
+        self.guild_id = guild_id
+        self._values = MappingProxyType(
+            {
+                key: tuple(value) if isinstance(value, list) else value
+                for key, value in values.items()
+            }
+        )
+        self.channel_ids: FrozenSet[int] = frozenset(
+            self._values.get("monitored_channels") or ()
+        )
+        self.role_ids: FrozenSet[int] = frozenset(
+            self._values.get("allowed_roles") or ()
+        )
+        self.site_filter: Optional[Pattern] = self.compile_site_filter(
+            self._values.get("enabled_sites") or ()
+        )
+
+    @staticmethod
+    def compile_site_filter(sites: Any) -> Optional[Pattern]:
+        """Compile enabled site identifiers into one domain pattern
+
+        Args:
+            sites: Site identifiers, each matched as a substring of the domain
+
+        Returns:
+            Optional[Pattern]: Pattern to search domains with, None for all sites
+        """
+        sites = [site.lower() for site in sites if site]
+        if not sites:
+            return None
+        return re.compile("|".join(re.escape(site) for site in sites))
+
+    def replace(self, **changes: Any) -> "GuildSettings":
+        """Create a new snapshot with some settings changed"""
+        return GuildSettings(self.guild_id, {**self._values, **changes})
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"GuildSettings({self.guild_id}, {dict(self._values)!r})"
@@ -0,0 +1,99 @@
+"""Module for the cheap pre-filter applied to every guild message"""
+
+import logging
+from typing import Dict, FrozenSet, Iterable, Set, TYPE_CHECKING
+
+import discord  # type: ignore
+
+if TYPE_CHECKING:
+    # try:
+    from guild_settings import GuildSettings
+
+    # except ImportError:
+    # from videoarchiver.config.guild_settings import GuildSettings
+
+logger = logging.getLogger("VideoArchiver")
+
+
+class MessageFilter:
+    """Rejects messages that can never be archived without touching config
+
+    Keeps the IDs of enabled guilds and each guild's monitored channels in
+    memory, refreshed by ConfigManager whenever those settings change, so
+    the common case is a few set lookups and a substring check. A guild
+    with no monitored channels is watched in every channel.
+    """
+
+    def __init__(self) -> None:
+        self._enabled: Set[int] = set()
+        self._channels: Dict[int, FrozenSet[int]] = {}
+        self.accepted = 0
+        self.rejected = 0
+
+    def update(self, guild_id: int, settings: "GuildSettings") -> None:
+        """Refresh one guild from a settings snapshot
+
+        Args:
+            guild_id: Discord guild ID
+            settings: Guild settings snapshot
+        """
+        if settings.get("enabled"):
+            self._enabled.add(guild_id)
+        else:
+            self._enabled.discard(guild_id)
+        self.set_channels(guild_id, settings.channel_ids)
+
+    def set_channels(self, guild_id: int, channel_ids: Iterable[int]) -> None:
+        """Set the monitored channels of a guild, empty for all channels"""
+        channels = frozenset(channel_ids)
+        if channels:
+            self._channels[guild_id] = channels
+        else:
+            self._channels.pop(guild_id, None)
+
+    def discard(self, guild_id: int) -> None:
+        """Forget a guild, e.g. after the bot leaves it"""
+        self._enabled.discard(guild_id)
+        self._channels.pop(guild_id, None)
+
+    def accepts(self, message: discord.Message) -> bool:
+        """Check whether a message could contain something to archive
+
+        Args:
+            message: Discord message
+
+        Returns:
+            bool: False if the message can be dropped without further work
+        """
+        guild = message.guild
+        if (
+            guild is None
+            or message.author.bot
+            or guild.id not in self._enabled
+            or not (message.attachments or "http" in message.content)
+        ):
+            self.rejected += 1
+            return False
+
+        channels = self._channels.get(guild.id)
+        if channels is not None:
+            channel = message.channel
+            # Threads are monitored along with their parent channel
+            if (
+                channel.id not in channels
+                and getattr(channel, "parent_id", None) not in channels
+            ):
+                self.rejected += 1
+                return False
+
+        self.accepted += 1
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get filter counters"""
+        return {
+            "enabled_guilds": len(self._enabled),
+            "filtered_guilds": len(self._channels),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+        }
@@ -36,19 +36,15 @@ class RoleManager:
             ConfigError: If role check fails
         """
         try:
-            allowed_roles = await self.config_manager.get_setting(
-                member.guild.id, "allowed_roles"
-            )
+            settings = await self.config_manager.get_guild_settings(member.guild.id)
+            allowed_role_set = settings.role_ids
 
             # If no roles are set, allow all users
-            if not allowed_roles:
+            if not allowed_role_set:
                 return True, None
 
             # Check user roles
-            user_roles = {role.id for role in member.roles}
-            allowed_role_set = set(allowed_roles)
-
-            if user_roles & allowed_role_set:  # Intersection
+            if any(role.id in allowed_role_set for role in member.roles):
                 return True, None
 
             # Get role names for error message
@@ -118,6 +118,8 @@ class SettingsFormatter:
                     f"**Format:** {settings['video_format']}",
                     f"**Max Quality:** {settings['video_quality']}p",
                     f"**Max File Size:** {settings['max_file_size']}MB",
+                    f"**Mono Audio Downmix:** {settings['allow_audio_downmix']}",
+                    f"**Parallel Encoding:** {settings['parallel_encoding']}",
                 ]
             ),
             inline=False,
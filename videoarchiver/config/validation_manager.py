@@ -128,6 +128,8 @@ class ValidationManager:
         elif setting in [
             "enabled",
             "delete_after_repost",
+            "allow_audio_downmix",
+            "parallel_encoding",
             "disable_update_check",
             "use_database",
         ]:
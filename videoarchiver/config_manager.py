@@ -2,7 +2,7 @@
 
 import logging
 import asyncio
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Callable, Optional, List, Union
 import discord  # type: ignore
 from redbot.core import Config  # type: ignore
 
@@ -12,6 +12,8 @@ from config.validation_manager import ValidationManager
 from config.settings_formatter import SettingsFormatter
 from config.channel_manager import ChannelManager
 from config.role_manager import RoleManager
+from config.message_filter import MessageFilter
+from config.guild_settings import GuildSettings
 from utils.exceptions import ConfigurationError as ConfigError
 
 # except ImportError:
@@ -20,6 +22,8 @@ from utils.exceptions import ConfigurationError as ConfigError
 # from videoarchiver.config.settings_formatter import SettingsFormatter
 # from videoarchiver.config.channel_manager import ChannelManager
 # from videoarchiver.config.role_manager import RoleManager
+# from videoarchiver.config.message_filter import MessageFilter
+# from videoarchiver.config.guild_settings import GuildSettings
 # from videoarchiver.utils.exceptions import ConfigurationError as ConfigError
 
 logger = logging.getLogger("VideoArchiver")
@@ -38,6 +42,8 @@ class ConfigManager:
         "video_format": "mp4",
         "video_quality": 1080,
         "max_file_size": 8,
+        "allow_audio_downmix": False,
+        "parallel_encoding": False,
         "delete_after_repost": True,
         "message_duration": 24,
         "message_template": "Video from {username} in #{channel}\nOriginal: {original_message}",
@@ -52,31 +58,99 @@ class ConfigManager:
         "use_database": False,
     }
 
+    # Per-channel state that is not part of the guild settings
+    default_channel = {
+        "backfill_cursor": None,
+    }
+
     def __init__(self, bot_config: Config):
         """Initialize configuration managers"""
         self.config = bot_config
         self.config.register_guild(**self.default_guild)
+        self.config.register_channel(**self.default_channel)
 
         # Initialize managers
         self.validation_manager = ValidationManager()
         self.settings_formatter = SettingsFormatter()
         self.channel_manager = ChannelManager(self)
         self.role_manager = RoleManager(self)
+        self.message_filter = MessageFilter()
 
         # Thread safety
         self._config_locks: Dict[int, asyncio.Lock] = {}
 
+        # Write-through settings cache, kept current by every write below
+        self._settings: Dict[int, GuildSettings] = {}
+        self._listeners: List[Callable[[int, GuildSettings], None]] = []
+        self.add_listener(self.message_filter.update)
+
     async def _get_guild_lock(self, guild_id: int) -> asyncio.Lock:
         """Get or create a lock for guild-specific config operations"""
         if guild_id not in self._config_locks:
             self._config_locks[guild_id] = asyncio.Lock()
         return self._config_locks[guild_id]
 
-    async def get_guild_settings(self, guild_id: int) -> Dict[str, Any]:
-        """Get all settings for a guild"""
+    def add_listener(self, listener: Callable[[int, GuildSettings], None]) -> None:
+        """Call a function with the guild ID and new snapshot on every change"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int, GuildSettings], None]) -> None:
+        """Stop notifying a listener added with add_listener"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _store(self, guild_id: int, settings: GuildSettings) -> GuildSettings:
+        """Cache a snapshot and notify listeners"""
+        self._settings[guild_id] = settings
+        for listener in self._listeners:
+            try:
+                listener(guild_id, settings)
+            except Exception as e:
+                logger.error(f"Settings listener failed for guild {guild_id}: {e}")
+        return settings
+
+    async def _load(self, guild_id: int) -> GuildSettings:
+        """Get the cached snapshot, reading Config on a miss; caller holds the lock"""
+        settings = self._settings.get(guild_id)
+        if settings is None:
+            values = await self.config.guild_from_id(guild_id).all()
+            settings = self._store(guild_id, GuildSettings(guild_id, values))
+        return settings
+
+    async def _write(self, guild_id: int, setting: str, value: Any) -> None:
+        """Write a setting through to Config and the cache; caller holds the lock"""
+        await self.config.guild_from_id(guild_id).set_raw(setting, value=value)
+        self._store(guild_id, (await self._load(guild_id)).replace(**{setting: value}))
+
+    async def preload_settings(self) -> None:
+        """Cache the settings of every guild, e.g. before handling events"""
+        try:
+            for guild_id, values in (await self.config.all_guilds()).items():
+                guild_id = int(guild_id)
+                self._store(guild_id, GuildSettings(guild_id, values))
+            logger.debug(f"Preloaded settings for {len(self._settings)} guilds")
+        except Exception as e:
+            logger.error(f"Failed to preload guild settings: {e}")
+            raise ConfigError(f"Failed to preload guild settings: {str(e)}")
+
+    def invalidate(self, guild_id: Optional[int] = None) -> None:
+        """Drop cached settings of one guild, or all guilds if None
+
+        Only needed when Config is changed outside ConfigManager.
+        """
+        if guild_id is None:
+            self._settings.clear()
+        else:
+            self._settings.pop(guild_id, None)
+
+    async def get_guild_settings(self, guild_id: int) -> GuildSettings:
+        """Get an immutable snapshot of all settings for a guild"""
+        settings = self._settings.get(guild_id)
+        if settings is not None:
+            return settings
         try:
             async with await self._get_guild_lock(guild_id):
-                return await self.config.guild_from_id(guild_id).all()
+                return await self._load(guild_id)
         except Exception as e:
             logger.error(f"Failed to get guild settings for {guild_id}: {e}")
             raise ConfigError(f"Failed to get guild settings: {str(e)}")
@@ -91,7 +165,7 @@ class ConfigManager:
             self.validation_manager.validate_setting(setting, value)
 
             async with await self._get_guild_lock(guild_id):
-                await self.config.guild_from_id(guild_id).set_raw(setting, value=value)
+                await self._write(guild_id, setting, value)
 
         except Exception as e:
             logger.error(
@@ -105,8 +179,7 @@ class ConfigManager:
             if setting not in self.default_guild:
                 raise ConfigError(f"Invalid setting: {setting}")
 
-            async with await self._get_guild_lock(guild_id):
-                return await self.config.guild_from_id(guild_id).get_raw(setting)
+            return (await self.get_guild_settings(guild_id))[setting]
 
         except Exception as e:
             logger.error(f"Failed to get setting {setting} for guild {guild_id}: {e}")
@@ -118,12 +191,13 @@ class ConfigManager:
             if setting not in self.default_guild:
                 raise ConfigError(f"Invalid setting: {setting}")
 
+            # Uses the unlocked helpers, the guild lock is not reentrant
             async with await self._get_guild_lock(guild_id):
-                current = await self.get_setting(guild_id, setting)
+                current = (await self._load(guild_id))[setting]
                 if not isinstance(current, bool):
                     raise ConfigError(f"Setting {setting} is not a boolean")
 
-                await self.update_setting(guild_id, setting, not current)
+                await self._write(guild_id, setting, not current)
                 return not current
 
         except Exception as e:
@@ -146,6 +220,10 @@ class ConfigManager:
                         raise ConfigError(f"Setting {setting} is not a list")
                     if value not in items:
                         items.append(value)
+                    updated = list(items)
+                self._store(
+                    guild_id, (await self._load(guild_id)).replace(**{setting: updated})
+                )
 
         except Exception as e:
             logger.error(f"Failed to add to list {setting} for guild {guild_id}: {e}")
@@ -165,6 +243,10 @@ class ConfigManager:
                         raise ConfigError(f"Setting {setting} is not a list")
                     if value in items:
                         items.remove(value)
+                    updated = list(items)
+                self._store(
+                    guild_id, (await self._load(guild_id)).replace(**{setting: updated})
+                )
 
         except Exception as e:
             logger.error(
@@ -181,6 +263,26 @@ class ConfigManager:
             logger.error(f"Failed to format settings embed for guild {guild.id}: {e}")
             raise ConfigError(f"Failed to format settings: {str(e)}")
 
+    async def get_backfill_cursor(self, channel_id: int) -> Optional[int]:
+        """Get the ID of the last message a backfill of a channel reached"""
+        try:
+            return await self.config.channel_from_id(channel_id).backfill_cursor()
+        except Exception as e:
+            logger.error(f"Failed to get backfill cursor for channel {channel_id}: {e}")
+            raise ConfigError(f"Failed to get backfill cursor: {str(e)}")
+
+    async def set_backfill_cursor(
+        self, channel_id: int, message_id: Optional[int]
+    ) -> None:
+        """Save how far a backfill of a channel got, None to start over"""
+        try:
+            await self.config.channel_from_id(channel_id).backfill_cursor.set(
+                message_id
+            )
+        except Exception as e:
+            logger.error(f"Failed to set backfill cursor for channel {channel_id}: {e}")
+            raise ConfigError(f"Failed to set backfill cursor: {str(e)}")
+
     # Channel management delegated to channel_manager
     async def get_channel(
         self, guild: discord.Guild, channel_type: str
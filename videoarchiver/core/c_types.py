@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 from enum import Enum, auto
-from typing import Any, Dict, Optional, Protocol, TypedDict
+from typing import Any, Dict, List, Optional, Protocol, TypedDict
 from datetime import datetime
 
 class ComponentState(Enum):
@@ -85,6 +85,18 @@ class IQueueManager(IComponent, Protocol):
         """Add item to queue"""
         ...
 
+    async def add_many(
+        self,
+        urls: List[str],
+        message_id: int,
+        channel_id: int,
+        guild_id: int,
+        author_id: int,
+        priority: int = 0,
+    ) -> List[bool]:
+        """Add several items from one message to queue"""
+        ...
+
     def get_queue_status(self, guild_id: int) -> Dict[str, Any]:
         """Get queue status"""
         ...
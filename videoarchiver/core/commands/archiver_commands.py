@@ -1,6 +1,7 @@
 """Module for core archiver commands"""
 
 import logging
+from datetime import datetime, timezone
 from enum import Enum, auto
 from typing import Optional, Any, Dict, TypedDict, Callable, Awaitable
 
@@ -10,6 +11,7 @@ from redbot.core import commands  # type: ignore
 from redbot.core.commands import Context, hybrid_group, guild_only, admin_or_permissions  # type: ignore
 
 from core.response_handler import handle_response, ResponseType
+from processor.status_display import StatusDisplay
 from utils.exceptions import CommandError, ErrorContext, ErrorSeverity
 
 logger = logging.getLogger("VideoArchiver")
@@ -306,11 +308,143 @@ def setup_archiver_commands(cog: Any) -> Callable:
                     ),
                 )
 
+    @archiver.command(name="backfill")
+    @guild_only()
+    @admin_or_permissions(administrator=True)
+    @app_commands.describe(
+        channel="The channel whose history to archive",
+        since="Only archive messages after this date (YYYY-MM-DD)",
+    )
+    async def backfill_channel(
+        ctx: Context, channel: discord.TextChannel, since: Optional[str] = None
+    ) -> None:
+        """Archive videos posted in a channel before it was monitored.
+
+        Resumes from where the last backfill of the channel stopped, unless
+        a start date is given.
+        """
+        async with CommandContext(ctx, CommandCategory.MANAGEMENT, "backfill_channel"):
+            try:
+                # Check if processor is ready
+                if not cog.processor:
+                    raise CommandError(
+                        "Video processor is not ready",
+                        context=ErrorContext(
+                            "ArchiverCommands",
+                            "backfill_channel",
+                            {"guild_id": ctx.guild.id},
+                            ErrorSeverity.MEDIUM,
+                        ),
+                    )
+
+                backfill = cog.processor.backfill
+                if backfill.is_running(channel.id):
+                    await ctx.send(
+                        embed=StatusDisplay.create_backfill_embed(
+                            backfill.progress[channel.id].to_dict()
+                        )
+                    )
+                    return
+
+                if not await cog.config_manager.get_setting(ctx.guild.id, "enabled"):
+                    await handle_response(
+                        ctx,
+                        "Video archiving is disabled in this server.",
+                        response_type=ResponseType.WARNING,
+                    )
+                    return
+
+                if not channel.permissions_for(ctx.guild.me).read_message_history:
+                    await handle_response(
+                        ctx,
+                        f"I don't have permission to read the history of {channel.mention}.",
+                        response_type=ResponseType.ERROR,
+                    )
+                    return
+
+                start_date = None
+                if since:
+                    try:
+                        start_date = datetime.strptime(since, "%Y-%m-%d").replace(
+                            tzinfo=timezone.utc
+                        )
+                    except ValueError:
+                        await handle_response(
+                            ctx,
+                            "Invalid date, use the format YYYY-MM-DD.",
+                            response_type=ResponseType.ERROR,
+                        )
+                        return
+
+                progress_message = await ctx.send(
+                    f"Starting backfill of {channel.mention}..."
+                )
+
+                async def report_progress(progress) -> None:
+                    await progress_message.edit(
+                        content=None,
+                        embed=StatusDisplay.create_backfill_embed(progress.to_dict()),
+                    )
+
+                await backfill.start(channel, start_date, report_progress)
+
+            except Exception as e:
+                error = f"Failed to start backfill: {str(e)}"
+                logger.error(error, exc_info=True)
+                raise CommandError(
+                    error,
+                    context=ErrorContext(
+                        "ArchiverCommands",
+                        "backfill_channel",
+                        {"guild_id": ctx.guild.id, "channel_id": channel.id},
+                        ErrorSeverity.MEDIUM,
+                    ),
+                )
+
+    @archiver.command(name="backfillstop")
+    @guild_only()
+    @admin_or_permissions(administrator=True)
+    @app_commands.describe(channel="The channel to stop backfilling")
+    async def stop_backfill(ctx: Context, channel: discord.TextChannel) -> None:
+        """Stop a running backfill. Running backfill again resumes it."""
+        async with CommandContext(ctx, CommandCategory.MANAGEMENT, "stop_backfill"):
+            try:
+                if not cog.processor or not await cog.processor.backfill.cancel(
+                    channel.id
+                ):
+                    await handle_response(
+                        ctx,
+                        f"No backfill is running in {channel.mention}.",
+                        response_type=ResponseType.WARNING,
+                    )
+                    return
+
+                await handle_response(
+                    ctx,
+                    f"Backfill of {channel.mention} stopped.",
+                    response_type=ResponseType.SUCCESS,
+                )
+
+            except Exception as e:
+                error = f"Failed to stop backfill: {str(e)}"
+                logger.error(error, exc_info=True)
+                raise CommandError(
+                    error,
+                    context=ErrorContext(
+                        "ArchiverCommands",
+                        "stop_backfill",
+                        {"guild_id": ctx.guild.id, "channel_id": channel.id},
+                        ErrorSeverity.MEDIUM,
+                    ),
+                )
+
     # Store commands in cog for access
     cog.archiver = archiver
     cog.enable_archiver = enable_archiver
     cog.disable_archiver = disable_archiver
     cog.show_queue = show_queue
     cog.show_status = show_status
+    cog.backfill_channel = backfill_channel
+    cog.stop_backfill = stop_backfill
 
     return archiver
@@ -615,6 +615,96 @@ def setup_settings_commands(cog: Any) -> Any:
                 ),
             )
 
+    @settings.command(name="setdownmix")
+    @guild_only()
+    @admin_or_permissions(administrator=True)
+    @app_commands.describe(enabled="Allow mono audio to fit oversized videos without re-encoding video")
+    async def set_audio_downmix(ctx: Context, enabled: bool) -> None:
+        """Allow oversized videos to be fit by downmixing their audio to mono."""
+        try:
+            # Check if config manager is ready
+            if not cog.config_manager:
+                raise CommandError(
+                    "Configuration system is not ready",
+                    context=ErrorContext(
+                        "SettingsCommands",
+                        "set_audio_downmix",
+                        {"guild_id": ctx.guild.id},
+                        ErrorSeverity.HIGH,
+                    ),
+                )
+
+            # Defer the response immediately for slash commands
+            if hasattr(ctx, "interaction") and ctx.interaction:
+                await ctx.defer()
+
+            await cog.config_manager.update_setting(
+                ctx.guild.id, "allow_audio_downmix", enabled
+            )
+            await handle_response(
+                ctx,
+                f"Mono audio downmix has been {'enabled' if enabled else 'disabled'}.",
+                response_type=ResponseType.SUCCESS,
+            )
+
+        except Exception as e:
+            error = f"Failed to set audio downmix: {str(e)}"
+            logger.error(error, exc_info=True)
+            raise CommandError(
+                error,
+                context=ErrorContext(
+                    "SettingsCommands",
+                    "set_audio_downmix",
+                    {"guild_id": ctx.guild.id, "enabled": enabled},
+                    ErrorSeverity.HIGH,
+                ),
+            )
+
+    @settings.command(name="setparallelencoding")
+    @guild_only()
+    @admin_or_permissions(administrator=True)
+    @app_commands.describe(enabled="Encode long videos as segments in parallel")
+    async def set_parallel_encoding(ctx: Context, enabled: bool) -> None:
+        """Encode long videos as parallel segments to use more CPU cores."""
+        try:
+            # Check if config manager is ready
+            if not cog.config_manager:
+                raise CommandError(
+                    "Configuration system is not ready",
+                    context=ErrorContext(
+                        "SettingsCommands",
+                        "set_parallel_encoding",
+                        {"guild_id": ctx.guild.id},
+                        ErrorSeverity.HIGH,
+                    ),
+                )
+
+            # Defer the response immediately for slash commands
+            if hasattr(ctx, "interaction") and ctx.interaction:
+                await ctx.defer()
+
+            await cog.config_manager.update_setting(
+                ctx.guild.id, "parallel_encoding", enabled
+            )
+            await handle_response(
+                ctx,
+                f"Parallel encoding has been {'enabled' if enabled else 'disabled'}.",
+                response_type=ResponseType.SUCCESS,
+            )
+
+        except Exception as e:
+            error = f"Failed to set parallel encoding: {str(e)}"
+            logger.error(error, exc_info=True)
+            raise CommandError(
+                error,
+                context=ErrorContext(
+                    "SettingsCommands",
+                    "set_parallel_encoding",
+                    {"guild_id": ctx.guild.id, "enabled": enabled},
+                    ErrorSeverity.HIGH,
+                ),
+            )
+
     @settings.command(name="setmessageduration")
     @guild_only()
     @admin_or_permissions(administrator=True)
@@ -791,6 +881,8 @@ def setup_settings_commands(cog: Any) -> Any:
     cog.set_video_format = set_video_format
     cog.set_video_quality = set_video_quality
     cog.set_max_file_size = set_max_file_size
+    cog.set_audio_downmix = set_audio_downmix
+    cog.set_parallel_encoding = set_parallel_encoding
     cog.set_message_duration = set_message_duration
     cog.set_message_template = set_message_template
     cog.set_concurrent_downloads = set_concurrent_downloads
@@ -5,7 +5,7 @@ import logging
 import traceback
 from datetime import datetime
 from enum import Enum, auto
-from typing import TYPE_CHECKING, Dict, Any, Optional, TypedDict, ClassVar, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, TypedDict, ClassVar, List, Set
 
 import discord  # type: ignore
 
@@ -17,6 +17,7 @@ from guild import initialize_guild_components, cleanup_guild_components
 from error_handler import ErrorManager
 from response_handler import response_manager
 from utils.exceptions import EventError, ErrorContext, ErrorSeverity
+from utils.ttl_cache import TTLCache
 
 # except ImportError:
 # Fall back to absolute imports if relative imports fail
@@ -26,6 +27,7 @@ from utils.exceptions import EventError, ErrorContext, ErrorSeverity
 # from videoarchiver.core.error_handler import ErrorManager
 # from videoarchiver.core.response_handler import response_manager
 # from videoarchiver.utils.exceptions import EventError, ErrorContext, ErrorSeverity
+# from videoarchiver.utils.ttl_cache import TTLCache
 
 if TYPE_CHECKING:
     # try:
@@ -222,31 +224,39 @@ class MessageEventHandler:
         """
         Handle new messages for video processing.
 
+        Messages are checked against the in-memory message filter first, so
+        the many messages without links or attachments, from disabled guilds
+        or from unmonitored channels cost no command parsing, settings lookup
+        or task.
+
         Args:
             message: Discord message to process
         """
+        if (
+            not self.cog.ready.is_set()
+            or not self.cog.config_manager.message_filter.accepts(message)
+        ):
+            return
+
         self.tracker.record_event(
             EventType.MESSAGE,
-            guild_id=message.guild.id if message.guild else None,
+            guild_id=message.guild.id,
             channel_id=message.channel.id,
             message_id=message.id,
             user_id=message.author.id,
         )
 
-        # Skip if not ready or if message is from DM/bot
-        if not self.cog.ready.is_set() or message.guild is None or message.author.bot:
-            return
-
         # Skip if message is a command
         ctx = await self.cog.bot.get_context(message)
         if ctx.valid:
             return
 
-        # Process message in background task
-        asyncio.create_task(self._process_message_background(message))
+        # Hand off to the message lanes; this only waits while the guild's
+        # lane is full, and discord.py already runs each listener as a task
+        await self._submit_message(message)
 
-    async def _process_message_background(self, message: discord.Message) -> None:
-        """Process message in background to avoid blocking"""
+    async def _submit_message(self, message: discord.Message) -> None:
+        """Queue message for processing in its guild's lane"""
         start_time = datetime.utcnow()
         try:
             await self.cog.processor.process_message(message)
@@ -281,9 +291,18 @@ class MessageEventHandler:
 class ReactionEventHandler:
     """Handles reaction-related events"""
 
+    REPLY_COOLDOWN: ClassVar[float] = 300.0  # Seconds between replies per message
+    MAX_RECENT_REPLIES: ClassVar[int] = 1000
+
     def __init__(self, cog: "VideoArchiver", tracker: EventTracker) -> None:
         self.cog = cog
         self.tracker = tracker
+        # Messages answered recently, so reaction spam gets a single reply
+        self.recent_replies: TTLCache[int, bool] = TTLCache(
+            self.MAX_RECENT_REPLIES, self.REPLY_COOLDOWN
+        )
+        # Messages with a reply being sent
+        self.pending_replies: Set[int] = set()
 
     async def handle_reaction_add(
         self, payload: discord.RawReactionActionEvent
@@ -294,6 +313,10 @@ class ReactionEventHandler:
         Args:
             payload: Reaction event payload
         """
+        # Only the archived reaction is handled, checked before any other work
+        if str(payload.emoji) != REACTIONS["archived"]:
+            return
+
         self.tracker.record_event(
             EventType.REACTION_ADD,
             guild_id=payload.guild_id,
@@ -304,6 +327,8 @@ class ReactionEventHandler:
 
         if payload.user_id == self.cog.bot.user.id:
             return
+        if payload.member is not None and payload.member.bot:
+            return
 
         try:
             await self._process_reaction(payload)
@@ -313,7 +338,7 @@ class ReactionEventHandler:
 
     async def _process_reaction(self, payload: discord.RawReactionActionEvent) -> None:
         """
-        Process a reaction event.
+        Process an archived reaction event.
 
         Args:
             payload: Reaction event payload
@@ -322,23 +347,21 @@ class ReactionEventHandler:
             EventError: If reaction processing fails
         """
         try:
-            # Get the channel and message
-            channel = self.cog.bot.get_channel(payload.channel_id)
-            if not channel:
+            # Only process if database is enabled
+            db = self.cog.db
+            if (
+                not db
+                or payload.message_id in self.recent_replies
+                or payload.message_id in self.pending_replies
+            ):
                 return
 
-            message = await channel.fetch_message(payload.message_id)
-            if not message:
+            channel = self.cog.bot.get_channel(payload.channel_id)
+            if not channel:
                 return
 
-            # Check if it's the archived reaction
-            if str(payload.emoji) == REACTIONS["archived"]:
-                # Only process if database is enabled
-                if self.cog.db:
-                    user = self.cog.bot.get_user(payload.user_id)
-                    asyncio.create_task(
-                        handle_archived_reaction(message, user, self.cog.db)
-                    )
+            self.pending_replies.add(payload.message_id)
+            asyncio.create_task(self._reply(channel, payload.message_id, db))
 
         except Exception as e:
             error = f"Failed to process reaction: {str(e)}"
@@ -357,6 +380,16 @@ class ReactionEventHandler:
                 ),
             )
 
+    async def _reply(
+        self, channel: discord.abc.Messageable, message_id: int, db: Any
+    ) -> None:
+        """Reply with archived videos, starting the cooldown only once sent"""
+        try:
+            if await handle_archived_reaction(channel, message_id, db):
+                self.recent_replies.set(message_id, True)
+        finally:
+            self.pending_replies.discard(message_id)
+
 
 class EventManager:
     """Manages Discord event handling"""
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, Dict, Any, Optional
 # try:
 # Try relative imports first
 from utils.download_core import DownloadCore
+from utils.download_cache import get_download_cache
 from utils.message_manager import MessageManager
 from utils.file_ops import cleanup_downloads
 from utils.exceptions import VideoArchiverError as ProcessingError
@@ -31,6 +32,7 @@ async def initialize_guild_components(cog: "VideoArchiver", guild_id: int) -> No
     """Initialize or update components for a guild with error handling"""
     try:
         settings = await cog.config_manager.get_guild_settings(guild_id)
+        cog.config_manager.message_filter.update(guild_id, settings)
 
         # Ensure download directory exists and is clean
         cog.download_path.mkdir(parents=True, exist_ok=True)
@@ -53,7 +55,13 @@ async def initialize_guild_components(cog: "VideoArchiver", guild_id: int) -> No
                 settings["max_file_size"],
                 settings["enabled_sites"] if settings["enabled_sites"] else None,
                 settings["concurrent_downloads"],
+                allow_audio_downmix=settings["allow_audio_downmix"],
+                parallel_encoding=settings["parallel_encoding"],
                 ffmpeg_mgr=cog.ffmpeg_mgr,  # Use shared FFmpeg manager
+                # Cache lives next to downloads so guild init cleanup leaves it alone
+                download_cache=get_download_cache(
+                    str(cog.download_path.parent / "cache")
+                ),
             ),
             "message_manager": MessageManager(
                 settings["message_duration"], settings["message_template"]
@@ -70,6 +78,7 @@ async def initialize_guild_components(cog: "VideoArchiver", guild_id: int) -> No
 async def cleanup_guild_components(cog: "VideoArchiver", guild_id: int) -> None:
     """Clean up components for a specific guild"""
     try:
+        cog.config_manager.message_filter.discard(guild_id)
         if guild_id in cog.components:
             # Clean up components
             components = cog.components[guild_id]
@@ -17,6 +17,7 @@ from utils.exceptions import (
     ComponentError,
     CleanupError,
 )
+from utils.extractor_matcher import extractor_matcher
 
 # except ImportError:
 # Fall back to absolute imports if relative imports fail
@@ -28,6 +29,7 @@ from utils.exceptions import (
 #     ComponentError,
 #     CleanupError,
 # )
+# from videoarchiver.utils.extractor_matcher import extractor_matcher
 
 logger = logging.getLogger("VideoArchiver")
 
@@ -318,6 +320,13 @@ class LifecycleManager:
             # Initialize components in sequence
             await self.cog.component_manager.initialize_components()
 
+            # Warm the settings cache, which also fills the message filter
+            await self.cog.config_manager.preload_settings()
+
+            # Index yt-dlp's URL patterns off the event loop before the first
+            # support check needs them
+            await extractor_matcher.build()
+
             # Set ready flag
             self.cog.ready.set()
             logger.info("VideoArchiver initialization completed successfully")
@@ -167,6 +167,20 @@ class Settings:
             max_value=100,
             error_message="Max file size must be between 1 and 100 MB",
         ),
+        "allow_audio_downmix": SettingDefinition(
+            name="allow_audio_downmix",
+            category=SettingCategory.VIDEO,
+            default_value=False,
+            description="Allow mono audio to bring oversized videos under the limit without re-encoding video",
+            data_type=bool,
+        ),
+        "parallel_encoding": SettingDefinition(
+            name="parallel_encoding",
+            category=SettingCategory.VIDEO,
+            default_value=False,
+            description="Encode long videos as segments in parallel to use more CPU cores",
+            data_type=bool,
+        ),
         "message_duration": SettingDefinition(
             name="message_duration",
             category=SettingCategory.MESSAGES,
@@ -2,7 +2,7 @@
 
 import logging
 import sqlite3
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Iterable, Set
 from datetime import datetime
 
 logger = logging.getLogger("DBQueryManager")
@@ -11,6 +11,9 @@ logger = logging.getLogger("DBQueryManager")
 class DatabaseQueryManager:
     """Manages database queries and operations"""
 
+    # Stays below SQLite's default limit of 999 parameters per statement
+    LOOKUP_CHUNK_SIZE = 500
+
     def __init__(self, connection_manager):
         self.connection_manager = connection_manager
 
@@ -110,6 +113,73 @@ class DatabaseQueryManager:
             logger.error(f"Error checking archived status: {e}")
             return False
 
+    async def filter_archived(self, urls: Iterable[str]) -> Set[str]:
+        """Get which of many URLs have already been archived"""
+        urls = list(dict.fromkeys(urls))
+        archived: Set[str] = set()
+        try:
+            with self.connection_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                for start in range(0, len(urls), self.LOOKUP_CHUNK_SIZE):
+                    chunk = urls[start : start + self.LOOKUP_CHUNK_SIZE]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor.execute(
+                        "SELECT original_url FROM archived_videos "
+                        f"WHERE original_url IN ({placeholders})",
+                        chunk,
+                    )
+                    archived.update(row[0] for row in cursor.fetchall())
+            return archived
+
+        except sqlite3.Error as e:
+            logger.error(f"Error checking archived status: {e}")
+            return archived
+
+    async def add_message_video(
+        self, message_id: int, original_url: str, channel_id: int, guild_id: int
+    ) -> bool:
+        """Record that a video was posted in a message"""
+        try:
+            with self.connection_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT OR IGNORE INTO message_videos
+                    (message_id, original_url, channel_id, guild_id)
+                    VALUES (?, ?, ?, ?)
+                """,
+                    (message_id, original_url, channel_id, guild_id),
+                )
+                conn.commit()
+                return True
+
+        except sqlite3.Error as e:
+            logger.error(f"Error indexing message video: {e}")
+            return False
+
+    async def get_message_videos(self, message_id: int) -> List[Dict[str, Any]]:
+        """Get the archived videos posted in a message"""
+        try:
+            with self.connection_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT av.original_url, av.discord_url
+                    FROM message_videos mv
+                    JOIN archived_videos av ON av.original_url = mv.original_url
+                    WHERE mv.message_id = ?
+                """,
+                    (message_id,),
+                )
+                return [
+                    {"original_url": row[0], "discord_url": row[1]}
+                    for row in cursor.fetchall()
+                ]
+
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving message videos: {e}")
+            return []
+
     async def get_guild_stats(self, guild_id: int) -> Dict[str, Any]:
         """Get archiving statistics for a guild"""
         try:
@@ -198,6 +268,12 @@ class DatabaseQueryManager:
                 )
 
                 deleted = cursor.rowcount
+                cursor.execute(
+                    """
+                    DELETE FROM message_videos
+                    WHERE original_url NOT IN (SELECT original_url FROM archived_videos)
+                """
+                )
                 conn.commit()
                 return deleted
 
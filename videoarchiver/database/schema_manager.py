@@ -69,7 +69,7 @@ class SchemaStatus(TypedDict):
 class DatabaseSchemaManager:
     """Manages database schema creation and updates"""
 
-    SCHEMA_VERSION: ClassVar[int] = 1  # Increment when schema changes
+    SCHEMA_VERSION: ClassVar[int] = 2  # Increment when schema changes
     MIGRATION_TIMEOUT: ClassVar[float] = 30.0  # Seconds
 
     def __init__(self, db_path: Path) -> None:
@@ -321,8 +321,25 @@ class DatabaseSchemaManager:
             """
             )
 
+        # Version 1 to 2: Index of the messages each archived video was posted in
+        if current_version < 2:
+            migrations.append(
+                """
+                CREATE TABLE IF NOT EXISTS message_videos (
+                    message_id INTEGER NOT NULL,
+                    original_url TEXT NOT NULL,
+                    channel_id INTEGER NOT NULL,
+                    guild_id INTEGER NOT NULL,
+                    PRIMARY KEY (message_id, original_url)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_message_videos_url
+                ON message_videos(original_url);
+            """
+            )
+
         # Add more migrations here as schema evolves
-        # if current_version < 2:
+        # if current_version < 3:
         #     migrations.append(...)
 
         return migrations
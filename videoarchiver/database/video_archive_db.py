@@ -2,7 +2,7 @@
 
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List, Set
 
 # try:
 # Try relative imports first
@@ -63,6 +63,22 @@ class VideoArchiveDB:
         """Check if a URL has already been archived"""
         return await self.query_manager.is_url_archived(url)
 
+    async def filter_archived(self, urls: Iterable[str]) -> Set[str]:
+        """Get which of many URLs have already been archived, in bulk"""
+        return await self.query_manager.filter_archived(urls)
+
+    async def add_message_video(
+        self, message_id: int, original_url: str, channel_id: int, guild_id: int
+    ) -> bool:
+        """Record that a video was posted in a message"""
+        return await self.query_manager.add_message_video(
+            message_id, original_url, channel_id, guild_id
+        )
+
+    async def get_message_videos(self, message_id: int) -> List[Dict[str, Any]]:
+        """Get the archived videos posted in a message"""
+        return await self.query_manager.get_message_videos(message_id)
+
     async def get_guild_stats(self, guild_id: int) -> Dict[str, Any]:
         """Get archiving statistics for a guild"""
         return await self.query_manager.get_guild_stats(guild_id)
@@ -22,6 +22,14 @@ logger = logging.getLogger("VideoArchiver")
     # Try relative imports first
 from ffmpeg_manager import FFmpegManager
 from video_analyzer import VideoAnalyzer
+from probe_service import ProbeService
+from size_targeting import SizeTargetPlanner, EncodeAttempt
+from encode_scheduler import EncodeScheduler, EncodeSlot
+from reduction_planner import ReductionPlanner, ReductionPlan, ReductionTier
+from capability_manifest import CapabilityManifest, CapabilityStore
+from preset_calibrator import PresetCalibrator
+from segment_encoder import SegmentEncoder, Segment
+from process_supervisor import ProcessSupervisor, ProcessResult, SupervisedProcess
 from gpu_detector import GPUDetector
 from encoder_params import EncoderParams
 from ffmpeg_downloader import FFmpegDownloader
@@ -48,6 +56,14 @@ from exceptions import (
     # Fall back to absolute imports if relative imports fail
     # from videoarchiver.ffmpeg.ffmpeg_manager import FFmpegManager
     # from videoarchiver.ffmpeg.video_analyzer import VideoAnalyzer
+    # from videoarchiver.ffmpeg.probe_service import ProbeService
+    # from videoarchiver.ffmpeg.size_targeting import SizeTargetPlanner, EncodeAttempt
+    # from videoarchiver.ffmpeg.encode_scheduler import EncodeScheduler, EncodeSlot
+    # from videoarchiver.ffmpeg.reduction_planner import ReductionPlanner, ReductionPlan, ReductionTier
+    # from videoarchiver.ffmpeg.capability_manifest import CapabilityManifest, CapabilityStore
+    # from videoarchiver.ffmpeg.preset_calibrator import PresetCalibrator
+    # from videoarchiver.ffmpeg.segment_encoder import SegmentEncoder, Segment
+    # from videoarchiver.ffmpeg.process_supervisor import ProcessSupervisor, ProcessResult, SupervisedProcess
     # from videoarchiver.ffmpeg.gpu_detector import GPUDetector
     # from videoarchiver.ffmpeg.encoder_params import EncoderParams
     # from videoarchiver.ffmpeg.ffmpeg_downloader import FFmpegDownloader
@@ -114,7 +130,7 @@ class FFmpeg:
         """Get GPU information"""
         return self._manager.gpu_info
 
-    def analyze_video(self, input_path: str) -> Dict[str, Any]:
+    async def analyze_video(self, input_path: str) -> Dict[str, Any]:
         """Analyze video content
         
         Args:
@@ -126,12 +142,12 @@ class FFmpeg:
         try:
             if not os.path.exists(input_path):
                 raise FileNotFoundError(f"Input file not found: {input_path}")
-            return self._manager.analyze_video(input_path)
+            return await self._manager.analyze_video(input_path)
         except Exception as e:
             logger.error(f"Video analysis failed: {e}")
             raise AnalysisError(f"Failed to analyze video: {e}")
 
-    def get_compression_params(self, input_path: str, target_size_mb: int) -> Dict[str, str]:
+    async def get_compression_params(self, input_path: str, target_size_mb: int) -> Dict[str, str]:
         """Get optimal compression parameters
         
         Args:
@@ -144,7 +160,7 @@ class FFmpeg:
         try:
             if not os.path.exists(input_path):
                 raise FileNotFoundError(f"Input file not found: {input_path}")
-            return self._manager.get_compression_params(input_path, target_size_mb)
+            return await self._manager.get_compression_params(input_path, target_size_mb)
         except Exception as e:
             logger.error(f"Failed to get compression parameters: {e}")
             raise EncodingError(f"Failed to get compression parameters: {e}")
@@ -165,12 +181,8 @@ class FFmpeg:
     def version(self) -> str:
         """Get FFmpeg version"""
         try:
-            import subprocess
-            result = subprocess.run(
-                [str(self.ffmpeg_path), "-version"],
-                capture_output=True,
-                text=True,
-                timeout=5
+            result = self._manager.process_supervisor.run_sync(
+                [str(self.ffmpeg_path), "-version"], timeout=5
             )
             if result.returncode == 0:
                 return result.stdout.split()[2]
@@ -194,6 +206,22 @@ __all__ = [
     'ffmpeg',
     'FFmpegManager',
     'VideoAnalyzer',
+    'ProbeService',
+    'SizeTargetPlanner',
+    'EncodeAttempt',
+    'EncodeScheduler',
+    'EncodeSlot',
+    'ReductionPlanner',
+    'ReductionPlan',
+    'ReductionTier',
+    'CapabilityManifest',
+    'CapabilityStore',
+    'PresetCalibrator',
+    'SegmentEncoder',
+    'Segment',
+    'ProcessSupervisor',
+    'ProcessResult',
+    'SupervisedProcess',
     'GPUDetector',
     'EncoderParams',
     'FFmpegDownloader',
@@ -48,17 +48,22 @@ class BinaryManager:
         self.downloader = FFmpegDownloader(
             system=system,
             machine=machine,
-            base_dir=base_dir
+            base_dir=base_dir,
+            process_supervisor=verification_manager.process_supervisor,
         )
         
         self._ffmpeg_path: Optional[Path] = None
         self._ffprobe_path: Optional[Path] = None
 
-    def initialize_binaries(self, gpu_info: Dict[str, bool]) -> Dict[str, Path]:
+    def initialize_binaries(
+        self, gpu_info: Dict[str, bool], verify: bool = True
+    ) -> Dict[str, Path]:
         """Initialize FFmpeg and FFprobe binaries
         
         Args:
             gpu_info: Dictionary of GPU availability
+            verify: Run functional checks on existing binaries; skipped when
+                a capability manifest already vouches for them
             
         Returns:
             Dict[str, Path]: Paths to FFmpeg and FFprobe binaries
@@ -68,7 +73,7 @@ class BinaryManager:
         """
         try:
             # Verify existing binaries if they exist
-            if self._verify_existing_binaries(gpu_info):
+            if self._verify_existing_binaries(gpu_info, verify):
                 return self._get_binary_paths()
 
             # Download and verify binaries
@@ -91,7 +96,9 @@ class BinaryManager:
                 raise
             raise FFmpegError(f"Failed to initialize binaries: {e}")
 
-    def _verify_existing_binaries(self, gpu_info: Dict[str, bool]) -> bool:
+    def _verify_existing_binaries(
+        self, gpu_info: Dict[str, bool], verify: bool = True
+    ) -> bool:
         """Verify existing binary files if they exist
         
         Returns:
@@ -105,19 +112,21 @@ class BinaryManager:
             try:
                 self._ffmpeg_path = self.downloader.ffmpeg_path
                 self._ffprobe_path = self.downloader.ffprobe_path
-                self._verify_binaries(gpu_info)
+                self._verify_binaries(gpu_info, verify)
                 return True
             except Exception as e:
                 logger.warning(f"Existing binaries verification failed: {e}")
                 return False
         return False
 
-    def _verify_binaries(self, gpu_info: Dict[str, bool]) -> None:
+    def _verify_binaries(self, gpu_info: Dict[str, bool], verify: bool = True) -> None:
         """Verify binary files and set permissions"""
         try:
             # Set permissions
             self.verification_manager.verify_binary_permissions(self._ffmpeg_path)
             self.verification_manager.verify_binary_permissions(self._ffprobe_path)
+            if not verify:
+                return
             
             # Verify functionality
             self.verification_manager.verify_ffmpeg(
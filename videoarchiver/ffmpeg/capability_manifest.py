@@ -0,0 +1,115 @@
+"""Persisted FFmpeg capability manifest keyed by the binary it describes"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field, asdict, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, ClassVar, Tuple
+
+logger = logging.getLogger("VideoArchiver")
+
+
+@dataclass
+class CapabilityManifest:
+    """What one FFmpeg binary can do on this machine"""
+
+    binary_path: str
+    binary_size: int
+    binary_mtime_ns: int
+    binary_hash: str
+    ffmpeg_version: str
+    ffprobe_version: str
+    encoders: List[str]
+    hwaccels: List[str]
+    gpu_info: Dict[str, bool]
+    # Frames per second of a short test encode; None if the encoder failed
+    encode_speed: Dict[str, Optional[float]] = field(default_factory=dict)
+    # Per-preset benchmark results, see PresetCalibrator
+    preset_speed: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    schema: int = 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CapabilityManifest":
+        """Create from a dict, ignoring unknown keys"""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class CapabilityStore:
+    """Loads and saves the capability manifest
+
+    A manifest is used at startup only if the binary's size and mtime still
+    match, which takes a stat and a small JSON read. The content hash is
+    checked later by background revalidation, which also rebuilds manifests
+    older than ``MAX_AGE`` so driver and GPU changes are picked up.
+    """
+
+    SCHEMA_VERSION: ClassVar[int] = 1
+    MAX_AGE: ClassVar[float] = 7 * 24 * 3600
+    HASH_CHUNK: ClassVar[int] = 1024 * 1024
+
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = Path(manifest_path)
+
+    @staticmethod
+    def file_key(binary_path: Path) -> Tuple[int, int]:
+        """Get the (size, mtime in ns) of a binary"""
+        stat = os.stat(binary_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @classmethod
+    def hash_binary(cls, binary_path: Path) -> str:
+        """Get the SHA-256 of a binary"""
+        digest = hashlib.sha256()
+        with open(binary_path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def load(self, binary_path: Path) -> Optional[CapabilityManifest]:
+        """Load the manifest if it describes the binary as it is now
+
+        Returns:
+            The manifest, or None if it is missing, unreadable or for a
+            different binary
+        """
+        try:
+            if not self.manifest_path.exists() or not Path(binary_path).exists():
+                return None
+            with open(self.manifest_path, "r") as f:
+                manifest = CapabilityManifest.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable capability manifest: {e}")
+            return None
+
+        if manifest.schema != self.SCHEMA_VERSION:
+            return None
+        if manifest.binary_path != str(binary_path):
+            return None
+        if (manifest.binary_size, manifest.binary_mtime_ns) != self.file_key(binary_path):
+            logger.info("FFmpeg binary changed since the capability manifest was written")
+            return None
+        return manifest
+
+    def save(self, manifest: CapabilityManifest) -> None:
+        """Write the manifest atomically"""
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.manifest_path.with_suffix(".tmp")
+            with open(temp_path, "w") as f:
+                json.dump(manifest.to_dict(), f, indent=2)
+            os.replace(temp_path, self.manifest_path)
+        except Exception as e:
+            logger.error(f"Failed to save capability manifest: {e}")
+
+    def is_stale(self, manifest: CapabilityManifest) -> bool:
+        """Check whether a manifest is due to be rebuilt"""
+        return time.time() - manifest.created_at > self.MAX_AGE
@@ -0,0 +1,187 @@
+"""Process-wide CPU budget scheduler for FFmpeg encodes"""
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, ClassVar, Tuple
+
+logger = logging.getLogger("VideoArchiver")
+
+
+@dataclass
+class EncodeSlot:
+    """Cores granted to one admitted encode"""
+
+    job_id: int
+    threads: int
+    priority: int
+    label: str
+    admitted_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Request:
+    """An encode waiting for cores"""
+
+    job_id: int
+    priority: int
+    threads: Optional[int]
+    label: str
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class EncodeScheduler:
+    """Admits encodes against a fixed core budget shared by every guild
+
+    Each admitted encode gets a fair share of the cores, based on how many
+    encodes are running or waiting when it starts. It keeps that share until
+    it finishes, because FFmpeg cannot change its thread count mid-encode.
+    Encodes that cannot get at least ``min_threads`` cores wait in priority
+    order, with higher priorities first, as in the queue.
+    """
+
+    DEFAULT_MIN_THREADS: ClassVar[int] = 2
+    WAIT_HISTORY: ClassVar[int] = 100
+
+    def __init__(self, total_cores: int, min_threads: int = DEFAULT_MIN_THREADS):
+        """Initialize the scheduler
+
+        Args:
+            total_cores: Number of cores encodes may use in total
+            min_threads: Fewest threads a CPU encode is started with
+        """
+        self.total_cores = max(1, total_cores)
+        self.min_threads = max(1, min(min_threads, self.total_cores))
+        self._free = self.total_cores
+        self._active: Dict[int, EncodeSlot] = {}
+        self._waiting: List[Tuple[int, int, _Request]] = []
+        self._ids = itertools.count(1)
+        self._waits: Deque[float] = deque(maxlen=self.WAIT_HISTORY)
+        self._started = time.monotonic()
+        self._last_change = self._started
+        self._busy_core_seconds = 0.0
+        self._stats = {"admitted": 0, "completed": 0, "cancelled": 0, "total_wait": 0.0}
+
+    @asynccontextmanager
+    async def reserve(
+        self, priority: int = 0, threads: Optional[int] = None, label: str = ""
+    ) -> AsyncIterator[EncodeSlot]:
+        """Wait for cores and hold them for the duration of the block
+
+        Args:
+            priority: 0-10, higher priorities are admitted first
+            threads: Fixed number of cores wanted, e.g. 1 for hardware
+                encodes; None asks for a fair share
+            label: Description used in logs
+
+        Yields:
+            EncodeSlot with the number of threads to give FFmpeg
+        """
+        request = _Request(
+            job_id=next(self._ids),
+            priority=priority,
+            threads=min(threads, self.total_cores) if threads else None,
+            label=label,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._waiting, (-priority, request.job_id, request))
+        self._dispatch()
+
+        try:
+            slot = await request.future
+        except asyncio.CancelledError:
+            self._stats["cancelled"] += 1
+            if request.future.done() and not request.future.cancelled():
+                # Admitted just as the caller was cancelled
+                self._release(request.future.result())
+            raise
+
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    def _threads_for(self, request: _Request) -> Optional[int]:
+        """Number of cores to grant a request now, or None if it must wait"""
+        minimum = min(request.threads or self.min_threads, self.min_threads)
+        if self._free < minimum:
+            return None
+        if request.threads:
+            return min(request.threads, self._free)
+        contenders = len(self._active) + len(self._waiting)
+        share = max(self.min_threads, self.total_cores // max(1, contenders))
+        return min(share, self._free)
+
+    def expected_threads(self) -> int:
+        """Threads a CPU encode submitted now would probably be given"""
+        contenders = len(self._active) + len(self._waiting) + 1
+        return max(self.min_threads, min(self.total_cores, self.total_cores // contenders))
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests in priority order while cores are free"""
+        while self._waiting:
+            _, _, request = self._waiting[0]
+            if request.future.done():
+                # Cancelled while waiting
+                heapq.heappop(self._waiting)
+                continue
+            threads = self._threads_for(request)
+            if threads is None:
+                break
+            heapq.heappop(self._waiting)
+            self._account()
+            self._free -= threads
+            slot = EncodeSlot(request.job_id, threads, request.priority, request.label)
+            self._active[slot.job_id] = slot
+            wait = slot.admitted_at - request.queued_at
+            self._waits.append(wait)
+            self._stats["admitted"] += 1
+            self._stats["total_wait"] += wait
+            if wait > 1:
+                logger.debug(
+                    f"Encode {request.label or request.job_id} admitted with "
+                    f"{threads} threads after waiting {wait:.1f}s"
+                )
+            request.future.set_result(slot)
+
+    def _release(self, slot: EncodeSlot) -> None:
+        """Return a slot's cores and admit waiting encodes"""
+        if self._active.pop(slot.job_id, None) is None:
+            return
+        self._account()
+        self._free += slot.threads
+        self._stats["completed"] += 1
+        self._dispatch()
+
+    def _account(self) -> None:
+        """Integrate allocated cores over time for utilization"""
+        now = time.monotonic()
+        self._busy_core_seconds += (self.total_cores - self._free) * (now - self._last_change)
+        self._last_change = now
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler utilization and wait-time metrics"""
+        self._account()
+        elapsed = max(1e-9, time.monotonic() - self._started)
+        waits = sorted(self._waits)
+        admitted = self._stats["admitted"]
+        return {
+            "total_cores": self.total_cores,
+            "allocated_cores": self.total_cores - self._free,
+            "active_jobs": len(self._active),
+            "queued_jobs": sum(1 for *_, r in self._waiting if not r.future.done()),
+            "utilization": self._busy_core_seconds / (self.total_cores * elapsed),
+            "current_utilization": (self.total_cores - self._free) / self.total_cores,
+            "admitted": admitted,
+            "completed": self._stats["completed"],
+            "cancelled": self._stats["cancelled"],
+            "avg_wait": self._stats["total_wait"] / admitted if admitted else 0.0,
+            "p95_wait": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            "max_wait": waits[-1] if waits else 0.0,
+        }
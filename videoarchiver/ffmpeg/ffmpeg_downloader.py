@@ -19,10 +19,12 @@ import lzma
 # try:
 # Try relative imports first
 from exceptions import DownloadError
+from process_supervisor import ProcessSupervisor
 
 # except ImportError:
 # Fall back to absolute imports if relative imports fail
 # from videoarchiver.ffmpeg.exceptions import DownloadError
+# from videoarchiver.ffmpeg.process_supervisor import ProcessSupervisor
 
 logger = logging.getLogger("VideoArchiver")
 
@@ -77,9 +79,16 @@ class FFmpegDownloader:
         },
     }
 
-    def __init__(self, system: str, machine: str, base_dir: Path):
+    def __init__(
+        self,
+        system: str,
+        machine: str,
+        base_dir: Path,
+        process_supervisor: Optional[ProcessSupervisor] = None,
+    ):
         """Initialize FFmpeg downloader"""
         self.system = system
+        self.process_supervisor = process_supervisor or ProcessSupervisor()
         self.machine = machine.lower()
         if self.machine == "arm64":
             self.machine = "aarch64"  # Normalize ARM64 naming
@@ -352,13 +361,9 @@ class FFmpegDownloader:
 
             # Test FFmpeg functionality with enhanced error handling
             try:
-                result = subprocess.run(
+                result = self.process_supervisor.run_sync(
                     [str(self.ffmpeg_path), "-version"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
                     timeout=5,
-                    text=True,
-                    check=False,  # Don't raise on non-zero return code
                     env={"PATH": os.environ.get("PATH", "")},  # Ensure PATH is set
                 )
             except subprocess.TimeoutExpired:
@@ -370,13 +375,9 @@ class FFmpegDownloader:
 
             # Test FFprobe functionality with enhanced error handling
             try:
-                result = subprocess.run(
+                result = self.process_supervisor.run_sync(
                     [str(self.ffprobe_path), "-version"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
                     timeout=5,
-                    text=True,
-                    check=False,  # Don't raise on non-zero return code
                     env={"PATH": os.environ.get("PATH", "")},  # Ensure PATH is set
                 )
             except subprocess.TimeoutExpired:
@@ -1,10 +1,13 @@
 """Main FFmpeg management module"""
 
+import os
+import asyncio
 import logging
 import platform
 import multiprocessing
+from dataclasses import replace
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, ClassVar
 
 # try:
 # Try relative imports first
@@ -12,9 +15,14 @@ from exceptions import FFmpegError, AnalysisError, FFmpegNotFoundError
 from gpu_detector import GPUDetector
 from video_analyzer import VideoAnalyzer
 from encoder_params import EncoderParams
-from process_manager import ProcessManager
+from process_supervisor import ProcessSupervisor
 from verification_manager import VerificationManager
 from binary_manager import BinaryManager
+from probe_service import ProbeService
+from encode_scheduler import EncodeScheduler
+from capability_manifest import CapabilityManifest, CapabilityStore
+from preset_calibrator import PresetCalibrator
+from segment_encoder import SegmentEncoder
 
 # except ImportError:
 # Fall back to absolute imports if relative imports fail
@@ -26,9 +34,14 @@ from binary_manager import BinaryManager
 # from videoarchiver.ffmpeg.gpu_detector import GPUDetector
 # from videoarchiver.ffmpeg.video_analyzer import VideoAnalyzer
 # from videoarchiver.ffmpeg.encoder_params import EncoderParams
-# from videoarchiver.ffmpeg.process_manager import ProcessManager
+# from videoarchiver.ffmpeg.process_supervisor import ProcessSupervisor
 # from videoarchiver.ffmpeg.verification_manager import VerificationManager
 # from videoarchiver.ffmpeg.binary_manager import BinaryManager
+# from videoarchiver.ffmpeg.probe_service import ProbeService
+# from videoarchiver.ffmpeg.encode_scheduler import EncodeScheduler
+# from videoarchiver.ffmpeg.capability_manifest import CapabilityManifest, CapabilityStore
+# from videoarchiver.ffmpeg.preset_calibrator import PresetCalibrator
+# from videoarchiver.ffmpeg.segment_encoder import SegmentEncoder
 
 logger = logging.getLogger("VideoArchiver")
 
@@ -36,6 +49,16 @@ logger = logging.getLogger("VideoArchiver")
 class FFmpegManager:
     """Manages FFmpeg operations and lifecycle"""
 
+    # Inputs at most this much over the target skip sampled content analysis;
+    # the bitrate from the size budget dominates the outcome for them
+    FAST_PATH_OVERSHOOT: ClassVar[float] = 1.25
+    # Encoders given a test encode during capability revalidation
+    GPU_ENCODERS: ClassVar[Dict[str, str]] = {
+        "nvidia": "h264_nvenc",
+        "amd": "h264_amf",
+        "intel": "h264_qsv",
+    }
+
     def __init__(self):
         """Initialize FFmpeg manager"""
         # Set up base directory in videoarchiver/bin
@@ -44,8 +67,9 @@ class FFmpegManager:
         logger.info(f"FFmpeg base directory: {self.base_dir}")
 
         # Initialize managers
-        self.process_manager = ProcessManager()
-        self.verification_manager = VerificationManager(self.process_manager)
+        # Every FFmpeg and FFprobe child is started and cleaned up through it
+        self.process_supervisor = ProcessSupervisor()
+        self.verification_manager = VerificationManager(self.process_supervisor)
         self.binary_manager = BinaryManager(
             base_dir=self.base_dir,
             system=platform.system(),
@@ -53,52 +77,250 @@ class FFmpegManager:
             verification_manager=self.verification_manager,
         )
 
+        # A manifest matching the installed binary replaces the startup
+        # version, encoder and GPU checks; it is revalidated in the background
+        self.capability_store = CapabilityStore(self.base_dir / "capabilities.json")
+        manifest = self.capability_store.load(self.binary_manager.downloader.ffmpeg_path)
+        if manifest:
+            binaries = self.binary_manager.initialize_binaries(manifest.gpu_info, verify=False)
+            logger.info(f"Loaded FFmpeg {manifest.ffmpeg_version} capabilities from manifest")
+        else:
+            binaries = self.binary_manager.initialize_binaries(
+                {"nvidia": False, "amd": False, "intel": False}
+            )
+
         # Initialize components
-        self.gpu_detector = GPUDetector(self.get_ffmpeg_path)
-        self.video_analyzer = VideoAnalyzer(self.get_ffmpeg_path)
-        self._gpu_info = self.gpu_detector.detect_gpu()
+        self.probe_service = ProbeService(
+            str(binaries["ffprobe"]), supervisor=self.process_supervisor
+        )
+        self.gpu_detector = GPUDetector(binaries["ffmpeg"], self.process_supervisor)
+        self.video_analyzer = VideoAnalyzer(binaries["ffmpeg"], self.probe_service)
+        # A manifest built here was just checked against the binary, so
+        # background revalidation only has to measure encode speeds
+        self._manifest_verified = not manifest
+        if not manifest:
+            manifest = self._build_manifest(binaries["ffmpeg"], binaries["ffprobe"])
+            self.capability_store.save(manifest)
+        self.capabilities: CapabilityManifest = manifest
+        self._gpu_info = dict(manifest.gpu_info)
         self._cpu_cores = multiprocessing.cpu_count()
 
+        # One core budget for every encode in the process, across guilds
+        self.encode_scheduler = EncodeScheduler(self._cpu_cores)
+        self.segment_encoder = SegmentEncoder(self.probe_service)
+
         # Initialize encoder params
         self.encoder_params = EncoderParams(self._cpu_cores, self._gpu_info)
+        self.calibrator = PresetCalibrator()
 
-        # Initialize binaries
-        binaries = self.binary_manager.initialize_binaries(self._gpu_info)
+        self._revalidate_task: Optional[asyncio.Task] = None
+        self.schedule_revalidation()
         logger.info(f"Using FFmpeg from: {binaries['ffmpeg']}")
         logger.info(f"Using FFprobe from: {binaries['ffprobe']}")
         logger.info("FFmpeg manager initialized successfully")
 
     def kill_all_processes(self) -> None:
-        """Kill all active FFmpeg processes"""
-        self.process_manager.kill_all_processes()
+        """Kill all FFmpeg processes started by this cog"""
+        if self._revalidate_task and not self._revalidate_task.done():
+            self._revalidate_task.cancel()
+        self.process_supervisor.kill_all()
+
+    def _build_manifest(
+        self, ffmpeg_path: Path, ffprobe_path: Path, binary_hash: Optional[str] = None
+    ) -> CapabilityManifest:
+        """Run the capability checks and GPU detection for a binary"""
+        capabilities = self.verification_manager.collect_capabilities(
+            ffmpeg_path, ffprobe_path
+        )
+        size, mtime_ns = self.capability_store.file_key(ffmpeg_path)
+        return CapabilityManifest(
+            binary_path=str(ffmpeg_path),
+            binary_size=size,
+            binary_mtime_ns=mtime_ns,
+            binary_hash=binary_hash or self.capability_store.hash_binary(ffmpeg_path),
+            gpu_info=self.gpu_detector.detect_gpu(capabilities["encoders"]),
+            **capabilities,
+        )
+
+    def _measure_encoders(self, manifest: CapabilityManifest) -> Dict[str, Optional[float]]:
+        """Give libx264 and each detected GPU encoder a test encode"""
+        ffmpeg_path = Path(manifest.binary_path)
+        encoders = ["libx264"] + [
+            encoder
+            for vendor, encoder in self.GPU_ENCODERS.items()
+            if manifest.gpu_info.get(vendor)
+        ]
+        return {
+            encoder: self.verification_manager.measure_encode_speed(ffmpeg_path, encoder)
+            for encoder in encoders
+        }
+
+    def schedule_revalidation(self, force: bool = False) -> None:
+        """Start background capability revalidation if an event loop is running"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._revalidate_task and not self._revalidate_task.done():
+            return
+        self._revalidate_task = loop.create_task(self.revalidate_capabilities(force))
+
+    async def revalidate_capabilities(self, force: bool = False) -> CapabilityManifest:
+        """Re-check the manifest against the binary and rebuild it if needed
+
+        The binary is hashed off the event loop. The manifest is rebuilt when
+        the hash differs, the manifest is older than the store's maximum age,
+        or ``force`` is set. A manifest built at startup is not checked or
+        rebuilt again. Encode speeds and preset calibration are measured
+        whenever the manifest is rebuilt or lacks them; GPU encoders that
+        fail their test encode are disabled.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            ffmpeg_path = Path(self.get_ffmpeg_path())
+            ffprobe_path = Path(self.get_ffprobe_path())
+            current = self.capabilities
+            rebuild = force
+            binary_hash = None
+            # Only the first revalidation after a cold start may skip the check
+            verified, self._manifest_verified = self._manifest_verified, False
+            if not rebuild and not verified:
+                binary_hash = await loop.run_in_executor(
+                    None, self.capability_store.hash_binary, ffmpeg_path
+                )
+                rebuild = (
+                    current.binary_path != str(ffmpeg_path)
+                    or current.binary_hash != binary_hash
+                    or self.capability_store.is_stale(current)
+                )
+            if not rebuild and current.encode_speed and current.preset_speed:
+                return current
+
+            if rebuild:
+                logger.info("Revalidating FFmpeg capabilities in the background")
+                manifest = await loop.run_in_executor(
+                    None, self._build_manifest, ffmpeg_path, ffprobe_path, binary_hash
+                )
+            else:
+                logger.info("Measuring FFmpeg encode speeds in the background")
+                manifest = replace(current, gpu_info=dict(current.gpu_info))
+            manifest.encode_speed = await loop.run_in_executor(
+                None, self._measure_encoders, manifest
+            )
+            for vendor, encoder in self.GPU_ENCODERS.items():
+                if manifest.gpu_info.get(vendor) and not manifest.encode_speed.get(encoder):
+                    logger.warning(f"Disabling {encoder}: test encode failed")
+                    manifest.gpu_info[vendor] = False
+            manifest.preset_speed = await self.calibrate_presets(manifest)
+
+            self.capabilities = manifest
+            # EncoderParams shares this dict, so it sees the update
+            self._gpu_info.clear()
+            self._gpu_info.update(manifest.gpu_info)
+            self.capability_store.save(manifest)
+            logger.info(
+                "FFmpeg capabilities revalidated: "
+                + ", ".join(
+                    f"{encoder}={speed:.0f}fps" if speed else f"{encoder}=failed"
+                    for encoder, speed in manifest.encode_speed.items()
+                )
+            )
+            return manifest
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Capability revalidation failed: {e}")
+            return self.capabilities
+
+    async def calibrate_presets(self, manifest: CapabilityManifest) -> Dict[str, Dict[str, Any]]:
+        """Benchmark the presets of every working encoder
 
-    def analyze_video(self, input_path: str) -> Dict[str, Any]:
+        Holds cores from the encode scheduler so the benchmark neither slows
+        down nor is slowed down by real encodes.
+        """
+        encoders = [
+            encoder for encoder, speed in manifest.encode_speed.items() if speed
+        ]
+        async with self.encode_scheduler.reserve(
+            threads=self._cpu_cores, label="preset calibration"
+        ) as slot:
+            results = await self.calibrator.calibrate(
+                manifest.binary_path, encoders, self.probe_service, slot.threads
+            )
+        logger.info(
+            "Preset calibration: "
+            + "; ".join(
+                f"{encoder} "
+                + ", ".join(
+                    f"{preset}={fps:.0f}fps" if fps else f"{preset}=failed"
+                    for preset, fps in entry["fps"].items()
+                )
+                for encoder, entry in results.items()
+            )
+        )
+        return results
+
+    def _apply_calibrated_preset(
+        self, params: Dict[str, str], video_info: Dict[str, Any]
+    ) -> None:
+        """Replace the preset with the calibrated choice for this machine"""
+        encoder = params.get("c:v", "")
+        preset = self.calibrator.select_preset(
+            self.capabilities.preset_speed,
+            encoder,
+            video_info,
+            threads=self.encode_scheduler.expected_threads(),
+            passes=2 if encoder == "libx264" else 1,
+        )
+        if preset:
+            params[self.calibrator.preset_option(encoder)] = preset
+
+    async def analyze_video(
+        self,
+        input_path: str,
+        probe_result: Optional[Dict[str, Any]] = None,
+        sample_content: bool = True,
+    ) -> Dict[str, Any]:
         """Analyze video content for optimal encoding settings"""
         try:
             if not input_path or not Path(input_path).exists():
                 raise FileNotFoundError(f"Input file not found: {input_path}")
-            return self.video_analyzer.analyze_video(input_path)
+            return await self.video_analyzer.analyze_video(
+                input_path, probe_result, sample_content
+            )
         except Exception as e:
             logger.error(f"Video analysis failed: {e}")
             if isinstance(e, FileNotFoundError):
                 raise
             raise AnalysisError(f"Failed to analyze video: {e}")
 
-    def get_compression_params(
-        self, input_path: str, target_size_mb: int
+    async def get_compression_params(
+        self,
+        input_path: str,
+        target_size_mb: int,
+        probe_result: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, str]:
         """Get optimal compression parameters for the given input file"""
         try:
-            # Analyze video first
-            video_info = self.analyze_video(input_path)
-            if not video_info:
-                raise AnalysisError("Failed to analyze video")
-
             # Convert target size to bytes
             target_size_bytes = target_size_mb * 1024 * 1024
 
+            # Analyze video first, reusing an earlier probe when given
+            overshoot = os.path.getsize(input_path) / max(1, target_size_bytes)
+            sample_content = overshoot > self.FAST_PATH_OVERSHOOT
+            if not sample_content:
+                logger.debug(
+                    f"Skipping content sampling, input is {overshoot:.2f}x the target"
+                )
+            video_info = await self.analyze_video(
+                input_path, probe_result, sample_content
+            )
+            if not video_info:
+                raise AnalysisError("Failed to analyze video")
+
             # Get encoding parameters
             params = self.encoder_params.get_params(video_info, target_size_bytes)
+            self._apply_calibrated_preset(params, video_info)
             logger.info(f"Generated compression parameters: {params}")
             return params
 
@@ -115,6 +337,34 @@ class FFmpegManager:
                 "b:a": "128k",
             }
 
+    async def verify_video_file(self, file_path: str) -> bool:
+        """Check that a file has a video stream and a positive duration"""
+        try:
+            probe = await self.probe_service.probe(file_path, self.get_ffprobe_path())
+            has_video = any(
+                s.get("codec_type") == "video" for s in probe.get("streams", [])
+            )
+            return has_video and float(probe["format"].get("duration", 0)) > 0
+        except Exception as e:
+            logger.error(f"Error verifying video file {file_path}: {e}")
+            return False
+
+    async def get_video_duration(self, file_path: str) -> float:
+        """Get video duration in seconds"""
+        try:
+            probe = await self.probe_service.probe(file_path, self.get_ffprobe_path())
+            return float(probe["format"]["duration"])
+        except Exception as e:
+            logger.error(f"Error getting video duration: {e}")
+            return 0
+
+    def get_encode_stats(self) -> Dict[str, Any]:
+        """Get encode scheduler utilization and wait-time metrics"""
+        stats = self.encode_scheduler.get_stats()
+        stats["segmented"] = self.segment_encoder.get_stats()
+        stats["processes"] = self.process_supervisor.get_stats()
+        return stats
+
     def get_ffmpeg_path(self) -> str:
         """Get path to FFmpeg binary"""
         return self.binary_manager.get_ffmpeg_path()
@@ -125,7 +375,10 @@ class FFmpegManager:
 
     def force_download(self) -> bool:
         """Force re-download of FFmpeg binary"""
-        return self.binary_manager.force_download(self._gpu_info)
+        success = self.binary_manager.force_download(self._gpu_info)
+        if success:
+            self.schedule_revalidation(force=True)
+        return success
 
     @property
     def gpu_info(self) -> Dict[str, bool]:
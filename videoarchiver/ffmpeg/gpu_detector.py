@@ -5,25 +5,39 @@ import subprocess
 import logging
 import platform
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+# try:
+# Try relative imports first
+from process_supervisor import ProcessSupervisor
+
+# except ImportError:
+# Fall back to absolute imports if relative imports fail
+# from videoarchiver.ffmpeg.process_supervisor import ProcessSupervisor
+
 logger = logging.getLogger("VideoArchiver")
 
 class GPUDetector:
-    def __init__(self, ffmpeg_path: Path):
+    def __init__(self, ffmpeg_path: Path, process_supervisor: Optional[ProcessSupervisor] = None):
         """Initialize GPU detector
         
         Args:
             ffmpeg_path: Path to FFmpeg binary
+            process_supervisor: Runs FFmpeg; a private one if None
         """
         self.ffmpeg_path = Path(ffmpeg_path)
+        self.process_supervisor = process_supervisor or ProcessSupervisor()
         if not self.ffmpeg_path.exists():
             raise FileNotFoundError(f"FFmpeg not found at {self.ffmpeg_path}")
 
-    def detect_gpu(self) -> Dict[str, bool]:
+    def detect_gpu(self, encoders: Optional[List[str]] = None) -> Dict[str, bool]:
         """Detect available GPU acceleration support
         
+        Args:
+            encoders: Encoder names already listed from FFmpeg, so it does
+                not have to be run again
+
         Returns:
             Dict containing boolean flags for each GPU type
         """
@@ -38,7 +52,7 @@ class GPUDetector:
             physical_gpus = self._detect_physical_gpus()
             
             # Then check FFmpeg support
-            ffmpeg_support = self._verify_ffmpeg_gpu_support()
+            ffmpeg_support = self._verify_ffmpeg_gpu_support(encoders)
             
             # Only enable GPU if both physical GPU exists and FFmpeg supports it
             gpu_info["nvidia"] = physical_gpus["nvidia"] and ffmpeg_support["nvidia"]
@@ -166,34 +180,38 @@ class GPUDetector:
             
         return gpu_info
 
-    def _verify_ffmpeg_gpu_support(self) -> Dict[str, bool]:
+    def _verify_ffmpeg_gpu_support(
+        self, encoders: Optional[List[str]] = None
+    ) -> Dict[str, bool]:
         """Verify GPU support in FFmpeg installation"""
         gpu_support = {"nvidia": False, "amd": False, "intel": False}
         
         try:
             # Check FFmpeg encoders
-            cmd = [str(self.ffmpeg_path), "-hide_banner", "-encoders"]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            if encoders is not None:
+                returncode, output = 0, " ".join(encoders).lower()
+            else:
+                cmd = [str(self.ffmpeg_path), "-hide_banner", "-encoders"]
+                result = self.process_supervisor.run_sync(cmd, timeout=10)
+                returncode, output = result.returncode, result.stdout.lower()
             
-            if result.returncode == 0:
-                output = result.stdout.lower()
-                
+            if returncode == 0:
                 # Check for specific GPU encoders
                 gpu_support["nvidia"] = "h264_nvenc" in output
                 gpu_support["amd"] = "h264_amf" in output
                 gpu_support["intel"] = "h264_qsv" in output
 
                 # Log available encoders
-                encoders = []
+                found = []
                 if gpu_support["nvidia"]:
-                    encoders.append("NVENC")
+                    found.append("NVENC")
                 if gpu_support["amd"]:
-                    encoders.append("AMF")
+                    found.append("AMF")
                 if gpu_support["intel"]:
-                    encoders.append("QSV")
+                    found.append("QSV")
                 
-                if encoders:
-                    logger.info(f"FFmpeg compiled with GPU encoders: {', '.join(encoders)}")
+                if found:
+                    logger.info(f"FFmpeg compiled with GPU encoders: {', '.join(found)}")
                 else:
                     logger.info("No GPU encoders available in FFmpeg")
 
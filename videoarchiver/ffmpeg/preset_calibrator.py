@@ -0,0 +1,250 @@
+"""Encoder preset calibration against a wall-clock budget
+
+Can also be run on its own as an offline benchmark:
+
+    python ffmpeg/preset_calibrator.py --ffmpeg /path/to/ffmpeg
+"""
+
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import multiprocessing
+from typing import Any, Dict, List, Optional, ClassVar, Tuple
+
+# try:
+# Try relative imports first
+from probe_service import ProbeService
+
+# except ImportError:
+# Fall back to absolute imports if relative imports fail
+# from videoarchiver.ffmpeg.probe_service import ProbeService
+
+logger = logging.getLogger("VideoArchiver")
+
+# {encoder: {"threads": int, "frames": int, "fps": {preset: fps or None}}}
+CalibrationResults = Dict[str, Dict[str, Any]]
+
+
+class PresetCalibrator:
+    """Measures encoder speed per preset and picks presets that fit a budget
+
+    Each candidate preset encodes a synthetic 720p ``testsrc`` clip. The
+    frame rate it reaches is stored with the thread count it ran with. When
+    picking a preset for a job, the measured rate is scaled by the job's
+    pixel count and expected threads. The slowest preset whose estimated
+    encode time for one minute of input stays within
+    ``budget_per_minute`` is chosen, and the fastest one if none does.
+    """
+
+    DEFAULT_BUDGET_PER_MINUTE: ClassVar[float] = 30.0  # Seconds of encoding
+    REFERENCE_SIZE: ClassVar[Tuple[int, int]] = (1280, 720)
+    REFERENCE_FPS: ClassVar[int] = 30
+    DEFAULT_FRAMES: ClassVar[int] = 90
+    BENCHMARK_TIMEOUT: ClassVar[float] = 120.0
+    # Candidates per encoder, fastest first
+    CANDIDATE_PRESETS: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        "libx264": ("veryfast", "faster", "fast", "medium", "slow"),
+        "h264_nvenc": ("p3", "p4", "p5", "p6", "p7"),
+        "h264_qsv": ("veryfast", "faster", "fast", "medium", "slow"),
+        "h264_amf": ("speed", "balanced", "quality"),
+    }
+    # AMF names its speed/quality tradeoff "quality" rather than "preset"
+    PRESET_OPTIONS: ClassVar[Dict[str, str]] = {"h264_amf": "quality"}
+    # Encoders whose speed scales with the -threads they are given
+    CPU_ENCODERS: ClassVar[Tuple[str, ...]] = ("libx264",)
+    # Relative cost of a two-pass encode; the first pass runs with fastfirstpass
+    TWO_PASS_COST: ClassVar[Dict[str, float]] = {"libx264": 1.5}
+
+    def __init__(self, budget_per_minute: float = DEFAULT_BUDGET_PER_MINUTE):
+        self.budget_per_minute = budget_per_minute
+
+    @classmethod
+    def preset_option(cls, encoder: str) -> str:
+        """Name of the option holding an encoder's preset"""
+        return cls.PRESET_OPTIONS.get(encoder, "preset")
+
+    def build_command(
+        self, ffmpeg_path: str, encoder: str, preset: str, threads: int, frames: int
+    ) -> List[str]:
+        """Build the benchmark encode for one preset"""
+        width, height = self.REFERENCE_SIZE
+        return [
+            str(ffmpeg_path), "-hide_banner", "-nostats", "-loglevel", "error",
+            "-f", "lavfi",
+            "-i", f"testsrc=size={width}x{height}:rate={self.REFERENCE_FPS}",
+            "-frames:v", str(frames),
+            "-c:v", encoder,
+            f"-{self.preset_option(encoder)}", preset,
+            "-threads", str(threads),
+            "-pix_fmt", "yuv420p",
+            "-f", "null", "-",
+        ]
+
+    async def benchmark(
+        self,
+        ffmpeg_path: str,
+        encoder: str,
+        runner: ProbeService,
+        threads: int,
+        frames: int = DEFAULT_FRAMES,
+    ) -> Dict[str, Any]:
+        """Encode the test clip with every candidate preset of an encoder
+
+        Returns:
+            Results for the encoder; presets that failed have fps None
+        """
+        loop = asyncio.get_running_loop()
+        speeds: Dict[str, Optional[float]] = {}
+        for preset in self.CANDIDATE_PRESETS.get(encoder, ()):
+            cmd = self.build_command(ffmpeg_path, encoder, preset, threads, frames)
+            started = loop.time()
+            try:
+                returncode, _, stderr = await runner.run(cmd, self.BENCHMARK_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Benchmark of {encoder} {preset} failed: {e}")
+                speeds[preset] = None
+                continue
+            elapsed = loop.time() - started
+            if returncode != 0:
+                logger.warning(
+                    f"Benchmark of {encoder} {preset} failed: "
+                    f"{stderr.decode(errors='ignore').strip()[-200:]}"
+                )
+                speeds[preset] = None
+                continue
+            speeds[preset] = frames / max(elapsed, 1e-6)
+        return {"threads": threads, "frames": frames, "fps": speeds}
+
+    async def calibrate(
+        self,
+        ffmpeg_path: str,
+        encoders: List[str],
+        runner: ProbeService,
+        threads: int,
+        frames: int = DEFAULT_FRAMES,
+    ) -> CalibrationResults:
+        """Benchmark every supported encoder in turn"""
+        results: CalibrationResults = {}
+        for encoder in encoders:
+            if encoder not in self.CANDIDATE_PRESETS:
+                continue
+            results[encoder] = await self.benchmark(
+                ffmpeg_path, encoder, runner, threads, frames
+            )
+        return results
+
+    def estimate_seconds(
+        self,
+        measured_fps: float,
+        measured_threads: int,
+        encoder: str,
+        width: int,
+        height: int,
+        fps: float,
+        threads: Optional[int] = None,
+        passes: int = 1,
+    ) -> float:
+        """Estimate the encode time for one minute of input"""
+        ref_width, ref_height = self.REFERENCE_SIZE
+        pixel_scale = (width * height) / (ref_width * ref_height) if width and height else 1.0
+        speed = measured_fps
+        if encoder in self.CPU_ENCODERS and threads and measured_threads:
+            speed *= min(1.0, threads / measured_threads)
+        cost = self.TWO_PASS_COST.get(encoder, 1.0) if passes > 1 else 1.0
+        frames = 60 * (fps or self.REFERENCE_FPS)
+        return frames * pixel_scale * cost / max(speed, 1e-6)
+
+    def select_preset(
+        self,
+        results: CalibrationResults,
+        encoder: str,
+        video_info: Dict[str, Any],
+        threads: Optional[int] = None,
+        passes: int = 1,
+    ) -> Optional[str]:
+        """Pick the slowest preset that fits the budget for this video
+
+        Args:
+            results: Stored calibration results
+            encoder: Encoder the job will use
+            video_info: Analysis with width, height and fps
+            threads: Threads the job is expected to get
+            passes: 2 for a two-pass encode
+
+        Returns:
+            Preset name, or None if the encoder was never calibrated
+        """
+        entry = results.get(encoder)
+        if not entry:
+            return None
+
+        chosen = None
+        fastest = None
+        for preset in self.CANDIDATE_PRESETS.get(encoder, ()):
+            measured = entry.get("fps", {}).get(preset)
+            if not measured:
+                continue
+            fastest = fastest or preset
+            seconds = self.estimate_seconds(
+                measured,
+                entry.get("threads", 0),
+                encoder,
+                int(video_info.get("width", 0)),
+                int(video_info.get("height", 0)),
+                float(video_info.get("fps", 0)),
+                threads,
+                passes,
+            )
+            if seconds <= self.budget_per_minute:
+                chosen = preset
+        return chosen or fastest
+
+
+async def _run_benchmark(args: argparse.Namespace) -> CalibrationResults:
+    """Run the offline benchmark and print a summary"""
+    calibrator = PresetCalibrator(args.budget)
+    runner = ProbeService(max_concurrent=1)
+    results = await calibrator.calibrate(
+        args.ffmpeg, args.encoders, runner, args.threads, args.frames
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return results
+
+    for encoder, entry in results.items():
+        print(f"{encoder} ({entry['threads']} threads, {entry['frames']} frames)")
+        for preset, fps in entry["fps"].items():
+            print(f"  {preset:<10} {f'{fps:.1f} fps' if fps else 'failed'}")
+        for label, (width, height) in (("720p30", (1280, 720)), ("1080p30", (1920, 1080))):
+            preset = calibrator.select_preset(
+                results, encoder, {"width": width, "height": height, "fps": 30}
+            )
+            print(f"  -> {label} within {args.budget:.0f}s per minute: {preset}")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the offline benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark encoder presets")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="FFmpeg binary")
+    parser.add_argument(
+        "--encoders", nargs="+", default=["libx264"],
+        choices=sorted(PresetCalibrator.CANDIDATE_PRESETS),
+    )
+    parser.add_argument("--threads", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--frames", type=int, default=PresetCalibrator.DEFAULT_FRAMES)
+    parser.add_argument(
+        "--budget", type=float, default=PresetCalibrator.DEFAULT_BUDGET_PER_MINUTE,
+        help="Encoding seconds allowed per minute of input",
+    )
+    parser.add_argument("--json", action="store_true", help="Print raw results")
+    args = parser.parse_args(argv)
+    asyncio.run(_run_benchmark(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Async ffprobe/ffmpeg analysis runner with a bounded pool and result cache"""
+
+import os
+import json
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, ClassVar
+
+# try:
+# Try relative imports first
+from exceptions import FFprobeError, TimeoutError
+from process_supervisor import ProcessSupervisor
+
+# except ImportError:
+# Fall back to absolute imports if relative imports fail
+# from videoarchiver.ffmpeg.exceptions import FFprobeError, TimeoutError
+# from videoarchiver.ffmpeg.process_supervisor import ProcessSupervisor
+
+logger = logging.getLogger("VideoArchiver")
+
+# (real path, size, mtime in ns) identifies one version of a file
+ProbeKey = Tuple[str, int, int]
+
+
+class ProbeService:
+    """Runs short analysis subprocesses without blocking the event loop
+
+    At most ``max_concurrent`` probes run at once. A cancelled or timed out
+    probe has its process killed. ffprobe results are cached per file version,
+    so validation, duration lookups and analysis of the same file share one run.
+    """
+
+    DEFAULT_CONCURRENCY: ClassVar[int] = 4
+    DEFAULT_CACHE_SIZE: ClassVar[int] = 256
+    PROBE_TIMEOUT: ClassVar[float] = 30.0
+
+    def __init__(
+        self,
+        ffprobe_path: Optional[str] = None,
+        max_concurrent: int = DEFAULT_CONCURRENCY,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        supervisor: Optional[ProcessSupervisor] = None,
+    ):
+        """Initialize the probe service
+
+        Args:
+            ffprobe_path: Default ffprobe binary used when a call gives none
+            max_concurrent: Maximum number of concurrently running probes
+            cache_size: Maximum number of cached probe results
+            supervisor: Runs the processes; a private one if None
+        """
+        self.ffprobe_path = ffprobe_path
+        self.max_concurrent = max_concurrent
+        self.cache_size = cache_size
+        self.supervisor = supervisor or ProcessSupervisor()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._cache: "OrderedDict[ProbeKey, Dict[str, Any]]" = OrderedDict()
+        self._active = 0
+        self._stats = {"runs": 0, "cache_hits": 0, "timeouts": 0, "cancelled": 0}
+
+    async def run(
+        self, cmd: List[str], timeout: float = PROBE_TIMEOUT
+    ) -> Tuple[int, bytes, bytes]:
+        """Run an analysis command inside the pool
+
+        Args:
+            cmd: Command and arguments
+            timeout: Seconds before the process is killed
+
+        Returns:
+            Tuple of (return code, stdout, stderr)
+
+        Raises:
+            TimeoutError: If the command did not finish in time
+            asyncio.CancelledError: If the caller was cancelled; the process
+                is killed before this propagates
+        """
+        async with self._semaphore:
+            self._active += 1
+            self._stats["runs"] += 1
+            try:
+                result = await self.supervisor.run(
+                    cmd, job=os.path.basename(cmd[0]), owner=self, timeout=timeout
+                )
+            except asyncio.CancelledError:
+                self._stats["cancelled"] += 1
+                raise
+            finally:
+                self._active -= 1
+            if result.timed_out:
+                self._stats["timeouts"] += 1
+                raise TimeoutError(f"{os.path.basename(cmd[0])} timed out after {timeout}s")
+            return result.returncode, result.stdout, result.stderr
+
+    @staticmethod
+    def _key(file_path: str) -> ProbeKey:
+        """Build the cache key for the current version of a file"""
+        stat = os.stat(file_path)
+        return os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns
+
+    async def probe(
+        self,
+        file_path: str,
+        ffprobe_path: Optional[str] = None,
+        timeout: float = PROBE_TIMEOUT,
+    ) -> Dict[str, Any]:
+        """Get ffprobe format and stream information for a file
+
+        Args:
+            file_path: File to probe
+            ffprobe_path: ffprobe binary, defaults to the service's binary
+            timeout: Seconds before the probe is killed
+
+        Returns:
+            Parsed ffprobe JSON output
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            FFprobeError: If ffprobe fails or returns invalid output
+            TimeoutError: If ffprobe did not finish in time
+        """
+        key = self._key(file_path)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._stats["cache_hits"] += 1
+            return cached
+
+        binary = ffprobe_path or self.ffprobe_path
+        if not binary:
+            raise FFprobeError("No ffprobe binary configured")
+
+        returncode, stdout, stderr = await self.run(
+            [
+                str(binary),
+                "-v",
+                "quiet",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                file_path,
+            ],
+            timeout,
+        )
+        if returncode != 0:
+            raise FFprobeError(
+                f"FFprobe failed: {stderr.decode(errors='ignore').strip()}"
+            )
+        try:
+            result = json.loads(stdout)
+        except json.JSONDecodeError as e:
+            raise FFprobeError(f"Invalid FFprobe output for {file_path}: {e}")
+
+        self._cache[key] = result
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def invalidate(self, file_path: str) -> None:
+        """Drop cached results for a path"""
+        real_path = os.path.realpath(file_path)
+        for key in [k for k in self._cache if k[0] == real_path]:
+            del self._cache[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get probe pool statistics"""
+        return {
+            **self._stats,
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "cached": len(self._cache),
+        }
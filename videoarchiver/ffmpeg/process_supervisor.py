@@ -0,0 +1,416 @@
+"""Single supervisor for every FFmpeg and FFprobe subprocess"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import logging
+import itertools
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Deque, Dict, List, Optional, ClassVar
+
+import psutil  # type: ignore
+
+logger = logging.getLogger("VideoArchiver")
+
+POSIX = os.name == "posix"
+
+
+@dataclass
+class ProcessUsage:
+    """Resources used by one child process"""
+
+    cpu_user: float = 0.0
+    cpu_system: float = 0.0
+    max_rss: int = 0  # Bytes
+    wall_time: float = 0.0
+
+    @property
+    def cpu_time(self) -> float:
+        return self.cpu_user + self.cpu_system
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of a supervised run"""
+
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+    usage: ProcessUsage
+    timed_out: bool = False
+
+
+class SupervisedProcess:
+    """A child started by ProcessSupervisor
+
+    ``stdout`` and ``stderr`` are asyncio stream readers when piped. The
+    child leads its own process group, so signals reach anything it forks.
+    """
+
+    def __init__(
+        self,
+        process_id: int,
+        pid: int,
+        cmd: List[str],
+        job: str,
+        owner: Optional[object],
+        timeout: Optional[float],
+        stdout: Optional[asyncio.StreamReader],
+        stderr: Optional[asyncio.StreamReader],
+    ):
+        self.id = process_id
+        self.pid = pid
+        self.cmd = cmd
+        self.job = job
+        self.owner = owner
+        self.stdout = stdout
+        self.stderr = stderr
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout if timeout else None
+        self.usage = ProcessUsage()
+        self.returncode: Optional[int] = None
+        self.timed_out = False
+        self.exited: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._asyncio_process: Optional[asyncio.subprocess.Process] = None
+        self._psutil: Optional[Any] = None
+
+    @property
+    def name(self) -> str:
+        """Short description for logs"""
+        return self.job or os.path.basename(self.cmd[0])
+
+    async def wait(self) -> int:
+        """Wait for the child to exit and return its exit code"""
+        return await asyncio.shield(self.exited)
+
+    def send_signal(self, sig: int) -> None:
+        """Signal the child's process group"""
+        if self.returncode is not None:
+            return
+        try:
+            if POSIX:
+                os.killpg(self.pid, sig)
+            elif self._asyncio_process is not None:
+                if sig == signal.SIGTERM:
+                    self._asyncio_process.terminate()
+                else:
+                    self._asyncio_process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def kill(self) -> None:
+        """Kill the child's process group immediately"""
+        self.send_signal(getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    async def terminate(self, grace: float) -> None:
+        """Ask the group to exit, killing it if it is still running after grace"""
+        self.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(self.wait(), timeout=grace)
+        except asyncio.TimeoutError:
+            self.kill()
+            try:
+                await asyncio.wait_for(self.wait(), timeout=grace)
+            except asyncio.TimeoutError:
+                logger.error(f"Process {self.pid} ({self.name}) did not exit after SIGKILL")
+
+    def sample(self) -> None:
+        """Record CPU and memory use with psutil, where wait4 is unavailable"""
+        try:
+            if self._psutil is None:
+                self._psutil = psutil.Process(self.pid)
+            times = self._psutil.cpu_times()
+            self.usage.cpu_user = times.user + getattr(times, "children_user", 0.0)
+            self.usage.cpu_system = times.system + getattr(times, "children_system", 0.0)
+            self.usage.max_rss = max(self.usage.max_rss, self._psutil.memory_info().rss)
+        except Exception:
+            pass
+
+
+class ProcessSupervisor:
+    """Starts, accounts for and cleans up FFmpeg and FFprobe processes
+
+    Every child gets its own process group. Cleanup only signals the groups
+    this supervisor started, so other FFmpeg processes on the host are never
+    touched. On POSIX a waiter thread reaps each child with ``wait4``, which
+    gives its exact CPU time and peak RSS. Elsewhere these are sampled with
+    psutil. Per-job timeouts are enforced by a monitor task: a child past
+    its deadline is terminated, then killed after ``TERMINATE_GRACE``.
+    """
+
+    TERMINATE_GRACE: ClassVar[float] = 2.0
+    MONITOR_INTERVAL: ClassVar[float] = 0.5
+    MAX_WAITERS: ClassVar[int] = 64
+    HISTORY: ClassVar[int] = 100
+    STREAM_LIMIT: ClassVar[int] = 1024 * 1024
+
+    def __init__(self):
+        self._active: Dict[int, SupervisedProcess] = {}
+        self._sync: Dict[int, subprocess.Popen] = {}
+        self._ids = itertools.count(1)
+        self._waiters = ThreadPoolExecutor(
+            max_workers=self.MAX_WAITERS, thread_name_prefix="videoarchiver_wait"
+        )
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=self.HISTORY)
+        self._stats = {
+            "spawned": 0,
+            "timeouts": 0,
+            "terminated": 0,
+            "cpu_time": 0.0,
+            "peak_rss": 0,
+        }
+
+    async def spawn(
+        self,
+        cmd: List[str],
+        job: str = "",
+        owner: Optional[object] = None,
+        timeout: Optional[float] = None,
+        stdout: bool = True,
+        stderr: bool = True,
+    ) -> SupervisedProcess:
+        """Start a child in its own process group
+
+        Args:
+            cmd: Command and arguments
+            job: Description used in logs and stats
+            owner: Object whose processes terminate_owner stops together
+            timeout: Seconds before the child is terminated
+            stdout: Pipe stdout to a stream reader instead of discarding it
+            stderr: Pipe stderr to a stream reader instead of discarding it
+
+        Returns:
+            Handle to the running child
+        """
+        loop = asyncio.get_running_loop()
+        pipe = lambda wanted: subprocess.PIPE if wanted else subprocess.DEVNULL
+        if POSIX:
+            popen = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=pipe(stdout),
+                stderr=pipe(stderr),
+                start_new_session=True,
+            )
+            try:
+                handle = SupervisedProcess(
+                    next(self._ids), popen.pid, cmd, job, owner, timeout,
+                    await self._reader(popen.stdout) if stdout else None,
+                    await self._reader(popen.stderr) if stderr else None,
+                )
+            except BaseException:
+                os.killpg(popen.pid, signal.SIGKILL)
+                popen.wait()
+                raise
+            waiter = loop.run_in_executor(self._waiters, os.wait4, popen.pid, 0)
+            waiter.add_done_callback(lambda f: self._reaped(handle, popen, f))
+        else:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=pipe(stdout),
+                stderr=pipe(stderr),
+                limit=self.STREAM_LIMIT,
+                creationflags=getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0),
+            )
+            handle = SupervisedProcess(
+                next(self._ids), process.pid, cmd, job, owner, timeout,
+                process.stdout, process.stderr,
+            )
+            handle._asyncio_process = process
+            handle.sample()
+            loop.create_task(self._wait_asyncio(handle, process))
+
+        self._active[handle.id] = handle
+        self._stats["spawned"] += 1
+        if timeout or not POSIX:
+            self._ensure_monitor()
+        return handle
+
+    async def _reader(self, pipe) -> asyncio.StreamReader:
+        """Wrap a pipe in an asyncio stream reader"""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=self.STREAM_LIMIT, loop=loop)
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader, loop=loop), pipe
+        )
+        return reader
+
+    def _reaped(self, handle: SupervisedProcess, popen: subprocess.Popen, future) -> None:
+        """Record a child reaped by wait4"""
+        try:
+            _, status, rusage = future.result()
+            returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            scale = 1 if sys.platform == "darwin" else 1024
+            handle.usage.cpu_user = rusage.ru_utime
+            handle.usage.cpu_system = rusage.ru_stime
+            handle.usage.max_rss = rusage.ru_maxrss * scale
+        except Exception as e:
+            logger.error(f"Error reaping process {handle.pid}: {e}")
+            returncode = -1
+        # Keeps Popen from waiting on the reaped pid again
+        popen.returncode = returncode
+        self._finish(handle, returncode)
+
+    async def _wait_asyncio(
+        self, handle: SupervisedProcess, process: asyncio.subprocess.Process
+    ) -> None:
+        """Wait for a child started through asyncio"""
+        returncode = await process.wait()
+        self._finish(handle, returncode)
+
+    def _finish(self, handle: SupervisedProcess, returncode: int) -> None:
+        """Account for an exited child"""
+        handle.returncode = returncode
+        handle.usage.wall_time = time.monotonic() - handle.started
+        self._active.pop(handle.id, None)
+        self._stats["cpu_time"] += handle.usage.cpu_time
+        self._stats["peak_rss"] = max(self._stats["peak_rss"], handle.usage.max_rss)
+        self._history.append({"job": handle.name, "returncode": returncode, **asdict(handle.usage)})
+        if not handle.exited.done():
+            handle.exited.set_result(returncode)
+
+    def _ensure_monitor(self) -> None:
+        """Start the monitor task if it is not running"""
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.get_running_loop().create_task(self._monitor())
+
+    async def _monitor(self) -> None:
+        """Enforce deadlines and sample usage until no children are left"""
+        while self._active:
+            now = time.monotonic()
+            for handle in list(self._active.values()):
+                if not POSIX:
+                    handle.sample()
+                if handle.deadline and now > handle.deadline and not handle.timed_out:
+                    handle.timed_out = True
+                    self._stats["timeouts"] += 1
+                    logger.warning(
+                        f"{handle.name} exceeded its timeout after "
+                        f"{now - handle.started:.0f}s, terminating"
+                    )
+                    asyncio.ensure_future(handle.terminate(self.TERMINATE_GRACE))
+            await asyncio.sleep(self.MONITOR_INTERVAL)
+
+    async def run(
+        self,
+        cmd: List[str],
+        job: str = "",
+        owner: Optional[object] = None,
+        timeout: Optional[float] = None,
+    ) -> ProcessResult:
+        """Run a child to completion and collect its output
+
+        A cancelled caller has the child terminated before the cancellation
+        propagates. A child that exceeds its timeout is terminated and its
+        result has ``timed_out`` set.
+        """
+        handle = await self.spawn(cmd, job, owner, timeout)
+        try:
+            stdout, stderr = await asyncio.gather(handle.stdout.read(), handle.stderr.read())
+            returncode = await handle.wait()
+        except asyncio.CancelledError:
+            await self.stop(handle)
+            raise
+        return ProcessResult(returncode, stdout, stderr, handle.usage, handle.timed_out)
+
+    def run_sync(
+        self,
+        cmd: List[str],
+        timeout: Optional[float] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> subprocess.CompletedProcess:
+        """Run a short child from synchronous code, e.g. startup checks
+
+        Raises:
+            subprocess.TimeoutExpired: If the child did not finish in time;
+                its process group is killed first
+        """
+        popen = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env,
+            start_new_session=POSIX,
+        )
+        self._sync[popen.pid] = popen
+        self._stats["spawned"] += 1
+        try:
+            stdout, stderr = popen.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._stats["timeouts"] += 1
+            self._kill_popen(popen)
+            popen.communicate()
+            raise
+        finally:
+            self._sync.pop(popen.pid, None)
+        return subprocess.CompletedProcess(cmd, popen.returncode, stdout, stderr)
+
+    @staticmethod
+    def _kill_popen(popen: subprocess.Popen) -> None:
+        """Kill a synchronous child's process group"""
+        if popen.poll() is not None:
+            return
+        try:
+            if POSIX:
+                os.killpg(popen.pid, signal.SIGKILL)
+            else:
+                popen.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def stop(self, handle: SupervisedProcess) -> None:
+        """Terminate one child if it is still running"""
+        if handle.returncode is None:
+            self._stats["terminated"] += 1
+            await handle.terminate(self.TERMINATE_GRACE)
+
+    async def terminate_owner(self, owner: object) -> None:
+        """Terminate the running children of one owner"""
+        handles = [h for h in self._active.values() if h.owner is owner]
+        await asyncio.gather(*(self.stop(h) for h in handles))
+
+    def kill_owner(self, owner: object) -> None:
+        """Kill the running children of one owner immediately"""
+        for handle in [h for h in self._active.values() if h.owner is owner]:
+            self._stats["terminated"] += 1
+            handle.kill()
+
+    async def terminate_all(self) -> None:
+        """Terminate every running child"""
+        await asyncio.gather(*(self.stop(h) for h in list(self._active.values())))
+
+    def kill_all(self) -> None:
+        """Kill every running child immediately, from synchronous code"""
+        for handle in list(self._active.values()):
+            self._stats["terminated"] += 1
+            handle.kill()
+        for popen in list(self._sync.values()):
+            self._kill_popen(popen)
+        if self._active or self._sync:
+            logger.info("Killed all supervised FFmpeg processes")
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Describe the running children"""
+        now = time.monotonic()
+        return [
+            {"pid": h.pid, "job": h.name, "runtime": now - h.started}
+            for h in self._active.values()
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get process counts and resource totals"""
+        return {
+            **self._stats,
+            "active": len(self._active) + len(self._sync),
+            "recent": list(self._history)[-10:],
+        }
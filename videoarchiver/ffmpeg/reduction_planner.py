@@ -0,0 +1,177 @@
+"""Tiered size reduction: remux, audio-only re-encode, full re-encode"""
+
+import logging
+from enum import Enum
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, ClassVar, Tuple
+
+logger = logging.getLogger("VideoArchiver")
+
+
+class ReductionTier(Enum):
+    """Ways to shrink a file, cheapest first"""
+
+    REMUX = "remux"  # Copy both streams into a fresh MP4
+    AUDIO = "audio"  # Copy video, re-encode audio smaller
+    VIDEO = "video"  # Full re-encode
+
+
+@dataclass
+class ReductionPlan:
+    """The tier chosen for a file and the size it is expected to reach"""
+
+    tier: ReductionTier
+    estimated_size: int
+    audio_bitrate: int = 0
+    audio_channels: int = 0
+    reason: str = ""
+
+    @property
+    def encoder(self) -> str:
+        """Short description of the codecs used, for logs and attempt records"""
+        if self.tier == ReductionTier.REMUX:
+            return "copy"
+        if self.tier == ReductionTier.AUDIO:
+            return f"copy+aac {self.audio_bitrate // 1000}k/{self.audio_channels}ch"
+        return "encode"
+
+
+class ReductionPlanner:
+    """Picks the cheapest way to bring a file under a size limit
+
+    Sizes are estimated from the probe: per-stream bitrates where the
+    container reports them, otherwise the format bitrate minus the other
+    streams. Only the first video and audio streams are kept, so subtitle,
+    attachment and extra audio tracks count as savings. Stream copy tiers
+    need a safety margin because the estimates come from average bitrates.
+    """
+
+    SAFETY_MARGIN: ClassVar[float] = 0.97
+    MP4_OVERHEAD: ClassVar[float] = 0.01
+    FIXED_OVERHEAD: ClassVar[int] = 32 * 1024
+    DEFAULT_AUDIO_BITRATE: ClassVar[int] = 128_000
+    # Codecs that can be copied into MP4 and still play in Discord
+    COPY_VIDEO_CODECS: ClassVar[Tuple[str, ...]] = ("h264", "hevc", "av1", "vp9")
+    COPY_AUDIO_CODECS: ClassVar[Tuple[str, ...]] = ("aac", "mp3", "opus")
+    # (bitrate, channels), best quality first
+    AUDIO_LADDER: ClassVar[Tuple[Tuple[int, int], ...]] = (
+        (128_000, 2),
+        (96_000, 2),
+        (64_000, 2),
+    )
+    DOWNMIX_LADDER: ClassVar[Tuple[Tuple[int, int], ...]] = (
+        (48_000, 1),
+        (32_000, 1),
+    )
+
+    @staticmethod
+    def stream_bitrate(stream: Optional[Dict[str, Any]]) -> Optional[int]:
+        """Get a stream's bitrate from the probe, if the container reports it"""
+        if not stream:
+            return None
+        tags = stream.get("tags", {})
+        # Matroska muxers store it as a BPS statistics tag
+        for value in (stream.get("bit_rate"), tags.get("BPS"), tags.get("BPS-eng")):
+            try:
+                if value and int(value) > 0:
+                    return int(value)
+            except (TypeError, ValueError):
+                continue
+        return None
+
+    def estimate_payload(
+        self, probe: Dict[str, Any], size: int, duration: float
+    ) -> Tuple[int, int]:
+        """Estimate the bytes of the first video and audio streams
+
+        Returns:
+            Tuple of (video bytes, audio bytes)
+        """
+        streams = probe.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+        try:
+            total_bps = int(probe.get("format", {}).get("bit_rate") or 0)
+        except (TypeError, ValueError):
+            total_bps = 0
+        if total_bps <= 0 and duration > 0:
+            total_bps = int(size * 8 / duration)
+
+        video_bps = self.stream_bitrate(video)
+        audio_bps = self.stream_bitrate(audio) if audio else 0
+        if audio and audio_bps is None:
+            audio_bps = (
+                max(0, total_bps - video_bps)
+                if video_bps is not None
+                else self.DEFAULT_AUDIO_BITRATE
+            )
+        if video_bps is None:
+            video_bps = max(0, total_bps - audio_bps)
+
+        return int(video_bps * duration / 8), int(audio_bps * duration / 8)
+
+    def mp4_size(self, payload: int) -> int:
+        """Estimate the size of an MP4 holding this many bytes of streams"""
+        return int(payload * (1 + self.MP4_OVERHEAD)) + self.FIXED_OVERHEAD
+
+    def plan(
+        self,
+        probe: Dict[str, Any],
+        size: int,
+        duration: float,
+        target_bytes: int,
+        allow_downmix: bool = False,
+    ) -> ReductionPlan:
+        """Choose the cheapest tier expected to fit the target
+
+        Args:
+            probe: ffprobe output for the file
+            size: Current file size in bytes
+            duration: Duration in seconds
+            target_bytes: Size limit in bytes
+            allow_downmix: Allow mono audio at low bitrates
+
+        Returns:
+            The plan; the VIDEO tier when no copy tier is expected to fit
+        """
+        streams = probe.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+        limit = target_bytes * self.SAFETY_MARGIN
+
+        if duration <= 0 or not video:
+            return ReductionPlan(ReductionTier.VIDEO, target_bytes, reason="no usable probe data")
+        if video.get("codec_name") not in self.COPY_VIDEO_CODECS:
+            return ReductionPlan(
+                ReductionTier.VIDEO, target_bytes,
+                reason=f"video codec {video.get('codec_name')} cannot be copied",
+            )
+
+        video_bytes, audio_bytes = self.estimate_payload(probe, size, duration)
+
+        if not audio or audio.get("codec_name") in self.COPY_AUDIO_CODECS:
+            estimate = self.mp4_size(video_bytes + audio_bytes)
+            if estimate <= limit:
+                return ReductionPlan(ReductionTier.REMUX, estimate, reason="container overhead")
+
+        if audio:
+            audio_bps = audio_bytes * 8 / duration
+            ladder: List[Tuple[int, int]] = list(self.AUDIO_LADDER)
+            if allow_downmix:
+                ladder.extend(self.DOWNMIX_LADDER)
+            for bitrate, channels in ladder:
+                if bitrate >= audio_bps and audio.get("codec_name") in self.COPY_AUDIO_CODECS:
+                    # Would not make the audio any smaller
+                    continue
+                estimate = self.mp4_size(video_bytes + int(bitrate * duration / 8))
+                if estimate <= limit:
+                    return ReductionPlan(
+                        ReductionTier.AUDIO, estimate, bitrate, channels,
+                        reason="audio track too large",
+                    )
+
+        return ReductionPlan(
+            ReductionTier.VIDEO, target_bytes,
+            reason=f"video stream alone is about {video_bytes} bytes",
+        )
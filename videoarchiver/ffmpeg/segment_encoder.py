@@ -0,0 +1,512 @@
+"""Parallel segment encoding for long videos
+
+Can also be run on its own to compare wall time against a single process:
+
+    python ffmpeg/segment_encoder.py input.mp4 --ffmpeg /path/to/ffmpeg
+"""
+
+import os
+import sys
+import json
+import bisect
+import asyncio
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, ClassVar, Tuple
+
+# try:
+# Try relative imports first
+from probe_service import ProbeService
+from encode_scheduler import EncodeScheduler
+from size_targeting import SizeTargetPlanner
+from process_supervisor import ProcessSupervisor
+
+# except ImportError:
+# Fall back to absolute imports if relative imports fail
+# from videoarchiver.ffmpeg.probe_service import ProbeService
+# from videoarchiver.ffmpeg.encode_scheduler import EncodeScheduler
+# from videoarchiver.ffmpeg.size_targeting import SizeTargetPlanner
+# from videoarchiver.ffmpeg.process_supervisor import ProcessSupervisor
+
+logger = logging.getLogger("VideoArchiver")
+
+# Runs one FFmpeg command: (command, seconds of input, percent callback) -> success
+SegmentRunner = Callable[[List[str], float, Callable[[float], None]], Awaitable[bool]]
+
+
+@dataclass
+class Segment:
+    """A keyframe-aligned span of the input"""
+
+    index: int
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class SegmentBudget:
+    """Video bytes shared by the segments of one encode
+
+    A segment is given the bitrate that spreads the bytes left over the
+    input not yet started. Once it finishes, the difference between its
+    share and its real size goes back to the pool, so segments that start
+    later make up for earlier ones that missed.
+    """
+
+    def __init__(self, total_bytes: int, total_duration: float, min_bitrate: int):
+        self.remaining_bytes = total_bytes
+        self.unassigned = total_duration
+        self.min_bitrate = min_bitrate
+        self._reserved: Dict[int, int] = {}
+
+    def reserve(self, segment: Segment) -> int:
+        """Assign a segment its bitrate in bits per second"""
+        share = segment.duration / max(self.unassigned, segment.duration, 1e-6)
+        reserved = max(0, int(self.remaining_bytes * share))
+        bitrate = max(self.min_bitrate, int(reserved * 8 / max(segment.duration, 1e-6)))
+        self._reserved[segment.index] = reserved
+        self.remaining_bytes -= reserved
+        self.unassigned = max(0.0, self.unassigned - segment.duration)
+        return bitrate
+
+    def settle(self, segment: Segment, actual_bytes: int) -> None:
+        """Return a finished segment's unused bytes, or charge its overshoot"""
+        self.remaining_bytes += self._reserved.pop(segment.index, 0) - actual_bytes
+
+
+class SegmentEncoder:
+    """Encodes long inputs as keyframe-aligned segments in parallel
+
+    x264 stops scaling well before the core counts of larger hosts, so a
+    long input is cut at keyframes into segments. The segments are encoded
+    by separate FFmpeg processes, each with cores from the encode scheduler,
+    and joined with the concat demuxer. Audio is encoded once for the whole
+    input so segment boundaries never cause audio gaps. Inputs shorter than
+    ``min_duration`` or with too few keyframes use a single process.
+    """
+
+    DEFAULT_MIN_DURATION: ClassVar[float] = 180.0
+    MIN_SEGMENT_SECONDS: ClassVar[float] = 30.0
+    MAX_SEGMENTS: ClassVar[int] = 8
+    THREADS_PER_SEGMENT: ClassVar[int] = 4
+    ENCODERS: ClassVar[Tuple[str, ...]] = ("libx264",)
+    AUDIO_KEYS: ClassVar[Tuple[str, ...]] = ("c:a", "b:a", "ar", "ac")
+    # Handled per segment or by the concat step
+    SKIPPED_KEYS: ClassVar[Tuple[str, ...]] = (
+        "threads", "movflags", "b:v", "maxrate", "bufsize",
+    )
+    KEYFRAME_TIMEOUT: ClassVar[float] = 60.0
+
+    def __init__(
+        self,
+        probe_service: ProbeService,
+        min_duration: float = DEFAULT_MIN_DURATION,
+        max_segments: int = MAX_SEGMENTS,
+    ):
+        """Initialize the segment encoder
+
+        Args:
+            probe_service: Runs the keyframe scan
+            min_duration: Shortest input in seconds worth splitting
+            max_segments: Most segments one input is split into
+        """
+        self.probe_service = probe_service
+        self.min_duration = min_duration
+        self.max_segments = max_segments
+        self._stats = {"planned": 0, "encoded": 0, "failed": 0, "too_few_keyframes": 0}
+
+    def segment_count(self, duration: float, total_cores: int) -> int:
+        """Number of segments worth encoding in parallel, 1 for a single process"""
+        if duration < self.min_duration:
+            return 1
+        return max(1, min(
+            self.max_segments,
+            total_cores // self.THREADS_PER_SEGMENT,
+            int(duration // self.MIN_SEGMENT_SECONDS),
+        ))
+
+    async def keyframe_times(self, ffprobe_path: str, input_file: str) -> List[float]:
+        """Get the keyframe times of the first video stream
+
+        Reads packet flags only, so nothing is decoded. Times are relative
+        to the start of the file, as ``-ss`` expects them.
+        """
+        cmd = [
+            str(ffprobe_path), "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags:format=start_time",
+            "-of", "json",
+            input_file,
+        ]
+        returncode, stdout, stderr = await self.probe_service.run(cmd, self.KEYFRAME_TIMEOUT)
+        if returncode != 0:
+            logger.warning(
+                f"Keyframe scan of {os.path.basename(input_file)} failed: "
+                f"{stderr.decode(errors='ignore').strip()[-200:]}"
+            )
+            return []
+
+        data = json.loads(stdout or b"{}")
+        try:
+            start_time = float(data.get("format", {}).get("start_time") or 0)
+        except ValueError:
+            start_time = 0.0
+        times = set()
+        for packet in data.get("packets", []):
+            if not packet.get("flags", "").startswith("K"):
+                continue
+            try:
+                times.add(round(float(packet["pts_time"]) - start_time, 6))
+            except (KeyError, ValueError):
+                continue
+        return sorted(times)
+
+    def plan_segments(
+        self, keyframes: List[float], duration: float, count: int
+    ) -> List[Segment]:
+        """Cut the input at the keyframes closest to equal spacing
+
+        Returns:
+            The segments; a single segment if no usable cut points exist
+        """
+        cuts: List[float] = []
+        min_gap = self.MIN_SEGMENT_SECONDS / 2
+        for i in range(1, count):
+            target = duration * i / count
+            pos = bisect.bisect_left(keyframes, target)
+            candidates = keyframes[max(0, pos - 1):pos + 1]
+            if not candidates:
+                continue
+            cut = min(candidates, key=lambda t: abs(t - target))
+            if cut - (cuts[-1] if cuts else 0.0) >= min_gap and duration - cut >= min_gap:
+                cuts.append(cut)
+
+        bounds = [0.0] + cuts + [duration]
+        return [
+            Segment(index, bounds[index], bounds[index + 1])
+            for index in range(len(bounds) - 1)
+        ]
+
+    async def plan(
+        self, ffprobe_path: str, input_file: str, duration: float, total_cores: int
+    ) -> Optional[List[Segment]]:
+        """Plan a segmented encode
+
+        Returns:
+            Two or more segments, or None if the input should be encoded by a
+            single process
+        """
+        count = self.segment_count(duration, total_cores)
+        if count < 2:
+            return None
+        keyframes = await self.keyframe_times(ffprobe_path, input_file)
+        segments = self.plan_segments(keyframes, duration, count)
+        if len(segments) < 2:
+            self._stats["too_few_keyframes"] += 1
+            return None
+        self._stats["planned"] += 1
+        return segments
+
+    def video_args(self, params: Dict[str, str], bitrate: int, threads: int) -> List[str]:
+        """Build the encoder arguments of one segment"""
+        args: List[str] = []
+        for key, value in params.items():
+            if key in self.AUDIO_KEYS or key in self.SKIPPED_KEYS:
+                continue
+            args.extend([f"-{key}", str(value)])
+        return args + [
+            "-b:v", str(bitrate),
+            "-maxrate", str(int(bitrate * 1.5)),
+            "-bufsize", str(int(bitrate * 2)),
+            "-threads", str(threads),
+        ]
+
+    def segment_commands(
+        self,
+        ffmpeg_path: str,
+        input_file: str,
+        segment: Segment,
+        params: Dict[str, str],
+        bitrate: int,
+        threads: int,
+        output_file: str,
+        passlog: Optional[str] = None,
+    ) -> List[List[str]]:
+        """Build the FFmpeg invocations that encode one segment
+
+        Returns:
+            One command, or two for a two-pass encode
+        """
+        base = [
+            str(ffmpeg_path), "-y", "-nostats", "-loglevel", "error",
+            # Starts at a keyframe, so input seeking is exact
+            "-ss", f"{segment.start:.6f}",
+            "-i", input_file,
+            "-t", f"{segment.duration:.6f}",
+            "-progress", "pipe:1",
+            "-map", "0:v:0", "-an", "-sn", "-dn",
+        ]
+        args = self.video_args(params, bitrate, threads)
+        if not passlog:
+            return [base + args + ["-f", "mp4", output_file]]
+        return [
+            base + args + ["-pass", "1", "-passlogfile", passlog, "-f", "null", os.devnull],
+            base + args + ["-pass", "2", "-passlogfile", passlog, "-f", "mp4", output_file],
+        ]
+
+    def audio_command(
+        self, ffmpeg_path: str, input_file: str, params: Dict[str, str], output_file: str
+    ) -> List[str]:
+        """Build the audio encode for the whole input"""
+        cmd = [
+            str(ffmpeg_path), "-y", "-nostats", "-loglevel", "error",
+            "-i", input_file, "-progress", "pipe:1",
+            "-map", "0:a:0", "-vn", "-sn", "-dn",
+        ]
+        audio = {key: params[key] for key in self.AUDIO_KEYS if key in params}
+        audio.setdefault("c:a", "aac")
+        for key, value in audio.items():
+            cmd.extend([f"-{key}", str(value)])
+        return cmd + ["-f", "mp4", output_file]
+
+    @staticmethod
+    def concat_command(
+        ffmpeg_path: str, list_file: str, audio_file: Optional[str], output_file: str
+    ) -> List[str]:
+        """Build the stream copy that joins the segments and the audio"""
+        cmd = [
+            str(ffmpeg_path), "-y", "-nostats", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_file,
+        ]
+        if audio_file:
+            cmd.extend(["-i", audio_file])
+        cmd.extend(["-progress", "pipe:1", "-map", "0:v:0"])
+        if audio_file:
+            cmd.extend(["-map", "1:a:0"])
+        return cmd + ["-c", "copy", "-movflags", "+faststart", output_file]
+
+    @staticmethod
+    def write_concat_list(list_file: str, paths: List[str]) -> None:
+        """Write a concat demuxer list"""
+        with open(list_file, "w") as f:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+    async def encode(
+        self,
+        ffmpeg_path: str,
+        input_file: str,
+        output_file: str,
+        segments: List[Segment],
+        params: Dict[str, str],
+        duration: float,
+        has_audio: bool,
+        scheduler: EncodeScheduler,
+        runner: SegmentRunner,
+        priority: int = 0,
+        two_pass: bool = False,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ) -> bool:
+        """Encode the segments in parallel and join them
+
+        Args:
+            ffmpeg_path: FFmpeg binary
+            input_file: Input video
+            output_file: Joined MP4
+            segments: Segments from plan
+            params: Encoding parameters; b:v is the budget for the whole video
+            duration: Duration of the input in seconds
+            has_audio: Whether the input has an audio stream
+            scheduler: Grants each segment its cores
+            runner: Runs one FFmpeg command
+            priority: Scheduler priority
+            two_pass: Encode each segment in two passes
+            progress_callback: Called with the overall percent
+
+        Returns:
+            Whether the output was written
+        """
+        video_bitrate = SizeTargetPlanner.parse_bitrate(params.get("b:v"))
+        budget = SegmentBudget(
+            int(video_bitrate * duration / 8), duration, SizeTargetPlanner.MIN_VIDEO_BITRATE
+        )
+        threads = max(scheduler.min_threads, scheduler.total_cores // len(segments))
+        passes = 2 if two_pass else 1
+        done: Dict[int, float] = {}
+        label = os.path.basename(input_file)
+
+        def report(index: int, seconds: float) -> None:
+            done[index] = seconds
+            if progress_callback:
+                progress_callback(min(100.0, sum(done.values()) / max(duration, 1e-6) * 100))
+
+        with tempfile.TemporaryDirectory(
+            prefix="segments_", dir=os.path.dirname(os.path.abspath(output_file))
+        ) as temp_dir:
+            segment_files = [
+                os.path.join(temp_dir, f"segment_{s.index:03d}.mp4") for s in segments
+            ]
+            audio_file = os.path.join(temp_dir, "audio.m4a") if has_audio else None
+
+            async def encode_audio() -> bool:
+                async with scheduler.reserve(priority, 1, f"{label} [audio]"):
+                    return await runner(
+                        self.audio_command(ffmpeg_path, input_file, params, audio_file),
+                        duration, lambda percent: None,
+                    )
+
+            async def encode_segment(segment: Segment) -> bool:
+                async with scheduler.reserve(
+                    priority, threads, f"{label} [{segment.index + 1}/{len(segments)}]"
+                ) as slot:
+                    bitrate = budget.reserve(segment)
+                    commands = self.segment_commands(
+                        ffmpeg_path, input_file, segment, params, bitrate, slot.threads,
+                        segment_files[segment.index],
+                        os.path.join(temp_dir, f"pass_{segment.index:03d}") if two_pass else None,
+                    )
+                    for number, cmd in enumerate(commands):
+                        def on_progress(percent: float, number: int = number) -> None:
+                            report(
+                                segment.index,
+                                (number + percent / 100) / passes * segment.duration,
+                            )
+
+                        if not await runner(cmd, segment.duration, on_progress):
+                            budget.settle(segment, 0)
+                            return False
+                    budget.settle(segment, os.path.getsize(segment_files[segment.index]))
+                    return True
+
+            # Audio first so it is not queued behind the segments
+            jobs = [encode_audio()] if has_audio else []
+            jobs.extend(encode_segment(segment) for segment in segments)
+            tasks = [asyncio.ensure_future(job) for job in jobs]
+            try:
+                results = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            if not all(results):
+                self._stats["failed"] += 1
+                return False
+
+            list_file = os.path.join(temp_dir, "segments.txt")
+            self.write_concat_list(list_file, segment_files)
+            if not await runner(
+                self.concat_command(ffmpeg_path, list_file, audio_file, output_file),
+                duration, lambda percent: None,
+            ):
+                self._stats["failed"] += 1
+                return False
+
+        self._stats["encoded"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get segmented encode counters"""
+        return dict(self._stats)
+
+
+async def _run_benchmark(args: argparse.Namespace) -> Dict[str, float]:
+    """Encode the input both ways and print wall time, CPU time and size"""
+    loop = asyncio.get_running_loop()
+    supervisor = ProcessSupervisor()
+
+    async def run_command(
+        cmd: List[str], duration: float, callback: Callable[[float], None]
+    ) -> bool:
+        result = await supervisor.run(cmd, job="benchmark")
+        if result.returncode != 0:
+            print(result.stderr.decode(errors="ignore").strip()[-500:], file=sys.stderr)
+        return result.returncode == 0
+
+    probe_service = ProbeService(args.ffprobe, supervisor=supervisor)
+    probe = await probe_service.probe(args.input)
+    duration = float(probe.get("format", {}).get("duration") or 0)
+    has_audio = any(s.get("codec_type") == "audio" for s in probe.get("streams", []))
+    params = {
+        "c:v": "libx264", "preset": args.preset, "pix_fmt": "yuv420p",
+        "b:v": str(args.bitrate), "c:a": "aac", "b:a": "128k",
+    }
+    encoder = SegmentEncoder(probe_service, min_duration=0, max_segments=args.segments)
+    keyframes = await encoder.keyframe_times(args.ffprobe, args.input)
+    results: Dict[str, float] = {}
+
+    async def run_single(output_file: str) -> bool:
+        # The command line CompressionHandler runs when it does not segment
+        passlog = os.path.join(temp_dir, "single_pass") if args.two_pass else None
+        for cmd in SizeTargetPlanner.encode_commands(
+            args.ffmpeg, args.input, output_file, params, passlog
+        ):
+            if not await run_command(cmd, duration, lambda percent: None):
+                return False
+        return True
+
+    with tempfile.TemporaryDirectory(prefix="segment_benchmark_") as temp_dir:
+        for name in ("single", "segmented"):
+            output_file = os.path.join(temp_dir, f"{name}.mp4")
+            started = loop.time()
+            cpu_before = supervisor.get_stats()["cpu_time"]
+            if name == "single":
+                segment_count = 1
+                success = await run_single(output_file)
+            else:
+                segments = encoder.plan_segments(keyframes, duration, args.segments)
+                segment_count = len(segments)
+                success = await encoder.encode(
+                    args.ffmpeg, args.input, output_file, segments, params, duration,
+                    has_audio, EncodeScheduler(args.cores), run_command,
+                    two_pass=args.two_pass,
+                )
+            elapsed = loop.time() - started
+            cpu_time = supervisor.get_stats()["cpu_time"] - cpu_before
+            if not success:
+                print(f"{name}: failed")
+                continue
+            results[name] = elapsed
+            size = os.path.getsize(output_file)
+            print(
+                f"{name:<10} {segment_count} segment(s) {elapsed:7.1f}s wall "
+                f"{cpu_time:7.1f}s CPU {size / 1024 / 1024:7.1f}MB "
+                f"({duration / elapsed:.1f}x realtime)"
+            )
+
+    if "single" in results and "segmented" in results:
+        print(f"speedup: {results['single'] / results['segmented']:.2f}x")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the benchmark"""
+    cores = multiprocessing.cpu_count()
+    parser = argparse.ArgumentParser(
+        description="Compare single-process and segmented encode wall time"
+    )
+    parser.add_argument("input", help="Video to encode")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="FFmpeg binary")
+    parser.add_argument("--ffprobe", default="ffprobe", help="FFprobe binary")
+    parser.add_argument("--cores", type=int, default=cores)
+    parser.add_argument(
+        "--segments", type=int,
+        default=max(2, min(SegmentEncoder.MAX_SEGMENTS, cores // SegmentEncoder.THREADS_PER_SEGMENT)),
+    )
+    parser.add_argument("--bitrate", type=int, default=2_000_000, help="Video bits per second")
+    parser.add_argument("--preset", default="medium")
+    parser.add_argument("--two-pass", action="store_true")
+    args = parser.parse_args(argv)
+    asyncio.run(_run_benchmark(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Size-targeted encoding: bitrate planning, two-pass arguments and convergence"""
+
+import os
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, ClassVar, Tuple
+
+logger = logging.getLogger("VideoArchiver")
+
+
+@dataclass
+class EncodeAttempt:
+    """One encode of a size-targeted job"""
+
+    video_bitrate: int
+    size: int
+    encoder: str
+    passes: int  # 0 for a stream copy tier
+    fits: bool
+
+    @property
+    def is_encode(self) -> bool:
+        """Whether this attempt re-encoded the video rather than copied it"""
+        return self.passes > 0
+
+
+class SizeTargetPlanner:
+    """Plans encodes that land under a byte budget
+
+    The first attempt uses an average bitrate computed from the budget. For
+    libx264 that encode is a true two-pass ABR, which normally lands within a
+    few percent. If an attempt still overshoots, the next video bitrate is
+    predicted from how far the attempt overshot its video budget. At most
+    ``max_attempts`` encodes are made per job.
+    """
+
+    DEFAULT_MAX_ATTEMPTS: ClassVar[int] = 3
+    SAFETY_MARGIN: ClassVar[float] = 0.95  # Aim below the limit
+    CONTAINER_OVERHEAD: ClassVar[float] = 0.02  # MP4 muxing overhead
+    MIN_VIDEO_BITRATE: ClassVar[int] = 64_000
+    TWO_PASS_ENCODERS: ClassVar[Tuple[str, ...]] = ("libx264",)
+    # Quality-targeting options that override average bitrate control
+    QUALITY_KEYS: ClassVar[Tuple[str, ...]] = (
+        "crf",
+        "cq:v",
+        "global_quality",
+        "init_qpP",
+    )
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.max_attempts = max(1, max_attempts)
+
+    @staticmethod
+    def parse_bitrate(value: Optional[str]) -> int:
+        """Parse an FFmpeg bitrate such as "128k" or "800000" into bps"""
+        if not value:
+            return 0
+        value = str(value).strip().lower()
+        multiplier = 1
+        if value.endswith("k"):
+            multiplier, value = 1000, value[:-1]
+        elif value.endswith("m"):
+            multiplier, value = 1_000_000, value[:-1]
+        try:
+            return int(float(value) * multiplier)
+        except ValueError:
+            return 0
+
+    def audio_bitrate(self, params: Dict[str, str], has_audio: bool) -> int:
+        """Audio bitrate to reserve in the budget, 0 if there is no audio"""
+        return self.parse_bitrate(params.get("b:a")) if has_audio else 0
+
+    @staticmethod
+    def count_encodes(attempts: List[EncodeAttempt]) -> int:
+        """Number of real encodes among a job's attempts"""
+        return sum(1 for attempt in attempts if attempt.is_encode)
+
+    def video_budget(self, target_bytes: int, duration: float, audio_bps: int) -> int:
+        """Bytes available for the video stream within the target"""
+        usable = target_bytes * self.SAFETY_MARGIN * (1 - self.CONTAINER_OVERHEAD)
+        return int(usable - audio_bps * duration / 8)
+
+    def initial_bitrate(self, target_bytes: int, duration: float, audio_bps: int) -> int:
+        """Video bitrate that fills the budget for a clip of this duration"""
+        if duration <= 0:
+            raise ValueError("Invalid video duration")
+        bitrate = int(self.video_budget(target_bytes, duration, audio_bps) * 8 / duration)
+        return max(self.MIN_VIDEO_BITRATE, bitrate)
+
+    def next_bitrate(
+        self,
+        attempt: EncodeAttempt,
+        target_bytes: int,
+        duration: float,
+        audio_bps: int,
+    ) -> Optional[int]:
+        """Predict the video bitrate for the next attempt after an overshoot
+
+        Returns:
+            The new bitrate, or None if no lower bitrate can help
+        """
+        budget = self.video_budget(target_bytes, duration, audio_bps)
+        produced = attempt.size * (1 - self.CONTAINER_OVERHEAD) - audio_bps * duration / 8
+        if budget <= 0 or produced <= 0:
+            return None
+        predicted = int(attempt.video_bitrate * budget / produced * self.SAFETY_MARGIN)
+        # Always move down by at least 5% so the loop makes progress
+        predicted = min(predicted, int(attempt.video_bitrate * 0.95))
+        if predicted < self.MIN_VIDEO_BITRATE:
+            if attempt.video_bitrate <= self.MIN_VIDEO_BITRATE:
+                return None
+            predicted = self.MIN_VIDEO_BITRATE
+        return predicted
+
+    def apply_bitrate(self, params: Dict[str, str], video_bitrate: int) -> Dict[str, str]:
+        """Switch encoding parameters to average bitrate control"""
+        params = {k: v for k, v in params.items() if k not in self.QUALITY_KEYS}
+        params.update(
+            {
+                "b:v": str(video_bitrate),
+                "maxrate": str(int(video_bitrate * 1.5)),
+                "bufsize": str(int(video_bitrate * 2)),
+            }
+        )
+        return params
+
+    def uses_two_pass(self, params: Dict[str, str]) -> bool:
+        """Check whether the encoder supports a two-pass ABR encode"""
+        return params.get("c:v") in self.TWO_PASS_ENCODERS
+
+    @staticmethod
+    def pass_args(
+        params: Dict[str, str], pass_number: int, passlog: str
+    ) -> Tuple[List[str], List[str]]:
+        """Build encoder arguments and output arguments for one pass
+
+        Args:
+            params: Encoding parameters for the job
+            pass_number: 1 or 2
+            passlog: Prefix for the pass statistics files
+
+        Returns:
+            Tuple of (codec arguments, output arguments); the first pass
+            drops audio and writes to the null muxer
+        """
+        args: List[str] = []
+        for key, value in params.items():
+            if pass_number == 1 and (key.startswith("c:a") or key in ("b:a", "ar", "ac", "movflags")):
+                continue
+            args.extend([f"-{key}", str(value)])
+        args.extend(["-pass", str(pass_number), "-passlogfile", passlog])
+        if pass_number == 1:
+            return args + ["-an"], ["-f", "null", os.devnull]
+        return args, []
+
+    @classmethod
+    def encode_commands(
+        cls,
+        ffmpeg_path: str,
+        input_file: str,
+        output_file: str,
+        params: Dict[str, str],
+        passlog: Optional[str] = None,
+    ) -> List[List[str]]:
+        """Build the FFmpeg commands of a single-process encode
+
+        Args:
+            ffmpeg_path: FFmpeg binary
+            input_file: Video to encode
+            output_file: Where to write the encode
+            params: Encoding parameters for the job
+            passlog: Prefix for the pass statistics files; when given the
+                encode is two-pass, otherwise it is a single pass
+
+        Returns:
+            One command per pass, progress is written to stdout
+        """
+        base_cmd = [
+            ffmpeg_path, "-y", "-nostats", "-loglevel", "error",
+            "-i", input_file, "-progress", "pipe:1",
+        ]
+        if passlog is None:
+            cmd = list(base_cmd)
+            for key, value in params.items():
+                cmd.extend([f"-{key}", str(value)])
+            return [cmd + [output_file]]
+
+        commands = []
+        for pass_number in (1, 2):
+            codec_args, output_args = cls.pass_args(params, pass_number, passlog)
+            commands.append(base_cmd + codec_args + (output_args or [output_file]))
+        return commands
+
+    @staticmethod
+    def summarize(attempts: List[EncodeAttempt]) -> str:
+        """Describe a job's attempts for logging"""
+        return ", ".join(
+            f"#{i + 1} {a.encoder} -> {a.size} bytes"
+            if not a.passes  # Stream copy
+            else f"#{i + 1} {a.encoder} {a.passes}-pass {a.video_bitrate // 1000}k -> {a.size} bytes"
+            for i, a in enumerate(attempts)
+        )
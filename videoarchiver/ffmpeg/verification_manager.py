@@ -2,9 +2,10 @@
 
 import logging
 import os
+import time
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 # try:
 # Try relative imports first
@@ -30,8 +31,8 @@ logger = logging.getLogger("FFmpegVerification")
 class VerificationManager:
     """Handles verification of FFmpeg functionality"""
 
-    def __init__(self, process_manager):
-        self.process_manager = process_manager
+    def __init__(self, process_supervisor):
+        self.process_supervisor = process_supervisor
 
     def verify_ffmpeg(
         self, ffmpeg_path: Path, ffprobe_path: Path, gpu_info: Dict[str, bool]
@@ -66,26 +67,103 @@ class VerificationManager:
                 raise
             raise VerificationError(f"FFmpeg verification failed: {e}")
 
-    def _verify_ffmpeg_version(self, ffmpeg_path: Path) -> None:
+    def collect_capabilities(
+        self, ffmpeg_path: Path, ffprobe_path: Path
+    ) -> Dict[str, Any]:
+        """Verify FFmpeg and report its versions, encoders and hwaccels
+
+        Returns:
+            Dict with ffmpeg_version, ffprobe_version, encoders and hwaccels
+
+        Raises:
+            VerificationError: If a check fails
+            EncodingError: If libx264 is not available
+        """
+        capabilities = {
+            "ffmpeg_version": self._verify_ffmpeg_version(ffmpeg_path),
+            "ffprobe_version": self._verify_ffprobe_version(ffprobe_path),
+            "encoders": self._list_encoders(ffmpeg_path),
+            "hwaccels": self._list_hwaccels(ffmpeg_path),
+        }
+        if "libx264" not in capabilities["encoders"]:
+            raise EncodingError("Required encoder libx264 not available")
+        return capabilities
+
+    def measure_encode_speed(
+        self, ffmpeg_path: Path, encoder: str, frames: int = 60
+    ) -> Optional[float]:
+        """Time a short 720p test encode
+
+        Returns:
+            Frames encoded per second, or None if the encoder failed
+        """
+        start = time.monotonic()
+        try:
+            self._execute_command(
+                [
+                    str(ffmpeg_path), "-hide_banner", "-nostats", "-loglevel", "error",
+                    "-f", "lavfi", "-i", "testsrc2=size=1280x720:rate=30",
+                    "-frames:v", str(frames), "-c:v", encoder, "-f", "null", "-",
+                ],
+                f"{encoder} test encode",
+                timeout=60,
+            )
+        except Exception as e:
+            logger.info(f"Encoder {encoder} failed its test encode: {e}")
+            return None
+        return frames / max(time.monotonic() - start, 1e-6)
+
+    def _verify_ffmpeg_version(self, ffmpeg_path: Path) -> str:
         """Verify FFmpeg version"""
         try:
             result = self._execute_command(
                 [str(ffmpeg_path), "-version"], "FFmpeg version check"
             )
-            logger.info(f"FFmpeg version: {result.stdout.split()[2]}")
+            version = result.stdout.split()[2]
+            logger.info(f"FFmpeg version: {version}")
+            return version
         except Exception as e:
             raise VerificationError(f"FFmpeg version check failed: {e}")
 
-    def _verify_ffprobe_version(self, ffprobe_path: Path) -> None:
+    def _verify_ffprobe_version(self, ffprobe_path: Path) -> str:
         """Verify FFprobe version"""
         try:
             result = self._execute_command(
                 [str(ffprobe_path), "-version"], "FFprobe version check"
             )
-            logger.info(f"FFprobe version: {result.stdout.split()[2]}")
+            version = result.stdout.split()[2]
+            logger.info(f"FFprobe version: {version}")
+            return version
         except Exception as e:
             raise VerificationError(f"FFprobe version check failed: {e}")
 
+    def _list_encoders(self, ffmpeg_path: Path) -> List[str]:
+        """Get the names of all encoders FFmpeg was built with"""
+        result = self._execute_command(
+            [str(ffmpeg_path), "-hide_banner", "-encoders"], "FFmpeg encoder listing"
+        )
+        encoders = []
+        in_table = False
+        for line in result.stdout.splitlines():
+            if line.strip().startswith("------"):
+                in_table = True
+                continue
+            parts = line.split()
+            if in_table and len(parts) >= 2:
+                encoders.append(parts[1])
+        return encoders
+
+    def _list_hwaccels(self, ffmpeg_path: Path) -> List[str]:
+        """Get the hardware acceleration methods FFmpeg supports"""
+        result = self._execute_command(
+            [str(ffmpeg_path), "-hide_banner", "-hwaccels"], "FFmpeg hwaccel listing"
+        )
+        return [
+            line.strip()
+            for line in result.stdout.splitlines()
+            if line.strip() and not line.rstrip().endswith(":")
+        ]
+
     def _verify_ffmpeg_capabilities(
         self, ffmpeg_path: Path, gpu_info: Dict[str, bool]
     ) -> None:
@@ -121,9 +199,7 @@ class VerificationManager:
     ) -> subprocess.CompletedProcess:
         """Execute a command with proper error handling"""
         try:
-            result = self.process_manager.execute_command(
-                command, timeout=timeout, check=False
-            )
+            result = self.process_supervisor.run_sync(command, timeout=timeout)
 
             if result.returncode != 0:
                 error = handle_ffmpeg_error(result.stderr)
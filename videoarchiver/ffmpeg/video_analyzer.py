@@ -1,36 +1,53 @@
 """Video analysis functionality for FFmpeg"""
 
 import os
-import subprocess
+import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
-from contextlib import contextmanager
-import tempfile
-import shutil
-import json
+from typing import Dict, Any, List, Optional, ClassVar
 
-logger = logging.getLogger("VideoArchiver")
+# try:
+# Try relative imports first
+from probe_service import ProbeService
 
-@contextmanager
-def temp_path_context():
-    """Context manager for temporary path creation and cleanup"""
-    temp_dir = tempfile.mkdtemp(prefix="ffmpeg_")
-    try:
-        os.chmod(temp_dir, 0o777)
-        yield temp_dir
-    finally:
-        try:
-            shutil.rmtree(temp_dir, ignore_errors=True)
-        except Exception as e:
-            logger.error(f"Error cleaning up temp directory {temp_dir}: {e}")
+# except ImportError:
+# Fall back to absolute imports if relative imports fail
+# from videoarchiver.ffmpeg.probe_service import ProbeService
+
+logger = logging.getLogger("VideoArchiver")
 
 class VideoAnalyzer:
-    def __init__(self, ffmpeg_path: Path):
+    """Derives content hints for encoder settings from a video
+
+    Content is measured by sampling rather than decoding the whole file.
+    FFmpeg seeks to ``SAMPLE_POINTS`` evenly spaced keyframes and decodes
+    about a second of low-resolution frames at each. One invocation reports
+    brightness (signalstats), motion (scene score and temporal information)
+    and complexity (spatial information). The run is killed once
+    ``ANALYSIS_BUDGET`` seconds have passed. Analysis then falls back to
+    stream metadata, which is also all that is used when sampling is skipped.
+    """
+
+    SAMPLE_POINTS: ClassVar[int] = 6
+    SAMPLE_SECONDS: ClassVar[float] = 1.0
+    SAMPLE_FPS: ClassVar[int] = 5
+    SAMPLE_WIDTH: ClassVar[int] = 160
+    MIN_SAMPLE_SPACING: ClassVar[float] = 5.0  # Short clips get fewer points
+    ANALYSIS_BUDGET: ClassVar[float] = 15.0
+    ANALYSIS_THREADS: ClassVar[int] = 2
+
+    DARK_BRIGHTNESS: ClassVar[float] = 40.0  # Mean luma of a dark frame
+    DARK_FRAME_RATIO: ClassVar[float] = 0.2
+    HIGH_MOTION_SCENE_SCORE: ClassVar[float] = 0.06
+    HIGH_MOTION_TI: ClassVar[float] = 20.0
+    COMPLEX_SI: ClassVar[float] = 60.0
+
+    def __init__(self, ffmpeg_path: Path, probe_service: Optional[ProbeService] = None):
         """Initialize video analyzer with FFmpeg path
         
         Args:
             ffmpeg_path: Path to FFmpeg binary
+            probe_service: Shared probe service; one is created if not given
         """
         self.ffmpeg_path = Path(ffmpeg_path)
         self.ffprobe_path = self.ffmpeg_path.parent / (
@@ -43,17 +60,33 @@ class VideoAnalyzer:
         if not self.ffprobe_path.exists():
             raise FileNotFoundError(f"FFprobe not found at {self.ffprobe_path}")
             
+        self.probe_service = probe_service or ProbeService(str(self.ffprobe_path))
+
         logger.info(f"Initialized VideoAnalyzer with FFmpeg: {self.ffmpeg_path}, FFprobe: {self.ffprobe_path}")
 
-    def analyze_video(self, input_path: str) -> Dict[str, Any]:
-        """Analyze video content for optimal encoding settings"""
+    async def analyze_video(
+        self,
+        input_path: str,
+        probe_result: Optional[Dict] = None,
+        sample_content: bool = True,
+    ) -> Dict[str, Any]:
+        """Analyze video content for optimal encoding settings
+
+        Args:
+            input_path: Path to the video file
+            probe_result: ffprobe output already gathered for the file, so
+                it does not have to be probed again
+            sample_content: Decode sampled frames to measure content; when
+                False only stream metadata is used
+        """
         try:
             if not os.path.exists(input_path):
                 logger.error(f"Input file not found: {input_path}")
                 return {}
 
             # Use ffprobe to get video information
-            probe_result = self._probe_video(input_path)
+            if not probe_result:
+                probe_result = await self._probe_video(input_path)
             if not probe_result:
                 logger.error("Failed to probe video")
                 return {}
@@ -78,12 +111,23 @@ class VideoAnalyzer:
                 logger.error(f"Error parsing video properties: {e}")
                 return {}
 
-            # Advanced analysis with progress logging
-            logger.info("Starting motion detection analysis...")
-            has_high_motion = self._detect_high_motion(video_info)
-            
-            logger.info("Starting dark scene analysis...")
-            has_dark_scenes = self._analyze_dark_scenes(input_path)
+            content = None
+            if sample_content:
+                content = await self._sample_content(input_path, duration)
+
+            if content:
+                analysis = "sampled"
+                has_high_motion = (
+                    content["motion_score"] >= self.HIGH_MOTION_SCENE_SCORE
+                    or content["temporal_info"] >= self.HIGH_MOTION_TI
+                )
+                has_dark_scenes = content["dark_ratio"] > self.DARK_FRAME_RATIO
+                has_complex_scenes = content["spatial_info"] >= self.COMPLEX_SI
+            else:
+                analysis = "sampled_failed" if sample_content else "stream"
+                has_high_motion = self._detect_high_motion(video_info)
+                has_dark_scenes = False
+                has_complex_scenes = self._detect_complex_scenes(video_info)
 
             # Get audio properties
             audio_info = next(
@@ -100,7 +144,9 @@ class VideoAnalyzer:
                 "bitrate": bitrate,
                 "has_high_motion": has_high_motion,
                 "has_dark_scenes": has_dark_scenes,
-                "has_complex_scenes": self._detect_complex_scenes(video_info),
+                "has_complex_scenes": has_complex_scenes,
+                "analysis": analysis,
+                **(content or {}),
                 **audio_props
             }
             
@@ -111,39 +157,10 @@ class VideoAnalyzer:
             logger.error(f"Error analyzing video: {str(e)}")
             return {}
 
-    def _probe_video(self, input_path: str) -> Dict:
+    async def _probe_video(self, input_path: str) -> Dict:
         """Use ffprobe to get video information"""
         try:
-            cmd = [
-                str(self.ffprobe_path),
-                "-v", "quiet",
-                "-print_format", "json",
-                "-show_format",
-                "-show_streams",
-                "-show_frames",
-                "-read_intervals", "%+#10",  # Only analyze first 10 frames for speed
-                input_path
-            ]
-            
-            logger.debug(f"Running ffprobe command: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=30  # Add timeout
-            )
-            
-            if result.returncode == 0:
-                try:
-                    return json.loads(result.stdout)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse ffprobe output: {e}")
-            else:
-                logger.error(f"FFprobe failed: {result.stderr}")
-                
-        except subprocess.TimeoutExpired:
-            logger.error("FFprobe timed out")
+            return await self.probe_service.probe(input_path, str(self.ffprobe_path))
         except Exception as e:
             logger.error(f"Error probing video: {str(e)}")
         return {}
@@ -178,47 +195,120 @@ class VideoAnalyzer:
             logger.warning(f"Frame rate analysis failed: {str(e)}")
         return False
 
-    def _analyze_dark_scenes(self, input_path: str) -> bool:
-        """Analyze video for dark scenes using FFmpeg signalstats filter"""
-        try:
-            with temp_path_context() as temp_dir:
-                sample_cmd = [
-                    str(self.ffmpeg_path),
-                    "-i", input_path,
-                    "-vf", "select='eq(pict_type,I)',signalstats",
-                    "-show_entries", "frame_tags=lavfi.signalstats.YAVG",
-                    "-f", "null",
-                    "-t", "30",  # Only analyze first 30 seconds
-                    "-"
-                ]
-                
-                logger.debug(f"Running dark scene analysis: {' '.join(sample_cmd)}")
-                result = subprocess.run(
-                    sample_cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=60  # Add timeout
-                )
+    def _sample_positions(self, duration: float) -> List[float]:
+        """Evenly spaced seek positions covering the whole video"""
+        if duration <= 0:
+            return [0.0]
+        points = int(min(self.SAMPLE_POINTS, duration // self.MIN_SAMPLE_SPACING))
+        points = max(1, points)
+        if points == 1:
+            return [0.0]
+        return [duration * (i + 0.5) / points for i in range(points)]
+
+    def _build_sample_command(self, input_path: str, positions: List[float]) -> List[str]:
+        """Build one FFmpeg command that decodes and measures every sample"""
+        cmd = [
+            str(self.ffmpeg_path),
+            "-hide_banner", "-nostats", "-loglevel", "error",
+            "-filter_complex_threads", str(self.ANALYSIS_THREADS),
+        ]
+        for position in positions:
+            # Input seeking without accurate_seek starts at the keyframe
+            # before the position, so nothing ahead of it is decoded
+            cmd.extend([
+                "-threads", str(self.ANALYSIS_THREADS),
+                "-noaccurate_seek", "-ss", f"{position:.3f}",
+                "-t", str(self.SAMPLE_SECONDS),
+                "-an", "-sn", "-dn",
+                "-i", input_path,
+            ])
+
+        chains = []
+        for i in range(len(positions)):
+            chains.append(
+                f"[{i}:v:0]fps={self.SAMPLE_FPS},"
+                f"scale={self.SAMPLE_WIDTH}:-2,setsar=1,format=yuv420p,"
+                "select='gte(scene,0)',signalstats,siti,"
+                f"setpts=PTS-STARTPTS[s{i}]"
+            )
+        inputs = "".join(f"[s{i}]" for i in range(len(positions)))
+        chains.append(
+            f"{inputs}concat=n={len(positions)}:v=1:a=0,metadata=mode=print:file=-"
+        )
+
+        cmd.extend(["-filter_complex", ";".join(chains), "-f", "null", "-"])
+        return cmd
+
+    @staticmethod
+    def _parse_frame_metadata(output: str) -> List[Dict[str, float]]:
+        """Parse metadata filter output into one dict per frame"""
+        frames: List[Dict[str, float]] = []
+        for line in output.splitlines():
+            line = line.strip()
+            if line.startswith("frame:"):
+                frames.append({})
+            elif line.startswith("lavfi.") and "=" in line and frames:
+                key, _, value = line.partition("=")
+                try:
+                    frames[-1][key] = float(value)
+                except ValueError:
+                    continue
+        return frames
+
+    async def _sample_content(
+        self, input_path: str, duration: float
+    ) -> Optional[Dict[str, Any]]:
+        """Measure brightness, motion and complexity from sampled frames
 
-                dark_frames = 0
-                total_frames = 0
-                for line in result.stderr.split("\n"):
-                    if "YAVG" in line:
-                        try:
-                            avg_brightness = float(line.split("=")[1])
-                            if avg_brightness < 40:  # Dark scene threshold
-                                dark_frames += 1
-                            total_frames += 1
-                        except (ValueError, IndexError):
-                            continue
-
-                return total_frames > 0 and (dark_frames / total_frames) > 0.2
-
-        except subprocess.TimeoutExpired:
-            logger.warning("Dark scene analysis timed out")
+        Returns:
+            Content measurements, or None if sampling failed or ran over
+            its time budget
+        """
+        positions = self._sample_positions(duration)
+        cmd = self._build_sample_command(input_path, positions)
+        logger.debug(f"Sampling {len(positions)} positions of {input_path}")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            # The budget also covers waiting for a probe slot
+            returncode, stdout, stderr = await asyncio.wait_for(
+                self.probe_service.run(cmd, timeout=self.ANALYSIS_BUDGET),
+                timeout=self.ANALYSIS_BUDGET,
+            )
         except Exception as e:
-            logger.warning(f"Dark scene analysis failed: {str(e)}")
-        return False
+            logger.warning(
+                f"Sampled analysis of {input_path} stopped after "
+                f"{loop.time() - started:.1f}s: {e or type(e).__name__}"
+            )
+            return None
+
+        if returncode != 0:
+            logger.warning(
+                f"Sampled analysis failed: {stderr.decode(errors='ignore').strip()}"
+            )
+            return None
+
+        frames = self._parse_frame_metadata(stdout.decode(errors="ignore"))
+        brightness = [f["lavfi.signalstats.YAVG"] for f in frames if "lavfi.signalstats.YAVG" in f]
+        if not brightness:
+            logger.warning("Sampled analysis produced no frame measurements")
+            return None
+
+        def mean(key: str) -> float:
+            values = [f[key] for f in frames if key in f]
+            return sum(values) / len(values) if values else 0.0
+
+        return {
+            "sampled_frames": len(frames),
+            "sample_points": len(positions),
+            "analysis_time": round(loop.time() - started, 3),
+            "avg_brightness": sum(brightness) / len(brightness),
+            "dark_ratio": sum(1 for b in brightness if b < self.DARK_BRIGHTNESS) / len(brightness),
+            "motion_score": mean("lavfi.scene_score"),
+            "temporal_info": mean("lavfi.siti.ti"),
+            "spatial_info": mean("lavfi.siti.si"),
+        }
 
     def _detect_complex_scenes(self, video_info: Dict) -> bool:
         """Detect complex scenes based on codec parameters and bitrate"""
@@ -25,6 +25,7 @@ from url_extractor import (
     URLPatternManager,
     URLValidator,
     URLMetadataExtractor,
+    URLScanner,
 )
 
 # Import validation components
@@ -53,6 +54,9 @@ from utils.progress_tracker import ProgressTracker
 
 # Import handlers after other dependencies are loaded
 from message_handler import MessageHandler
+from message_lanes import MessageLanes
+from reaction_reconciler import ReactionReconciler
+from backfill import BackfillManager, BackfillProgress, BackfillState
 from queue_handler import QueueHandler
 from queue_processor import QueueProcessor
 
@@ -61,6 +65,11 @@ __all__ = [
     # Core components
     "VideoProcessor",
     "MessageHandler",
+    "MessageLanes",
+    "ReactionReconciler",
+    "BackfillManager",
+    "BackfillProgress",
+    "BackfillState",
     "QueueHandler",
     "QueueProcessor",
     # URL Extraction
@@ -71,6 +80,7 @@ __all__ = [
     "URLPatternManager",
     "URLValidator",
     "URLMetadataExtractor",
+    "URLScanner",
     # Message Validation
     "MessageValidator",
     "ValidationContext",
@@ -0,0 +1,355 @@
+"""Backfill of videos posted in a channel before it was monitored"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+import discord  # type: ignore
+
+# try:
+# Try relative imports first
+from utils.exceptions import ProcessorError
+
+# except ImportError:
+# Fall back to absolute imports if relative imports fail
+# from videoarchiver.utils.exceptions import ProcessorError
+
+if TYPE_CHECKING:
+    # try:
+    from .core import VideoProcessor
+
+    # except ImportError:
+    # from videoarchiver.processor.core import VideoProcessor
+
+logger = logging.getLogger("VideoArchiver")
+
+
+class BackfillState(Enum):
+    """Possible states of a backfill"""
+
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+@dataclass
+class BackfillProgress:
+    """Progress of one channel backfill"""
+
+    guild_id: int
+    channel_id: int
+    start_after: Optional[int] = None
+    cursor: Optional[int] = None
+    state: BackfillState = BackfillState.RUNNING
+    pages: int = 0
+    scanned: int = 0
+    matched: int = 0
+    queued: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    # URLs already queued by this backfill
+    seen_urls: Set[str] = field(default_factory=set, repr=False)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the backfill started, or its duration once finished"""
+        end = self.finished_at or datetime.utcnow()
+        return (end - self.started_at).total_seconds()
+
+    @property
+    def rate(self) -> float:
+        """Messages scanned per second"""
+        elapsed = self.elapsed
+        return self.scanned / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert progress to a dictionary"""
+        return {
+            "guild_id": self.guild_id,
+            "channel_id": self.channel_id,
+            "start_after": self.start_after,
+            "cursor": self.cursor,
+            "state": self.state.value,
+            "pages": self.pages,
+            "scanned": self.scanned,
+            "matched": self.matched,
+            "queued": self.queued,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "error": self.error,
+            "elapsed": self.elapsed,
+            "rate": self.rate,
+        }
+
+
+ProgressCallback = Callable[[BackfillProgress], Awaitable[None]]
+
+
+class BackfillManager:
+    """Archives videos from the history of monitored channels
+
+    History is read oldest first, one page at a time with a pause between
+    pages. Each page goes through the same validator and URL extractor as
+    live messages. The page's URLs are checked against the archive database
+    in one query, and new ones are queued below live messages. The ID of the
+    last message of each page is saved, so a stopped backfill resumes there.
+    """
+
+    PAGE_SIZE: ClassVar[int] = 100
+    PAGE_DELAY: ClassVar[float] = 1.0  # Seconds between history requests
+    MAX_PENDING: ClassVar[int] = 200  # Guild queue depth at which reading pauses
+    QUEUE_POLL_INTERVAL: ClassVar[float] = 15.0
+    REPORT_INTERVAL: ClassVar[float] = 10.0  # Seconds between progress callbacks
+    PRIORITY: ClassVar[int] = 0  # Queue serves higher priorities first
+
+    def __init__(self, processor: "VideoProcessor") -> None:
+        self.processor = processor
+        self.progress: Dict[int, BackfillProgress] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def is_running(self, channel_id: int) -> bool:
+        """Check whether a channel is being backfilled"""
+        task = self._tasks.get(channel_id)
+        return task is not None and not task.done()
+
+    async def start(
+        self,
+        channel: discord.TextChannel,
+        since: Optional[datetime] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> BackfillProgress:
+        """
+        Start backfilling a channel in the background.
+
+        Args:
+            channel: Channel to read history from
+            since: Only read messages after this time, instead of resuming
+                from the saved cursor
+            on_progress: Called with the progress every REPORT_INTERVAL and
+                when the backfill ends
+
+        Returns:
+            Progress of the new backfill
+
+        Raises:
+            ProcessorError: If the channel is already being backfilled
+        """
+        if self.is_running(channel.id):
+            raise ProcessorError(f"Channel {channel.id} is already being backfilled")
+        if not self.processor.queue_manager:
+            raise ProcessorError("Queue manager is not initialized")
+
+        if since is not None:
+            start_after = discord.utils.time_snowflake(since)
+        else:
+            start_after = await self.processor.config.get_backfill_cursor(channel.id)
+
+        progress = BackfillProgress(
+            guild_id=channel.guild.id,
+            channel_id=channel.id,
+            start_after=start_after,
+            cursor=start_after,
+        )
+        self.progress[channel.id] = progress
+        self._tasks[channel.id] = asyncio.create_task(
+            self._run(channel, progress, on_progress)
+        )
+        return progress
+
+    async def cancel(self, channel_id: int) -> bool:
+        """
+        Stop backfilling a channel, keeping its cursor.
+
+        Returns:
+            True if a backfill was running
+        """
+        task = self._tasks.get(channel_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    async def stop(self) -> None:
+        """Stop every running backfill"""
+        for channel_id in list(self._tasks):
+            await self.cancel(channel_id)
+
+    async def _run(
+        self,
+        channel: discord.TextChannel,
+        progress: BackfillProgress,
+        on_progress: Optional[ProgressCallback],
+    ) -> None:
+        """Read and process history until the end of the channel"""
+        last_report = 0.0
+        loop = asyncio.get_running_loop()
+        try:
+            after = discord.Object(id=progress.cursor) if progress.cursor else None
+            while True:
+                await self._wait_for_queue(progress.guild_id)
+
+                page: List[discord.Message] = [
+                    message
+                    async for message in channel.history(
+                        limit=self.PAGE_SIZE, after=after, oldest_first=True
+                    )
+                ]
+                if not page:
+                    break
+
+                await self._process_page(page, progress)
+                progress.pages += 1
+                progress.cursor = page[-1].id
+                after = page[-1]
+                await self.processor.config.set_backfill_cursor(
+                    channel.id, progress.cursor
+                )
+
+                if on_progress and loop.time() - last_report >= self.REPORT_INTERVAL:
+                    last_report = loop.time()
+                    await self._report(progress, on_progress)
+
+                if len(page) < self.PAGE_SIZE:
+                    break
+                await asyncio.sleep(self.PAGE_DELAY)
+
+            progress.state = BackfillState.COMPLETED
+            logger.info(
+                f"Backfill of channel {channel.id} completed: {progress.scanned} "
+                f"messages scanned, {progress.queued} videos queued"
+            )
+
+        except asyncio.CancelledError:
+            progress.state = BackfillState.CANCELLED
+            logger.info(f"Backfill of channel {channel.id} cancelled")
+            raise
+
+        except Exception as e:
+            progress.state = BackfillState.FAILED
+            progress.error = str(e)
+            logger.error(f"Backfill of channel {channel.id} failed: {e}", exc_info=True)
+
+        finally:
+            progress.finished_at = datetime.utcnow()
+            progress.seen_urls.clear()
+            if on_progress:
+                await self._report(progress, on_progress)
+
+    async def _report(
+        self, progress: BackfillProgress, on_progress: ProgressCallback
+    ) -> None:
+        """Call the progress callback, ignoring its errors"""
+        try:
+            await on_progress(progress)
+        except Exception as e:
+            logger.warning(f"Failed to report backfill progress: {e}")
+
+    async def _wait_for_queue(self, guild_id: int) -> None:
+        """Pause while the guild's pending queue is deeper than MAX_PENDING"""
+        queue_manager = self.processor.queue_manager
+        while queue_manager:
+            pending = queue_manager.get_queue_status(guild_id).get("pending", 0)
+            if pending < self.MAX_PENDING:
+                return
+            await asyncio.sleep(self.QUEUE_POLL_INTERVAL)
+
+    async def _process_page(
+        self, page: List[discord.Message], progress: BackfillProgress
+    ) -> None:
+        """Validate a page of messages, extract their URLs and queue new ones"""
+        message_handler = self.processor.message_handler
+        settings = await self.processor.config.get_guild_settings(progress.guild_id)
+
+        candidates: List[Tuple[discord.Message, List[str]]] = []
+        for message in page:
+            progress.scanned += 1
+            # Includes this bot's own archive posts
+            if message.author.bot:
+                continue
+
+            is_valid, _ = await message_handler.message_validator.validate_message(
+                message, settings
+            )
+            if not is_valid:
+                continue
+
+            urls = await message_handler.url_extractor.extract_urls(
+                message,
+                enabled_sites=settings.get("enabled_sites"),
+                site_filter=settings.site_filter,
+            )
+            if urls:
+                candidates.append(
+                    (
+                        message,
+                        list(dict.fromkeys(meta.canonical_url or meta.url for meta in urls)),
+                    )
+                )
+
+        if not candidates:
+            return
+        progress.matched += len(candidates)
+
+        db = self.processor.db
+        archived = (
+            await db.filter_archived(url for _, urls in candidates for url in urls)
+            if db
+            else set()
+        )
+
+        for message, urls in candidates:
+            new_urls = [
+                url
+                for url in urls
+                if url not in archived and url not in progress.seen_urls
+            ]
+            progress.duplicates += len(urls) - len(new_urls)
+            if not new_urls:
+                continue
+
+            results = await self.processor.queue_manager.add_many(
+                new_urls,
+                message_id=message.id,
+                channel_id=message.channel.id,
+                guild_id=progress.guild_id,
+                author_id=message.author.id,
+                priority=self.PRIORITY,
+            )
+            for url, added in zip(new_urls, results):
+                if added:
+                    progress.queued += 1
+                    progress.seen_urls.add(url)
+                else:
+                    progress.rejected += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get progress of current and past backfills by channel"""
+        return {
+            "running": sum(1 for channel_id in self._tasks if self.is_running(channel_id)),
+            "channels": {
+                channel_id: progress.to_dict()
+                for channel_id, progress in self.progress.items()
+            },
+        }
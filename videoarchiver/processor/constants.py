@@ -31,6 +31,9 @@ class ProgressEmojis:
     PROGRESS: List[str] = field(default_factory=lambda: ('⬛', '🟨', '🟩'))
     DOWNLOAD: List[str] = field(default_factory=lambda: ('0️⃣', '2️⃣', '4️⃣', '6️⃣', '8️⃣', '🔟'))
 
+# Fields with a default_factory are only set on instances
+_PROGRESS_EMOJIS = ProgressEmojis()
+
 # Main reactions dictionary with type hints
 REACTIONS: Dict[str, Union[str, List[str]]] = {
     ReactionType.QUEUED.value: ReactionEmojis.QUEUED,
@@ -38,9 +41,9 @@ REACTIONS: Dict[str, Union[str, List[str]]] = {
     ReactionType.SUCCESS.value: ReactionEmojis.SUCCESS,
     ReactionType.ERROR.value: ReactionEmojis.ERROR,
     ReactionType.ARCHIVED.value: ReactionEmojis.ARCHIVED,
-    ReactionType.NUMBERS.value: ProgressEmojis.NUMBERS,
-    ReactionType.PROGRESS.value: ProgressEmojis.PROGRESS,
-    ReactionType.DOWNLOAD.value: ProgressEmojis.DOWNLOAD
+    ReactionType.NUMBERS.value: _PROGRESS_EMOJIS.NUMBERS,
+    ReactionType.PROGRESS.value: _PROGRESS_EMOJIS.PROGRESS,
+    ReactionType.DOWNLOAD.value: _PROGRESS_EMOJIS.DOWNLOAD
 }
 
 def get_reaction(reaction_type: Union[ReactionType, str]) -> Union[str, List[str]]:
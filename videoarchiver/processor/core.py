@@ -18,6 +18,7 @@ from core.c_types import (
 )
 from constants import REACTIONS
 from utils.progress_tracker import ProgressTracker
+from utils.host_limiter import host_limiter
 from utils.exceptions import ProcessorError
 
 logger = logging.getLogger("VideoArchiver")
@@ -177,6 +178,7 @@ class VideoProcessor(IComponent):
             from .queue_handler import QueueHandler
             from .message_handler import MessageHandler
             from .cleanup_manager import CleanupManager, CleanupStrategy
+            from .backfill import BackfillManager
 
             # Initialize handlers
             self.queue_handler: "QueueHandler" = QueueHandler(
@@ -188,6 +190,7 @@ class VideoProcessor(IComponent):
             self.cleanup_manager: "CleanupManager" = CleanupManager(
                 self.queue_handler, ffmpeg_mgr, CleanupStrategy.NORMAL
             )
+            self.backfill: "BackfillManager" = BackfillManager(self)
 
             # Pass db to queue handler if it exists
             if self.db:
@@ -263,6 +266,8 @@ class VideoProcessor(IComponent):
         try:
             self._state = ProcessorState.SHUTDOWN
             await self.health_monitor.stop_monitoring()
+            await self.backfill.stop()
+            await self.message_handler.stop()
             await self.cleanup_manager.cleanup()
             self.operation_tracker.end_operation(op_id, True)
         except Exception as e:
@@ -278,6 +283,8 @@ class VideoProcessor(IComponent):
         try:
             self._state = ProcessorState.SHUTDOWN
             await self.health_monitor.stop_monitoring()
+            await self.backfill.stop()
+            await self.message_handler.lanes.stop(drain=False)
             await self.cleanup_manager.force_cleanup()
             self.operation_tracker.end_operation(op_id, True)
         except Exception as e:
@@ -295,6 +302,14 @@ class VideoProcessor(IComponent):
 
             # Get queue status
             queue_status = self.queue_manager.get_queue_status(ctx.guild.id)
+            queue_status = {
+                **queue_status,
+                "hosts": host_limiter.get_stats(),
+                "lanes": self.message_handler.get_lane_stats(),
+            }
+            get_encode_stats = getattr(self.ffmpeg_mgr, "get_encode_stats", None)
+            if get_encode_stats:
+                queue_status["encoding"] = get_encode_stats()
 
             # Get active operations
             active_ops = self.operation_tracker.get_active_operations()
@@ -332,5 +347,8 @@ class VideoProcessor(IComponent):
                 "operations": self.operation_tracker.get_operation_stats(),
                 "active_operations": self.operation_tracker.get_active_operations(),
                 "health_status": self.health_monitor.health_status,
+                "caches": self.message_handler.get_cache_stats(),
+                "backfill": self.backfill.get_stats(),
+                "reactions": self.queue_handler.reactions.get_stats(),
             },
         )
@@ -1,7 +1,7 @@
 """Message processing and URL extraction for VideoProcessor"""
 
-import asyncio
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import auto, Enum
 from typing import (
@@ -25,8 +25,10 @@ from config_manager import ConfigManager
 from constants import REACTIONS
 from message_validator import MessageValidator, ValidationError
 from url_extractor import URLExtractor, URLMetadata
+from message_lanes import MessageLanes
 from queue.q_types import QueuePriority
 from utils.exceptions import MessageHandlerError
+from utils.ttl_cache import TTLCache
 
 # except ImportError:
 # Fall back to absolute imports if relative imports fail
@@ -34,8 +36,10 @@ from utils.exceptions import MessageHandlerError
 # from videoarchiver.processor.constants import REACTIONS
 # from videoarchiver.processor.message_validator import MessageValidator, ValidationError
 # from videoarchiver.processor.url_extractor import URLExtractor, URLMetadata
+# from videoarchiver.processor.message_lanes import MessageLanes
 # from videoarchiver.queue.types import QueuePriority
 # from videoarchiver.utils.exceptions import MessageHandlerError
+# from videoarchiver.utils.ttl_cache import TTLCache
 
 if TYPE_CHECKING:
     # try:
@@ -90,10 +94,11 @@ class MessageStatus(TypedDict):
 class MessageCache:
     """Caches message validation results"""
 
-    def __init__(self, max_size: int = 1000) -> None:
+    DEFAULT_TTL: ClassVar[float] = 3600.0  # 1 hour in seconds
+
+    def __init__(self, max_size: int = 1000, ttl: float = DEFAULT_TTL) -> None:
         self.max_size = max_size
-        self._cache: Dict[int, MessageCacheEntry] = {}
-        self._access_times: Dict[int, datetime] = {}
+        self._cache: TTLCache[int, MessageCacheEntry] = TTLCache(max_size, ttl)
 
     def add(self, message_id: int, result: MessageCacheEntry) -> None:
         """
@@ -103,10 +108,7 @@ class MessageCache:
             message_id: Discord message ID
             result: Validation result entry
         """
-        if len(self._cache) >= self.max_size:
-            self._cleanup_oldest()
-        self._cache[message_id] = result
-        self._access_times[message_id] = datetime.utcnow()
+        self._cache.set(message_id, result)
 
     def get(self, message_id: int) -> Optional[MessageCacheEntry]:
         """
@@ -118,31 +120,39 @@ class MessageCache:
         Returns:
             Cached validation entry or None if not found
         """
-        if message_id in self._cache:
-            self._access_times[message_id] = datetime.utcnow()
-            return self._cache[message_id]
-        return None
+        return self._cache.get(message_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit rate"""
+        return self._cache.get_stats()
+
 
-    def _cleanup_oldest(self) -> None:
-        """Remove oldest cache entries"""
-        if not self._access_times:
-            return
-        oldest = min(self._access_times.items(), key=lambda x: x[1])[0]
-        del self._cache[oldest]
-        del self._access_times[oldest]
+@dataclass
+class MessageRecord:
+    """Processing state of one message"""
+
+    state: MessageState
+    start_time: datetime
+    stage: Optional[ProcessingStage] = None
+    error: Optional[str] = None
+    end_time: Optional[datetime] = None
 
 
 class ProcessingTracker:
-    """Tracks message processing state and progress"""
+    """Tracks message processing state and progress
+
+    Records are kept in a bounded cache and expire once a message has not
+    been updated for RECORD_TTL, so finished messages do not accumulate.
+    """
 
     MAX_PROCESSING_TIME: ClassVar[int] = 300  # 5 minutes in seconds
+    MAX_RECORDS: ClassVar[int] = 10000
+    RECORD_TTL: ClassVar[float] = 3600.0  # 1 hour in seconds
 
     def __init__(self) -> None:
-        self.states: Dict[int, MessageState] = {}
-        self.stages: Dict[int, ProcessingStage] = {}
-        self.errors: Dict[int, str] = {}
-        self.start_times: Dict[int, datetime] = {}
-        self.end_times: Dict[int, datetime] = {}
+        self.records: TTLCache[int, MessageRecord] = TTLCache(
+            self.MAX_RECORDS, self.RECORD_TTL
+        )
 
     def start_processing(self, message_id: int) -> None:
         """
@@ -151,8 +161,9 @@ class ProcessingTracker:
         Args:
             message_id: Discord message ID
         """
-        self.states[message_id] = MessageState.RECEIVED
-        self.start_times[message_id] = datetime.utcnow()
+        self.records.set(
+            message_id, MessageRecord(MessageState.RECEIVED, datetime.utcnow())
+        )
 
     def update_state(
         self,
@@ -170,13 +181,17 @@ class ProcessingTracker:
             stage: Optional processing stage
             error: Optional error message
         """
-        self.states[message_id] = state
+        record = self.records.get(message_id)
+        if record is None:
+            record = MessageRecord(state, datetime.utcnow())
+            self.records.set(message_id, record)
+        record.state = state
         if stage:
-            self.stages[message_id] = stage
+            record.stage = stage
         if error:
-            self.errors[message_id] = error
+            record.error = error
         if state in (MessageState.COMPLETED, MessageState.FAILED, MessageState.IGNORED):
-            self.end_times[message_id] = datetime.utcnow()
+            record.end_time = datetime.utcnow()
 
     def get_status(self, message_id: int) -> MessageStatus:
         """
@@ -188,18 +203,26 @@ class ProcessingTracker:
         Returns:
             Dictionary containing message status information
         """
-        end_time = self.end_times.get(message_id)
-        start_time = self.start_times.get(message_id)
+        record = self.records.peek(message_id)
+        if record is None:
+            return MessageStatus(
+                state=None,
+                stage=None,
+                error=None,
+                start_time=None,
+                end_time=None,
+                duration=None,
+            )
 
         return MessageStatus(
-            state=self.states.get(message_id),
-            stage=self.stages.get(message_id),
-            error=self.errors.get(message_id),
-            start_time=start_time,
-            end_time=end_time,
+            state=record.state,
+            stage=record.stage,
+            error=record.error,
+            start_time=record.start_time,
+            end_time=record.end_time,
             duration=(
-                (end_time - start_time).total_seconds()
-                if end_time and start_time
+                (record.end_time - record.start_time).total_seconds()
+                if record.end_time
                 else None
             ),
         )
@@ -214,18 +237,33 @@ class ProcessingTracker:
         Returns:
             True if message is stuck, False otherwise
         """
-        if message_id not in self.states or message_id not in self.start_times:
+        record = self.records.peek(message_id)
+        if record is None:
             return False
 
-        state = self.states[message_id]
-        if state in (MessageState.COMPLETED, MessageState.FAILED, MessageState.IGNORED):
+        if record.state in (
+            MessageState.COMPLETED,
+            MessageState.FAILED,
+            MessageState.IGNORED,
+        ):
             return False
 
-        processing_time = (
-            datetime.utcnow() - self.start_times[message_id]
-        ).total_seconds()
+        processing_time = (datetime.utcnow() - record.start_time).total_seconds()
         return processing_time > self.MAX_PROCESSING_TIME
 
+    def get_stuck_messages(self) -> List[int]:
+        """
+        Get messages that have been processing for too long.
+
+        Returns:
+            List of Discord message IDs
+        """
+        return [
+            message_id
+            for message_id in self.records.keys()
+            if self.is_message_stuck(message_id)
+        ]
+
 
 class MessageHandler:
     """Handles processing of messages for video content"""
@@ -245,24 +283,34 @@ class MessageHandler:
         # Initialize tracking and caching
         self.tracker = ProcessingTracker()
         self.validation_cache = MessageCache()
-        self._processing_lock = asyncio.Lock()
+
+        # Guilds are processed concurrently, each guild's messages in order
+        self.lanes = MessageLanes(self._handle_message)
 
     async def process_message(self, message: discord.Message) -> None:
         """
-        Process a message for video content.
+        Queue a message for video content processing in its guild's lane.
+
+        Waits only while the lane's inbox is full; processing errors are
+        handled in the lane.
 
         Args:
             message: Discord message to process
+        """
+        await self.lanes.submit(message)
 
-        Raises:
-            MessageHandlerError: If there's an error during processing
+    async def _handle_message(self, message: discord.Message) -> None:
+        """
+        Process a message for video content, reacting to failures.
+
+        Args:
+            message: Discord message to process
         """
         # Start tracking
         self.tracker.start_processing(message.id)
 
         try:
-            async with self._processing_lock:
-                await self._process_message_internal(message)
+            await self._process_message_internal(message)
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}", exc_info=True)
             self.tracker.update_state(message.id, MessageState.FAILED, error=str(e))
@@ -328,7 +376,9 @@ class MessageHandler:
             )
             try:
                 urls: List[URLMetadata] = await self.url_extractor.extract_urls(
-                    message, enabled_sites=settings.get("enabled_sites")
+                    message,
+                    enabled_sites=settings.get("enabled_sites"),
+                    site_filter=settings.site_filter,
                 )
                 if not urls:
                     logger.debug("No valid URLs found in message")
@@ -342,14 +392,27 @@ class MessageHandler:
                 message.id, MessageState.PROCESSING, ProcessingStage.QUEUEING
             )
             try:
-                for url_metadata in urls:
-                    await self.queue_manager.add_to_queue(
-                        url=url_metadata.url,
-                        message_id=message.id,
-                        channel_id=message.channel.id,
-                        guild_id=message.guild.id,
-                        author_id=message.author.id,
-                        priority=QueuePriority.NORMAL.value,
+                # One entry per video, e.g. youtu.be and watch links to the
+                # same video share a canonical URL
+                queue_urls = list(
+                    dict.fromkeys(
+                        url_metadata.canonical_url or url_metadata.url
+                        for url_metadata in urls
+                    )
+                )
+                results = await self.queue_manager.add_many(
+                    queue_urls,
+                    message_id=message.id,
+                    channel_id=message.channel.id,
+                    guild_id=message.guild.id,
+                    author_id=message.author.id,
+                    priority=QueuePriority.NORMAL.value,
+                )
+                rejected = [url for url, added in zip(queue_urls, results) if not added]
+                if rejected:
+                    logger.warning(
+                        f"Could not queue {len(rejected)} of {len(queue_urls)} "
+                        f"URLs from message {message.id}: {rejected}"
                     )
             except Exception as e:
                 raise MessageHandlerError(f"Queue processing failed: {str(e)}")
@@ -364,6 +427,33 @@ class MessageHandler:
         except Exception as e:
             raise MessageHandlerError(f"Unexpected error: {str(e)}")
 
+    async def stop(self) -> None:
+        """Stop the message lanes, finishing queued messages briefly first"""
+        await self.lanes.stop()
+
+    def get_lane_stats(self) -> Dict[str, Any]:
+        """
+        Get message lane depth and throughput.
+
+        Returns:
+            Dictionary containing lane statistics
+        """
+        return self.lanes.get_stats()
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get size and hit rate of the message caches.
+
+        Returns:
+            Dictionary of statistics for each cache
+        """
+        return {
+            "urls": self.url_extractor.get_cache_stats(),
+            "validation": self.validation_cache.get_stats(),
+            "validator": self.message_validator.cache.get_stats(),
+            "tracker": self.tracker.records.get_stats(),
+        }
+
     def get_message_status(self, message_id: int) -> MessageStatus:
         """
         Get processing status for a message.
@@ -385,12 +475,12 @@ class MessageHandler:
         """
         try:
             # Check for any stuck messages
-            for message_id in self.tracker.states:
-                if self.tracker.is_message_stuck(message_id):
-                    logger.warning(
-                        f"Message {message_id} appears to be stuck in processing"
-                    )
-                    return False
+            stuck = self.tracker.get_stuck_messages()
+            if stuck:
+                logger.warning(
+                    f"Messages appear to be stuck in processing: {stuck[:10]}"
+                )
+                return False
             return True
         except Exception as e:
             logger.error(f"Error checking health: {e}")
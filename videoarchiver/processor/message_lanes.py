@@ -0,0 +1,162 @@
+"""Sharded per-guild lanes for message ingestion"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, ClassVar, Dict, List, Optional, Set
+
+import discord  # type: ignore
+
+logger = logging.getLogger("VideoArchiver")
+
+
+@dataclass
+class MessageLane:
+    """One worker and its bounded inbox"""
+
+    index: int
+    inbox: asyncio.Queue
+    worker: Optional[asyncio.Task] = None
+    processed: int = 0
+    failed: int = 0
+    peak_depth: int = 0
+    guilds: Set[int] = field(default_factory=set)
+
+    @property
+    def depth(self) -> int:
+        """Messages waiting in the inbox"""
+        return self.inbox.qsize()
+
+
+class MessageLanes:
+    """Processes messages from different guilds concurrently
+
+    Every guild is hashed to one of a fixed number of lanes, each a single
+    worker draining a bounded FIFO inbox. Messages of a guild, and therefore
+    of each of its channels, are handled in the order they arrived, while
+    other guilds' lanes keep running. A full inbox makes ``submit`` wait,
+    which slows the event listener down rather than growing memory.
+    """
+
+    DEFAULT_LANES: ClassVar[int] = 8
+    DEFAULT_INBOX_SIZE: ClassVar[int] = 100
+    STOP_TIMEOUT: ClassVar[float] = 5.0
+
+    def __init__(
+        self,
+        handler: Callable[[discord.Message], Awaitable[None]],
+        lanes: int = DEFAULT_LANES,
+        inbox_size: int = DEFAULT_INBOX_SIZE,
+    ) -> None:
+        """Initialize the lanes
+
+        Args:
+            handler: Coroutine run for every message, in its lane's worker
+            lanes: Number of lanes, i.e. guilds processed at the same time
+            inbox_size: Messages a lane holds before submitters wait
+        """
+        self.handler = handler
+        self.inbox_size = max(1, inbox_size)
+        self._lanes: List[MessageLane] = [
+            MessageLane(i, asyncio.Queue(maxsize=self.inbox_size))
+            for i in range(max(1, lanes))
+        ]
+        self._stopping = False
+        self.submitted = 0
+        self.backpressured = 0
+
+    def lane_for(self, guild_id: int) -> MessageLane:
+        """Get the lane a guild's messages go through"""
+        # Snowflake low bits are worker/sequence counters, the timestamp spreads better
+        return self._lanes[(guild_id >> 22) % len(self._lanes)]
+
+    async def submit(self, message: discord.Message) -> None:
+        """Queue a message in its guild's lane, waiting while the lane is full
+
+        Args:
+            message: Discord message from a guild
+        """
+        if self._stopping:
+            logger.debug(f"Message lanes stopping, dropping message {message.id}")
+            return
+
+        lane = self.lane_for(message.guild.id)
+        if lane.worker is None or lane.worker.done():
+            lane.worker = asyncio.create_task(self._run(lane))
+
+        if lane.inbox.full():
+            self.backpressured += 1
+            logger.debug(f"Message lane {lane.index} full, waiting for space")
+        await lane.inbox.put(message)
+
+        self.submitted += 1
+        lane.guilds.add(message.guild.id)
+        lane.peak_depth = max(lane.peak_depth, lane.depth)
+
+    async def _run(self, lane: MessageLane) -> None:
+        """Drain a lane's inbox one message at a time"""
+        while True:
+            message = await lane.inbox.get()
+            try:
+                await self.handler(message)
+                lane.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                lane.failed += 1
+                logger.error(
+                    f"Error in message lane {lane.index} for message {message.id}: {e}",
+                    exc_info=True,
+                )
+            finally:
+                lane.inbox.task_done()
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop accepting messages and stop the workers
+
+        Args:
+            drain: Let workers finish queued messages first, up to
+                STOP_TIMEOUT seconds
+        """
+        self._stopping = True
+        if drain:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        *(lane.inbox.join() for lane in self._lanes if lane.worker)
+                    ),
+                    timeout=self.STOP_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Timed out draining message lanes")
+
+        workers = [lane.worker for lane in self._lanes if lane.worker]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        for lane in self._lanes:
+            lane.worker = None
+            while not lane.inbox.empty():
+                lane.inbox.get_nowait()
+                lane.inbox.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-lane depth and throughput"""
+        depths = [lane.depth for lane in self._lanes]
+        return {
+            "lanes": len(self._lanes),
+            "inbox_size": self.inbox_size,
+            "depths": depths,
+            "queued": sum(depths),
+            "max_depth": max(depths),
+            "peak_depth": max(lane.peak_depth for lane in self._lanes),
+            "active_lanes": sum(
+                1 for lane in self._lanes if lane.worker and not lane.worker.done()
+            ),
+            "guilds": sum(len(lane.guilds) for lane in self._lanes),
+            "submitted": self.submitted,
+            "processed": sum(lane.processed for lane in self._lanes),
+            "failed": sum(lane.failed for lane in self._lanes),
+            "backpressured": self.backpressured,
+        }
@@ -10,9 +10,11 @@ import discord # type: ignore
 #try:
     # Try relative imports first
 from utils.exceptions import ValidationError
+from utils.ttl_cache import TTLCache
 #except ImportError:
     # Fall back to absolute imports if relative imports fail
     # from videoarchiver.utils.exceptions import ValidationError
+    # from videoarchiver.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger("VideoArchiver")
 
@@ -116,10 +118,11 @@ class ValidationRule:
 class ValidationCache:
     """Caches validation results"""
 
-    def __init__(self, max_size: int = 1000) -> None:
+    DEFAULT_TTL: ClassVar[float] = 3600.0  # 1 hour in seconds
+
+    def __init__(self, max_size: int = 1000, ttl: float = DEFAULT_TTL) -> None:
         self.max_size = max_size
-        self._cache: Dict[int, ValidationCacheEntry] = {}
-        self._access_times: Dict[int, datetime] = {}
+        self._cache: TTLCache[int, ValidationCacheEntry] = TTLCache(max_size, ttl)
 
     def add(self, message_id: int, result: ValidationCacheEntry) -> None:
         """
@@ -129,10 +132,7 @@ class ValidationCache:
             message_id: Discord message ID
             result: Validation result entry
         """
-        if len(self._cache) >= self.max_size:
-            self._cleanup_oldest()
-        self._cache[message_id] = result
-        self._access_times[message_id] = datetime.utcnow()
+        self._cache.set(message_id, result)
 
     def get(self, message_id: int) -> Optional[ValidationCacheEntry]:
         """
@@ -144,18 +144,19 @@ class ValidationCache:
         Returns:
             Cached validation entry or None if not found
         """
-        if message_id in self._cache:
-            self._access_times[message_id] = datetime.utcnow()
-            return self._cache[message_id]
-        return None
+        return self._cache.get(message_id)
+
+    def remove(self, message_id: int) -> None:
+        """Remove a cached validation result"""
+        self._cache.pop(message_id, None)
 
-    def _cleanup_oldest(self) -> None:
-        """Remove oldest cache entries"""
-        if not self._access_times:
-            return
-        oldest = min(self._access_times.items(), key=lambda x: x[1])[0]
-        del self._cache[oldest]
-        del self._access_times[oldest]
+    def clear(self) -> None:
+        """Remove all cached validation results"""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit rate"""
+        return self._cache.get_stats()
 
 
 class ValidationRuleManager:
@@ -328,9 +329,8 @@ class MessageValidator:
         """
         try:
             if message_id:
-                self.cache._cache.pop(message_id, None)
-                self.cache._access_times.pop(message_id, None)
+                self.cache.remove(message_id)
             else:
-                self.cache = ValidationCache(self.cache.max_size)
+                self.cache.clear()
         except Exception as e:
             logger.error(f"Error clearing validation cache: {e}", exc_info=True)
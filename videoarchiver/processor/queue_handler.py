@@ -3,6 +3,7 @@
 import logging
 import asyncio
 import os
+import time
 from enum import Enum, auto
 from typing import Optional, Dict, Any, List, Tuple, Set, TypedDict, ClassVar, Callable
 from datetime import datetime
@@ -20,6 +21,7 @@ from config_manager import ConfigManager
 
 from utils.progress_tracker import ProgressTracker  # Import from processor package
 from constants import REACTIONS
+from reaction_reconciler import ReactionReconciler
 
 # except ImportError:
 # Fall back to absolute imports if relative imports fail
@@ -31,6 +33,7 @@ from constants import REACTIONS
 # from videoarchiver.config_manager import ConfigManager
 # from videoarchiver.processor import progress_tracker  # Import from processor package
 # from videoarchiver.processor.constants import REACTIONS
+# from videoarchiver.processor.reaction_reconciler import ReactionReconciler
 
 logger = logging.getLogger("VideoArchiver")
 
@@ -79,6 +82,16 @@ class QueueHandler:
         self._unloading = False
         self._active_downloads: Dict[str, asyncio.Task] = {}
         self._active_downloads_lock = asyncio.Lock()
+        self.reactions = ReactionReconciler(
+            bot,
+            managed=[
+                REACTIONS["queued"],
+                REACTIONS["processing"],
+                REACTIONS["success"],
+                REACTIONS["error"],
+                *REACTIONS["download"],
+            ],
+        )
         self._stats: QueueStats = {
             "active_downloads": 0,
             "processing_items": 0,
@@ -133,7 +146,7 @@ class QueueHandler:
             # Get original message and update reactions
             original_message = await self._get_original_message(item)
             if original_message:
-                await self._update_message_reactions(
+                self._update_message_reactions(
                     original_message, QueueItemStatus.PROCESSING
                 )
 
@@ -141,12 +154,13 @@ class QueueHandler:
             file_path = await self._process_video_file(
                 downloader, message_manager, item, original_message
             )
+            await self._index_message_video(item)
 
             # Success
             self._update_stats(True, start_time)
             item.finish_processing(True)
             if original_message:
-                await self._update_message_reactions(
+                self._update_message_reactions(
                     original_message, QueueItemStatus.COMPLETED
                 )
             return True, None
@@ -167,21 +181,30 @@ class QueueHandler:
         if not self.db:
             return False
 
-        if self.db.is_url_archived(item.url):
+        if await self.db.is_url_archived(item.url):
             logger.info(f"Video already archived: {item.url}")
+            await self._index_message_video(item)
             if original_message := await self._get_original_message(item):
-                await self._update_message_reactions(
+                self._update_message_reactions(
                     original_message, QueueItemStatus.COMPLETED
                 )
-                archived_info = self.db.get_archived_video(item.url)
+                archived_info = await self.db.get_archived_video(item.url)
                 if archived_info:
                     await original_message.reply(
-                        f"This video was already archived. You can find it here: {archived_info[0]}"
+                        f"This video was already archived. You can find it here: {archived_info['discord_url']}"
                     )
             item.finish_processing(True)
             return True
         return False
 
+    async def _index_message_video(self, item: QueueItem) -> None:
+        """Record the message a video was posted in, for reaction lookups"""
+        if not self.db:
+            return
+        await self.db.add_message_video(
+            item.message_id, item.url, item.channel_id, item.guild_id
+        )
+
     async def _get_components(self, guild_id: int) -> Dict[str, Any]:
         """Get required components for processing"""
         if guild_id not in self.components:
@@ -201,15 +224,32 @@ class QueueHandler:
 
         # Download video
         success, file_path, error = await self._download_video(
-            downloader, item.url, progress_callback
+            downloader, item.url, progress_callback, item.priority
         )
         if not success:
             raise QueueHandlerError(f"Failed to download video: {error}")
 
+        # Reuse the downloader's probe for metadata and record stage timings
+        pop_info = getattr(downloader, "pop_processing_info", None)
+        info = pop_info(file_path) if pop_info else {}
+        timings = item.metadata.setdefault("stage_timings", {})
+        timings.update(info.get("timings", {}))
+        if info.get("metadata"):
+            item.metadata["media"] = info["metadata"]
+        if info.get("encode_attempts"):
+            item.metadata["encode_attempts"] = info["encode_attempts"]
+
         # Archive video
+        upload_start = time.monotonic()
         success, error = await self._archive_video(
-            item.guild_id, original_message, message_manager, item.url, file_path
+            item.guild_id,
+            original_message,
+            message_manager,
+            item.url,
+            file_path,
+            info.get("metadata"),
         )
+        timings["upload"] = time.monotonic() - upload_start
         if not success:
             raise QueueHandlerError(f"Failed to archive video: {error}")
 
@@ -222,9 +262,7 @@ class QueueHandler:
         self._update_stats(False, datetime.utcnow())
         item.finish_processing(False, error)
         if message:
-            asyncio.create_task(
-                self._update_message_reactions(message, QueueItemStatus.FAILED)
-            )
+            self._update_message_reactions(message, QueueItemStatus.FAILED)
 
     def _update_stats(self, success: bool, start_time: datetime) -> None:
         """Update queue statistics"""
@@ -245,32 +283,18 @@ class QueueHandler:
 
         self._stats["last_processed"] = datetime.utcnow().isoformat()
 
-    async def _update_message_reactions(
+    def _update_message_reactions(
         self, message: discord.Message, status: QueueItemStatus
     ) -> None:
-        """Update message reactions based on status"""
-        try:
-            # Remove existing reactions
-            for reaction in [
-                REACTIONS["queued"],
-                REACTIONS["processing"],
-                REACTIONS["success"],
-                REACTIONS["error"],
-            ]:
-                try:
-                    await message.remove_reaction(reaction, self.bot.user)
-                except:
-                    pass
-
-            # Add new reaction
-            if status == QueueItemStatus.PROCESSING:
-                await message.add_reaction(REACTIONS["processing"])
-            elif status == QueueItemStatus.COMPLETED:
-                await message.add_reaction(REACTIONS["success"])
-            elif status == QueueItemStatus.FAILED:
-                await message.add_reaction(REACTIONS["error"])
-        except Exception as e:
-            logger.error(f"Error updating message reactions: {e}")
+        """Set the status reaction of a message; applied later by the reconciler"""
+        emoji = {
+            QueueItemStatus.PROCESSING: REACTIONS["processing"],
+            QueueItemStatus.COMPLETED: REACTIONS["success"],
+            QueueItemStatus.FAILED: REACTIONS["error"],
+        }.get(status)
+        self.reactions.set(message, "status", emoji)
+        if status != QueueItemStatus.PROCESSING:
+            self.reactions.set(message, "progress", None)
 
     async def _cleanup_file(self, file_path: Optional[str]) -> None:
         """Clean up downloaded file"""
@@ -287,6 +311,7 @@ class QueueHandler:
         message_manager: MessageManager,
         url: str,
         file_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
     ) -> Tuple[bool, Optional[str]]:
         """
         Archive downloaded video.
@@ -297,6 +322,7 @@ class QueueHandler:
             message_manager: Message manager instance
             url: Video URL
             file_path: Path to downloaded video file
+            metadata: Media metadata from the post-download probe
 
         Returns:
             Tuple of (success, error_message)
@@ -335,8 +361,13 @@ class QueueHandler:
             # Store in database if available
             if self.db and archive_message.attachments:
                 discord_url = archive_message.attachments[0].url
-                self.db.add_archived_video(
-                    url, discord_url, archive_message.id, archive_channel.id, guild_id
+                await self.db.add_archived_video(
+                    url,
+                    discord_url,
+                    archive_message.id,
+                    archive_channel.id,
+                    guild_id,
+                    metadata,
                 )
                 logger.info(f"Added video to archive database: {url} -> {discord_url}")
 
@@ -383,34 +414,29 @@ class QueueHandler:
         Returns:
             Callback function for progress updates
         """
+        # Downloads report progress from a worker thread
+        loop = asyncio.get_running_loop()
+        last_emoji: Optional[str] = None
 
         def progress_callback(progress: float) -> None:
-            if message:
-                try:
-                    loop = asyncio.get_running_loop()
-                    if not loop.is_running():
-                        logger.warning(
-                            "Event loop is not running, skipping progress update"
-                        )
-                        return
-
-                    # Update progress tracking
-                    ProgressTracker.update_download_progress(
-                        url,
-                        {
-                            "percent": progress,
-                            "last_update": datetime.now(
-                                datetime.timezone.utc
-                            )().isoformat(),
-                        },
-                    )
-
-                    # Create task to update reaction
-                    asyncio.run_coroutine_threadsafe(
-                        self._update_download_progress_reaction(message, progress), loop
-                    )
-                except Exception as e:
-                    logger.error(f"Error in progress callback: {e}")
+            nonlocal last_emoji
+            try:
+                # Only hand over steps that change the reaction
+                emoji = self._download_reaction(progress)
+                if message and emoji != last_emoji:
+                    last_emoji = emoji
+                    self.reactions.set_threadsafe(loop, message, "progress", emoji)
+
+                # Update progress tracking
+                self.progress_tracker.update_download_progress(
+                    url,
+                    {
+                        "percent": progress,
+                        "last_update": datetime.utcnow().isoformat(),
+                    },
+                )
+            except Exception as e:
+                logger.error(f"Error in progress callback: {e}")
 
         return progress_callback
 
@@ -419,6 +445,7 @@ class QueueHandler:
         downloader: DownloadManager,
         url: str,
         progress_callback: Callable[[float], None],
+        priority: int = 0,
     ) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Download video with progress tracking.
@@ -427,12 +454,15 @@ class QueueHandler:
             downloader: Download manager instance
             url: URL to download
             progress_callback: Callback for progress updates
+            priority: Queue priority, passed on to the encode scheduler
 
         Returns:
             Tuple of (success, file_path, error_message)
         """
         download_task = asyncio.create_task(
-            downloader.download_video(url, progress_callback=progress_callback)
+            downloader.download_video(
+                url, progress_callback=progress_callback, priority=priority
+            )
         )
 
         async with self._active_downloads_lock:
@@ -473,6 +503,7 @@ class QueueHandler:
         try:
             logger.info("Starting QueueHandler cleanup...")
             self._unloading = True
+            await self.reactions.stop()
 
             # Cancel all active downloads
             async with self._active_downloads_lock:
@@ -501,6 +532,7 @@ class QueueHandler:
         try:
             logger.info("Starting force cleanup of QueueHandler...")
             self._unloading = True
+            await self.reactions.stop()
 
             # Force cancel all active downloads
             for url, task in list(self._active_downloads.items()):
@@ -516,41 +548,21 @@ class QueueHandler:
                 f"Error during QueueHandler force cleanup: {str(e)}", exc_info=True
             )
 
-    async def _update_download_progress_reaction(
-        self, message: discord.Message, progress: float
-    ) -> None:
-        """Update download progress reaction on message"""
-        if not message:
-            return
-
-        try:
-            # Remove old reactions
-            for reaction in REACTIONS["download"]:
-                try:
-                    await message.remove_reaction(reaction, self.bot.user)
-                except Exception as e:
-                    logger.error(f"Failed to remove download reaction: {e}")
-                    continue
-
-            # Add new reaction based on progress
-            try:
-                if progress <= 20:
-                    await message.add_reaction(REACTIONS["download"][0])
-                elif progress <= 40:
-                    await message.add_reaction(REACTIONS["download"][1])
-                elif progress <= 60:
-                    await message.add_reaction(REACTIONS["download"][2])
-                elif progress <= 80:
-                    await message.add_reaction(REACTIONS["download"][3])
-                elif progress < 100:
-                    await message.add_reaction(REACTIONS["download"][4])
-                else:
-                    await message.add_reaction(REACTIONS["download"][5])
-            except Exception as e:
-                logger.error(f"Failed to add download reaction: {e}")
-
-        except Exception as e:
-            logger.error(f"Failed to update download progress reaction: {e}")
+    @staticmethod
+    def _download_reaction(progress: float) -> str:
+        """Get the download reaction for a progress percentage"""
+        steps = REACTIONS["download"]
+        if progress <= 20:
+            return steps[0]
+        elif progress <= 40:
+            return steps[1]
+        elif progress <= 60:
+            return steps[2]
+        elif progress <= 80:
+            return steps[3]
+        elif progress < 100:
+            return steps[4]
+        return steps[5]
 
     def is_healthy(self) -> bool:
         """
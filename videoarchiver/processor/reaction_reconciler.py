@@ -0,0 +1,219 @@
+"""Coalesced, rate-limited updates of the bot's reactions on messages"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, FrozenSet, Iterable, List, Optional, Set
+
+import discord  # type: ignore
+
+# try:
+# Try relative imports first
+from utils.ttl_cache import TTLCache
+
+# except ImportError:
+# Fall back to absolute imports if relative imports fail
+# from videoarchiver.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("VideoArchiver")
+
+
+@dataclass
+class MessageReactions:
+    """Desired and applied reactions of one message"""
+
+    message: discord.Message
+    # Desired emoji per slot, e.g. "status" and "progress"
+    slots: Dict[str, str] = field(default_factory=dict)
+    # Managed reactions known to be on the message, None until first applied
+    applied: Optional[Set[str]] = None
+
+    @property
+    def desired(self) -> List[str]:
+        """Desired reactions in slot order"""
+        return list(dict.fromkeys(self.slots.values()))
+
+
+class ReactionReconciler:
+    """Keeps the bot's reactions on messages in line with their state
+
+    Callers set the reaction a message should show in a named slot. Changes
+    only update the desired state and mark the message pending. Each channel
+    has a worker that waits DEBOUNCE, then takes every pending message and
+    adds or removes only the reactions that differ from what was last
+    applied, at most one request per MIN_INTERVAL. States that are replaced
+    before the worker reaches them, such as intermediate download progress,
+    are never sent.
+
+    Only emojis in ``managed`` are ever removed, so reactions from other
+    features are left alone.
+    """
+
+    DEBOUNCE: ClassVar[float] = 1.0  # Seconds to gather changes before applying
+    MIN_INTERVAL: ClassVar[float] = 0.35  # Seconds between requests per channel
+    MAX_TRACKED: ClassVar[int] = 1000
+    TRACK_TTL: ClassVar[float] = 3600.0  # 1 hour in seconds
+
+    def __init__(self, bot: discord.Client, managed: Iterable[str]) -> None:
+        """
+        Initialize the reconciler.
+
+        Args:
+            bot: Bot whose reactions are managed
+            managed: Every emoji the reconciler may add or remove
+        """
+        self.bot = bot
+        self.managed: FrozenSet[str] = frozenset(managed)
+        self._messages: TTLCache[int, MessageReactions] = TTLCache(
+            self.MAX_TRACKED, self.TRACK_TTL
+        )
+        # Channel ID -> pending message IDs, in the order they changed
+        self._pending: Dict[int, Dict[int, None]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._stopped = False
+        self.requested = 0
+        self.coalesced = 0
+        self.added = 0
+        self.removed = 0
+        self.failed = 0
+
+    def set(self, message: discord.Message, slot: str, emoji: Optional[str]) -> None:
+        """
+        Set the reaction a message should show in a slot.
+
+        Must be called from the event loop; use set_threadsafe from other
+        threads.
+
+        Args:
+            message: Message to react to
+            slot: Name of the slot, e.g. "status" or "progress"
+            emoji: Reaction to show, None to clear the slot
+        """
+        if self._stopped:
+            return
+
+        record = self._messages.get(message.id)
+        if record is None:
+            if emoji is None:
+                return
+            record = MessageReactions(message)
+            self._messages.set(message.id, record)
+
+        if record.slots.get(slot) == emoji:
+            return
+        if emoji is None:
+            record.slots.pop(slot, None)
+        else:
+            record.slots[slot] = emoji
+        self.requested += 1
+
+        pending = self._pending.setdefault(message.channel.id, {})
+        if message.id in pending:
+            self.coalesced += 1
+        else:
+            pending[message.id] = None
+
+        worker = self._workers.get(message.channel.id)
+        if worker is None or worker.done():
+            self._workers[message.channel.id] = asyncio.create_task(
+                self._run(message.channel.id)
+            )
+
+    def set_threadsafe(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        message: discord.Message,
+        slot: str,
+        emoji: Optional[str],
+    ) -> None:
+        """Call set on the event loop from any thread, e.g. a download hook"""
+        loop.call_soon_threadsafe(self.set, message, slot, emoji)
+
+    async def _run(self, channel_id: int) -> None:
+        """Apply pending changes of one channel until there are none"""
+        pending = self._pending[channel_id]
+        try:
+            while pending:
+                await asyncio.sleep(self.DEBOUNCE)
+                while pending:
+                    message_id = next(iter(pending))
+                    del pending[message_id]
+                    record = self._messages.peek(message_id)
+                    if record is not None:
+                        await self._apply(message_id, record)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(
+                f"Reaction worker for channel {channel_id} failed: {e}", exc_info=True
+            )
+        finally:
+            if not pending:
+                self._pending.pop(channel_id, None)
+            self._workers.pop(channel_id, None)
+
+    async def _apply(self, message_id: int, record: MessageReactions) -> None:
+        """Add and remove the reactions that differ from the applied set"""
+        if record.applied is None:
+            record.applied = {
+                str(reaction.emoji)
+                for reaction in getattr(record.message, "reactions", ())
+                if reaction.me and str(reaction.emoji) in self.managed
+            }
+
+        # Re-read the desired state before each request, it may change meanwhile
+        while True:
+            desired = record.desired
+            remove = [e for e in record.applied if e not in desired]
+            add = [e for e in desired if e not in record.applied]
+            if not remove and not add:
+                return
+
+            try:
+                if remove:
+                    emoji = remove[0]
+                    await record.message.remove_reaction(emoji, self.bot.user)
+                    record.applied.discard(emoji)
+                    self.removed += 1
+                else:
+                    emoji = add[0]
+                    await record.message.add_reaction(emoji)
+                    record.applied.add(emoji)
+                    self.added += 1
+            except discord.NotFound:
+                # Message was deleted
+                self._messages.pop(message_id, None)
+                return
+            except discord.HTTPException as e:
+                self.failed += 1
+                logger.warning(f"Failed to update reactions on message {message_id}: {e}")
+                return
+
+            await asyncio.sleep(self.MIN_INTERVAL)
+
+    async def stop(self) -> None:
+        """Stop all workers, dropping changes not yet applied"""
+        self._stopped = True
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        for worker in workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers.clear()
+        self._pending.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reaction update counters"""
+        return {
+            "tracked": len(self._messages),
+            "pending": sum(len(pending) for pending in self._pending.values()),
+            "active_channels": len(self._workers),
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "added": self.added,
+            "removed": self.removed,
+            "failed": self.failed,
+        }
@@ -2,10 +2,8 @@
 
 import logging
 import asyncio
-import re
 from typing import List, Optional
 import discord  # type: ignore
-from urllib.parse import urlparse
 
 # try:
 # Try relative imports first
@@ -31,51 +29,43 @@ logger = logging.getLogger("VideoArchiver")
 
 
 async def handle_archived_reaction(
-    message: discord.Message, user: discord.User, db: VideoArchiveDB
-) -> None:
+    channel: discord.abc.Messageable, message_id: int, db: VideoArchiveDB
+) -> bool:
     """
-    Handle reaction to archived video message.
+    Reply with the archived copies of the videos posted in a message.
+
+    Videos are looked up in the database's message index, and the reply is
+    sent through a partial message, so the message itself is never fetched.
 
     Args:
-        message: The Discord message that was reacted to
-        user: The user who added the reaction
+        channel: Channel of the message that was reacted to
+        message_id: ID of the message that was reacted to
         db: Database instance for checking archived videos
+
+    Returns:
+        bool: True if a reply was sent
     """
     try:
-        # Check if the reaction is from a user (not the bot) and is the archived reaction
-        if user.bot or str(message.reactions[0].emoji) != get_reaction(
-            ReactionType.ARCHIVED
-        ):
-            return
-
-        # Extract URLs from the message using regex
-        url_pattern = re.compile(r'https?://[^\s<>"]+|www\.[^\s<>"]+')
-        urls = url_pattern.findall(message.content) if message.content else []
-
-        # Check each URL in the database
-        for url in urls:
-            # Ensure URL has proper scheme
-            if url.startswith("www."):
-                url = "http://" + url
-
-            # Validate URL
-            try:
-                result = urlparse(url)
-                if not all([result.scheme, result.netloc]):
-                    continue
-            except Exception:
-                continue
-
-            result = db.get_archived_video(url)
-            if result:
-                discord_url = result[0]
-                await message.reply(
-                    f"This video was already archived. You can find it here: {discord_url}"
-                )
-                return
+        videos = await db.get_message_videos(message_id)
+        if not videos:
+            return False
+
+        if len(videos) == 1:
+            content = (
+                "This video was already archived. "
+                f"You can find it here: {videos[0]['discord_url']}"
+            )
+        else:
+            content = "These videos were already archived:\n" + "\n".join(
+                video["discord_url"] for video in videos
+            )
+
+        await channel.get_partial_message(message_id).reply(content)
+        return True
 
     except Exception as e:
         logger.error(f"Error handling archived reaction: {e}", exc_info=True)
+        return False
 
 
 async def update_queue_position_reaction(
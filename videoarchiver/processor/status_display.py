@@ -49,6 +49,9 @@ class DisplaySection(Enum):
     COMPRESSIONS = auto()
     ERRORS = auto()
     HARDWARE = auto()
+    HOSTS = auto()
+    ENCODING = auto()
+    LANES = auto()
 
 
 class DisplayCondition(Enum):
@@ -57,6 +60,9 @@ class DisplayCondition(Enum):
     HAS_ERRORS = "has_errors"
     HAS_DOWNLOADS = "has_downloads"
     HAS_COMPRESSIONS = "has_compressions"
+    HAS_HOSTS = "has_hosts"
+    HAS_ENCODING = "has_encoding"
+    HAS_LANES = "has_lanes"
 
 
 @dataclass
@@ -244,6 +250,43 @@ class DisplayManager:
                 ),
                 order=5,
             ),
+            DisplaySection.HOSTS: DisplayTemplate(
+                name="Site Request Limits",
+                format_string=(
+                    "{host}: {rate}/s, {in_flight} active, "
+                    "{requests} req, {error_rate} err, "
+                    "{throttled} waited ({avg_wait} avg){status}\n"
+                ),
+                order=6,
+                condition=DisplayCondition.HAS_HOSTS,
+            ),
+            DisplaySection.ENCODING: DisplayTemplate(
+                name="Encode Scheduler",
+                format_string=(
+                    "```\n"
+                    "Cores: {allocated}/{total} allocated\n"
+                    "Utilization: {utilization} (now {current})\n"
+                    "Jobs: {active} encoding, {queued} waiting\n"
+                    "Wait: {avg_wait} avg, {p95_wait} p95\n"
+                    "```"
+                ),
+                order=7,
+                condition=DisplayCondition.HAS_ENCODING,
+            ),
+            DisplaySection.LANES: DisplayTemplate(
+                name="Message Lanes",
+                format_string=(
+                    "```\n"
+                    "Lanes: {active}/{lanes} running, inbox {inbox_size}\n"
+                    "Depth: {depths}\n"
+                    "Queued: {queued} (peak {peak_depth})\n"
+                    "Messages: {processed} done, {failed} failed, "
+                    "{backpressured} waited\n"
+                    "```"
+                ),
+                order=8,
+                condition=DisplayCondition.HAS_LANES,
+            ),
         }
         self.theme = self.DEFAULT_THEME.copy()
 
@@ -309,6 +352,18 @@ class StatusDisplay:
                         display._add_error_statistics(embed, queue_status, template)
                     elif section == DisplaySection.HARDWARE:
                         display._add_hardware_statistics(embed, queue_status, template)
+                    elif section == DisplaySection.HOSTS:
+                        display._add_host_statistics(
+                            embed, queue_status.get("hosts", {}), template
+                        )
+                    elif section == DisplaySection.ENCODING:
+                        display._add_encoding_statistics(
+                            embed, queue_status.get("encoding", {}), template
+                        )
+                    elif section == DisplaySection.LANES:
+                        display._add_lane_statistics(
+                            embed, queue_status.get("lanes", {}), template
+                        )
                 except Exception as e:
                     logger.error(f"Error adding section {section.value}: {e}")
                     # Continue with other sections
@@ -320,6 +375,76 @@ class StatusDisplay:
             logger.error(error, exc_info=True)
             raise DisplayError(error)
 
+    @classmethod
+    def create_backfill_embed(cls, progress: Dict[str, Any]) -> discord.Embed:
+        """
+        Create an embed displaying the progress of a channel backfill.
+
+        Args:
+            progress: Dictionary from BackfillProgress.to_dict
+
+        Returns:
+            Discord embed containing formatted progress information
+
+        Raises:
+            DisplayError: If there's an error creating the embed
+        """
+        try:
+            display = cls()
+            theme = display.display_manager.theme
+            state = progress.get("state", "running")
+            color = {
+                "running": theme["info_color"],
+                "completed": theme["success_color"],
+                "cancelled": theme["warning_color"],
+                "failed": theme["error_color"],
+            }.get(state, theme["title_color"])
+
+            embed = discord.Embed(
+                title="Channel Backfill",
+                description=f"<#{progress.get('channel_id')}>: {state}",
+                color=color,
+                timestamp=datetime.utcnow(),
+            )
+            embed.add_field(
+                name="Progress",
+                value=(
+                    "```\n"
+                    f"Messages Scanned: {progress.get('scanned', 0)}\n"
+                    f"Messages With Videos: {progress.get('matched', 0)}\n"
+                    f"Videos Queued: {progress.get('queued', 0)}\n"
+                    f"Duplicates Skipped: {progress.get('duplicates', 0)}\n"
+                    f"Not Queued: {progress.get('rejected', 0)}\n"
+                    "```"
+                ),
+                inline=True,
+            )
+            embed.add_field(
+                name="Throughput",
+                value=(
+                    "```\n"
+                    f"Pages: {progress.get('pages', 0)}\n"
+                    f"Rate: {progress.get('rate', 0.0):.1f} msg/s\n"
+                    f"Elapsed: {display.formatter.format_time(progress.get('elapsed', 0.0))}\n"
+                    "```"
+                ),
+                inline=True,
+            )
+            if progress.get("error"):
+                embed.add_field(
+                    name="Error",
+                    value=f"```\n{progress['error'][:1000]}```",
+                    inline=False,
+                )
+            if progress.get("cursor"):
+                embed.set_footer(text=f"Cursor: {progress['cursor']}")
+            return embed
+
+        except Exception as e:
+            error = f"Error creating backfill embed: {str(e)}"
+            logger.error(error, exc_info=True)
+            raise DisplayError(error)
+
     def _check_condition(
         self,
         condition: DisplayCondition,
@@ -334,6 +459,12 @@ class StatusDisplay:
                 return bool(active_ops.get("downloads"))
             elif condition == DisplayCondition.HAS_COMPRESSIONS:
                 return bool(active_ops.get("compressions"))
+            elif condition == DisplayCondition.HAS_HOSTS:
+                return bool(queue_status.get("hosts"))
+            elif condition == DisplayCondition.HAS_ENCODING:
+                return bool(queue_status.get("encoding", {}).get("admitted"))
+            elif condition == DisplayCondition.HAS_LANES:
+                return bool(queue_status.get("lanes", {}).get("submitted"))
             return True
         except Exception as e:
             logger.error(f"Error checking condition {condition}: {e}")
@@ -554,3 +685,109 @@ class StatusDisplay:
                 value="```\nError displaying hardware statistics```",
                 inline=template.inline,
             )
+
+    def _add_host_statistics(
+        self, embed: discord.Embed, hosts: Dict[str, Any], template: DisplayTemplate
+    ) -> None:
+        """Add per-host request limiter statistics to the embed"""
+        try:
+            # Busiest hosts first
+            ordered = sorted(
+                hosts.items(), key=lambda x: x[1].get("requests", 0), reverse=True
+            )
+            content = []
+            for host, stats in ordered[: template.max_items]:
+                status = ""
+                if stats.get("cooling_down"):
+                    status = " [cooling down]"
+                elif stats.get("rate", 0) < stats.get("base_rate", 0):
+                    status = " [slowed]"
+                content.append(
+                    template.format_string.format(
+                        host=host,
+                        rate=f"{stats.get('rate', 0):.2f}",
+                        in_flight=stats.get("in_flight", 0),
+                        requests=stats.get("requests", 0),
+                        error_rate=self.formatter.format_percentage(
+                            stats.get("error_rate", 0) * 100
+                        ),
+                        throttled=stats.get("throttled", 0),
+                        avg_wait=self.formatter.format_time(stats.get("avg_wait", 0)),
+                        status=status,
+                    )
+                )
+
+            if len(hosts) > template.max_items:
+                content.append(f"... and {len(hosts) - template.max_items} more\n")
+
+            embed.add_field(
+                name=template.name,
+                value=f"```\n{''.join(content)}```",
+                inline=template.inline,
+            )
+        except Exception as e:
+            logger.error(f"Error adding host statistics: {e}")
+            embed.add_field(
+                name=template.name,
+                value="```\nError displaying host statistics```",
+                inline=template.inline,
+            )
+
+    def _add_encoding_statistics(
+        self, embed: discord.Embed, encoding: Dict[str, Any], template: DisplayTemplate
+    ) -> None:
+        """Add encode scheduler statistics to the embed"""
+        try:
+            embed.add_field(
+                name=template.name,
+                value=template.format_string.format(
+                    allocated=encoding.get("allocated_cores", 0),
+                    total=encoding.get("total_cores", 0),
+                    utilization=self.formatter.format_percentage(
+                        encoding.get("utilization", 0) * 100
+                    ),
+                    current=self.formatter.format_percentage(
+                        encoding.get("current_utilization", 0) * 100
+                    ),
+                    active=encoding.get("active_jobs", 0),
+                    queued=encoding.get("queued_jobs", 0),
+                    avg_wait=self.formatter.format_time(encoding.get("avg_wait", 0)),
+                    p95_wait=self.formatter.format_time(encoding.get("p95_wait", 0)),
+                ),
+                inline=template.inline,
+            )
+        except Exception as e:
+            logger.error(f"Error adding encoding statistics: {e}")
+            embed.add_field(
+                name=template.name,
+                value="```\nError displaying encoding statistics```",
+                inline=template.inline,
+            )
+
+    def _add_lane_statistics(
+        self, embed: discord.Embed, lanes: Dict[str, Any], template: DisplayTemplate
+    ) -> None:
+        """Add message lane depth statistics to the embed"""
+        try:
+            embed.add_field(
+                name=template.name,
+                value=template.format_string.format(
+                    active=lanes.get("active_lanes", 0),
+                    lanes=lanes.get("lanes", 0),
+                    inbox_size=lanes.get("inbox_size", 0),
+                    depths=" ".join(str(d) for d in lanes.get("depths", [])),
+                    queued=lanes.get("queued", 0),
+                    peak_depth=lanes.get("peak_depth", 0),
+                    processed=lanes.get("processed", 0),
+                    failed=lanes.get("failed", 0),
+                    backpressured=lanes.get("backpressured", 0),
+                ),
+                inline=template.inline,
+            )
+        except Exception as e:
+            logger.error(f"Error adding lane statistics: {e}")
+            embed.add_field(
+                name=template.name,
+                value="```\nError displaying lane statistics```",
+                inline=template.inline,
+            )
@@ -1,13 +1,27 @@
 """URL extraction functionality for video processing"""
 
+import argparse
 import logging
+import random
 import re
+import sys
+import time
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Set, Pattern, ClassVar
+from typing import List, Dict, Optional, Set, Pattern, ClassVar, Tuple
 from datetime import datetime
 import discord # type: ignore
-from urllib.parse import urlparse, parse_qs, ParseResult
+from urllib.parse import urlparse, urlsplit, parse_qs, ParseResult, SplitResult
+
+# try:
+# Try relative imports first
+from utils.site_registry import SiteRegistry, site_registry
+from utils.ttl_cache import TTLCache
+
+# except ImportError:
+# Fall back to absolute imports if relative imports fail
+# from videoarchiver.utils.site_registry import SiteRegistry, site_registry
+# from videoarchiver.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger("VideoArchiver")
 
@@ -35,6 +49,8 @@ class URLMetadata:
     video_id: Optional[str] = None
     quality: Optional[str] = None
     extraction_time: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    domain: Optional[str] = None
+    canonical_url: Optional[str] = None
 
 class URLType(Enum):
     """Types of video URLs"""
@@ -43,44 +59,22 @@ class URLType(Enum):
     UNKNOWN = "unknown"
 
 class URLPatternManager:
-    """Manages URL patterns for different video sites"""
-
-    YOUTUBE_PATTERN: ClassVar[Pattern] = re.compile(
-        r'(?:https?://)?(?:www\.)?'
-        r'(?:youtube\.com/watch\?v=|youtu\.be/)'
-        r'([a-zA-Z0-9_-]{11})'
-    )
-    VIMEO_PATTERN: ClassVar[Pattern] = re.compile(
-        r'(?:https?://)?(?:www\.)?'
-        r'vimeo\.com/(?:channels/(?:\w+/)?|groups/(?:[^/]*/)*|)'
-        r'(\d+)(?:|/\w+)*'
-    )
-    TWITTER_PATTERN: ClassVar[Pattern] = re.compile(
-        r'(?:https?://)?(?:www\.)?'
-        r'(?:twitter\.com|x\.com)/\w+/status/(\d+)'
-    )
+    """Manages URL patterns for different video sites, from the site registry"""
 
-    def __init__(self) -> None:
+    def __init__(self, registry: SiteRegistry = site_registry) -> None:
+        self.registry = registry
         self.patterns: Dict[str, URLPattern] = {
-            "youtube": URLPattern(
-                site="youtube",
-                pattern=self.YOUTUBE_PATTERN,
-                supports_timestamp=True,
-                supports_playlist=True
-            ),
-            "vimeo": URLPattern(
-                site="vimeo",
-                pattern=self.VIMEO_PATTERN,
-                supports_timestamp=True
-            ),
-            "twitter": URLPattern(
-                site="twitter",
-                pattern=self.TWITTER_PATTERN,
-                requires_api=True
+            name: URLPattern(
+                site=name,
+                pattern=site.pattern,
+                requires_api=site.requires_api,
+                supports_timestamp=site.supports_timestamp,
+                supports_playlist=site.supports_playlist
             )
+            for name, site in registry.sites.items()
         }
 
-        self.direct_extensions: Set[str] = {'.mp4', '.mov', '.avi', '.webm', '.mkv'}
+        self.direct_extensions: Set[str] = set(registry.direct_extensions)
 
     def get_pattern(self, site: str) -> Optional[URLPattern]:
         """
@@ -94,28 +88,59 @@ class URLPatternManager:
         """
         return self.patterns.get(site.lower())
 
-    def is_supported_site(self, url: str, enabled_sites: Optional[List[str]]) -> bool:
+    def is_supported_site(
+        self,
+        url: str,
+        enabled_sites: Optional[List[str]],
+        site_filter: Optional[Pattern] = None
+    ) -> bool:
         """
         Check if URL is from a supported site.
         
         Args:
             url: URL to check
             enabled_sites: List of enabled site identifiers
+            site_filter: Precompiled pattern of the enabled sites, used
+                instead of enabled_sites when given
             
         Returns:
             True if site is supported, False otherwise
         """
-        if not enabled_sites:
+        if not enabled_sites and site_filter is None:
             return True
 
         try:
             parsed = urlparse(url.lower())
             domain = parsed.netloc.replace('www.', '')
-            return any(site.lower() in domain for site in enabled_sites)
+            return self.is_supported_domain(domain, enabled_sites, site_filter)
         except Exception as e:
             logger.error(f"Error checking site support for {url}: {e}")
             return False
 
+    def is_supported_domain(
+        self,
+        domain: str,
+        enabled_sites: Optional[List[str]],
+        site_filter: Optional[Pattern] = None
+    ) -> bool:
+        """
+        Check if an already parsed domain is from a supported site.
+        
+        Args:
+            domain: Lowercase domain without www.
+            enabled_sites: List of enabled site identifiers
+            site_filter: Precompiled pattern of the enabled sites, used
+                instead of enabled_sites when given
+            
+        Returns:
+            True if site is supported, False otherwise
+        """
+        if site_filter is not None:
+            return site_filter.search(domain) is not None
+        if not enabled_sites:
+            return True
+        return any(site.lower() in domain for site in enabled_sites)
+
 class URLValidator:
     """Validates extracted URLs"""
 
@@ -184,21 +209,22 @@ class URLMetadataExtractor:
                 return URLMetadata(url=url, site="direct")
 
             # Handle platform URLs
-            for site, pattern in self.pattern_manager.patterns.items():
-                if match := pattern.pattern.match(url):
-                    metadata = URLMetadata(
-                        url=url,
-                        site=site,
-                        video_id=match.group(1)
-                    )
-                    
-                    # Extract additional metadata
-                    if pattern.supports_timestamp:
-                        metadata.timestamp = self._extract_timestamp(parsed)
-                    if pattern.supports_playlist:
-                        metadata.playlist_id = self._extract_playlist_id(parsed)
-                    
-                    return metadata
+            if site_match := self.pattern_manager.registry.match(url):
+                pattern = self.pattern_manager.patterns[site_match.site.name]
+                metadata = URLMetadata(
+                    url=url,
+                    site=pattern.site,
+                    video_id=site_match.video_id,
+                    canonical_url=site_match.canonical_url
+                )
+                
+                # Extract additional metadata
+                if pattern.supports_timestamp:
+                    metadata.timestamp = self._extract_timestamp(parsed)
+                if pattern.supports_playlist:
+                    metadata.playlist_id = self._extract_playlist_id(parsed)
+                
+                return metadata
 
             return None
 
@@ -234,19 +260,119 @@ class URLMetadataExtractor:
             logger.error(f"Unexpected error extracting playlist ID: {e}")
             return None
 
+class URLScanner:
+    """Finds and classifies video URLs in one pass over message content
+
+    Every URL in the content is found with a single combined regex that
+    also contains every site registry pattern as a named alternative, so
+    the site and video ID come out of the same match. Each URL is then
+    split once for its domain, path and query.
+    """
+
+    # Start of an absolute http(s) URL that is not part of a longer word
+    URL_START: ClassVar[str] = r'(?<![\w/])(?=https?://[^\s<>/])'
+    # Rest of the URL; Discord wraps links in <> to suppress embeds
+    URL_TAIL: ClassVar[str] = r'[^\s<>]*'
+    # Sentence punctuation that ends up after links in chat messages
+    TRAILING: ClassVar[str] = '.,;:!?\'")]}'
+
+    def __init__(self, pattern_manager: URLPatternManager) -> None:
+        self.pattern_manager = pattern_manager
+        self.registry = pattern_manager.registry
+        self.pattern: Pattern = re.compile(
+            f"{self.URL_START}(?:{self.registry.alternation})?{self.URL_TAIL}"
+        )
+        self._direct_extensions: Tuple[str, ...] = tuple(
+            pattern_manager.direct_extensions
+        )
+
+    def scan(self, content: Optional[str]) -> List[URLMetadata]:
+        """
+        Extract metadata for every video URL in a text, in order, without duplicates.
+        
+        Args:
+            content: Message content or a single URL
+            
+        Returns:
+            List of URLMetadata objects, with domain set
+        """
+        if not content or "http" not in content:
+            return []
+
+        results: List[URLMetadata] = []
+        seen: Set[str] = set()
+        for match in self.pattern.finditer(content):
+            url = match.group(0).rstrip(self.TRAILING)
+            if url in seen:
+                continue
+            seen.add(url)
+            metadata = self._classify(url, match)
+            if metadata:
+                results.append(metadata)
+        return results
+
+    def _classify(self, url: str, match: "re.Match") -> Optional[URLMetadata]:
+        """Build metadata for one URL from its scanner match"""
+        try:
+            parsed = urlsplit(url)
+        except ValueError:
+            return None
+        domain = parsed.netloc.lower()
+        if domain.startswith("www."):
+            domain = domain[4:]
+
+        if parsed.path.lower().endswith(self._direct_extensions):
+            return URLMetadata(url=url, site="direct", domain=domain)
+
+        site_match = self.registry.resolve(match)
+        if site_match is None:
+            return None
+        url_pattern = self.pattern_manager.patterns[site_match.site.name]
+        metadata = URLMetadata(
+            url=url,
+            site=url_pattern.site,
+            video_id=site_match.video_id,
+            domain=domain,
+            canonical_url=site_match.canonical_url,
+        )
+        if parsed.query and (url_pattern.supports_timestamp or url_pattern.supports_playlist):
+            self._add_query_metadata(metadata, url_pattern, parsed)
+        return metadata
+
+    @staticmethod
+    def _add_query_metadata(
+        metadata: URLMetadata, url_pattern: URLPattern, parsed: SplitResult
+    ) -> None:
+        """Fill timestamp and playlist ID from the query string"""
+        params = parse_qs(parsed.query)
+        if url_pattern.supports_timestamp and 't' in params:
+            try:
+                metadata.timestamp = int(params['t'][0])
+            except ValueError:
+                logger.debug(f"Ignoring non-numeric timestamp in {metadata.url}")
+        if url_pattern.supports_playlist and 'list' in params:
+            metadata.playlist_id = params['list'][0]
+
 class URLExtractor:
     """Handles extraction of video URLs from messages"""
 
+    CACHE_SIZE: ClassVar[int] = 1000
+    CACHE_TTL: ClassVar[float] = 3600.0  # 1 hour in seconds
+
     def __init__(self) -> None:
         self.pattern_manager = URLPatternManager()
         self.validator = URLValidator(self.pattern_manager)
         self.metadata_extractor = URLMetadataExtractor(self.pattern_manager)
-        self._url_cache: Dict[str, Set[str]] = {}
+        self.scanner = URLScanner(self.pattern_manager)
+        self._url_cache: TTLCache[str, List[URLMetadata]] = TTLCache(
+            self.CACHE_SIZE, self.CACHE_TTL
+        )
 
     async def extract_urls(
         self,
         message: discord.Message,
-        enabled_sites: Optional[List[str]] = None
+        enabled_sites: Optional[List[str]] = None,
+        site_filter: Optional[Pattern] = None
     ) -> List[URLMetadata]:
         """
         Extract video URLs from message content and attachments.
@@ -254,87 +380,54 @@ class URLExtractor:
         Args:
             message: Discord message to extract URLs from
             enabled_sites: Optional list of enabled site identifiers
+            site_filter: Optional precompiled pattern of the enabled sites
             
         Returns:
             List of URLMetadata objects for extracted URLs
         """
-        urls: List[URLMetadata] = []
-        
         try:
             # Check cache
             cache_key = f"{message.id}_{'-'.join(enabled_sites) if enabled_sites else 'all'}"
-            if cache_key in self._url_cache:
-                return [
-                    metadata for url in self._url_cache[cache_key]
-                    if (metadata := self.metadata_extractor.extract_metadata(url))
-                ]
+            cached = self._url_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
 
             # Extract URLs
-            content_urls = await self._extract_from_content(message.content, enabled_sites)
-            attachment_urls = await self._extract_from_attachments(message.attachments)
-            
-            # Process all URLs
-            all_urls = content_urls + attachment_urls
-            valid_urls: Set[str] = set()
-            
-            for url in all_urls:
-                if not self.validator.is_valid_url(url):
-                    logger.debug(f"Invalid URL format: {url}")
+            candidates = self.scanner.scan(message.content)
+            candidates += await self._extract_from_attachments(message.attachments)
+
+            urls: List[URLMetadata] = []
+            for metadata in candidates:
+                if not self.pattern_manager.is_supported_domain(
+                    metadata.domain, enabled_sites, site_filter
+                ):
+                    logger.debug(f"URL {metadata.url} doesn't match any enabled sites")
                     continue
-                    
-                if not self.pattern_manager.is_supported_site(url, enabled_sites):
-                    logger.debug(f"URL {url} doesn't match any enabled sites")
-                    continue
-                    
-                metadata = self.metadata_extractor.extract_metadata(url)
-                if metadata:
-                    urls.append(metadata)
-                    valid_urls.add(url)
-                else:
-                    logger.debug(f"Could not extract metadata from URL: {url}")
+                urls.append(metadata)
 
             # Update cache
-            self._url_cache[cache_key] = valid_urls
+            self._url_cache.set(cache_key, urls)
             
-            return urls
+            return list(urls)
 
         except Exception as e:
             logger.error(f"Error extracting URLs from message {message.id}: {e}", exc_info=True)
             return []
 
-    async def _extract_from_content(
-        self,
-        content: Optional[str],
-        enabled_sites: Optional[List[str]]
-    ) -> List[str]:
-        """Extract video URLs from message content"""
-        if not content:
-            return []
-
-        try:
-            urls = []
-            for word in content.split():
-                if self.validator.get_url_type(word) != URLType.UNKNOWN:
-                    urls.append(word)
-            return urls
-        except Exception as e:
-            logger.error(f"Error extracting URLs from content: {e}", exc_info=True)
-            return []
-
     async def _extract_from_attachments(
         self,
         attachments: List[discord.Attachment]
-    ) -> List[str]:
+    ) -> List[URLMetadata]:
         """Extract video URLs from message attachments"""
         try:
-            return [
-                attachment.url
-                for attachment in attachments
+            urls: List[URLMetadata] = []
+            for attachment in attachments:
                 if any(
                     attachment.filename.lower().endswith(ext)
                     for ext in self.pattern_manager.direct_extensions
-                )
-            ]
+                ):
+                    urls.extend(self.scanner.scan(attachment.url))
+            return urls
         except Exception as e:
             logger.error(f"Error extracting URLs from attachments: {e}", exc_info=True)
             return []
@@ -349,7 +442,7 @@ class URLExtractor:
         try:
             if message_id:
                 keys_to_remove = [
-                    key for key in self._url_cache
+                    key for key in self._url_cache.keys()
                     if key.startswith(f"{message_id}_")
                 ]
                 for key in keys_to_remove:
@@ -358,3 +451,87 @@ class URLExtractor:
                 self._url_cache.clear()
         except Exception as e:
             logger.error(f"Error clearing URL cache: {e}", exc_info=True)
+
+    def get_cache_stats(self) -> Dict[str, float]:
+        """Get URL cache size and hit rate"""
+        return self._url_cache.get_stats()
+
+
+# Micro-benchmark, with videoarchiver/ and videoarchiver/utils on PYTHONPATH:
+# python processor/url_extractor.py [--messages N] [--rounds N]
+
+BENCHMARK_MESSAGES: Tuple[str, ...] = (
+    "lol did anyone else see that",
+    "ok brb",
+    "check this out https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/9bZkp7q19f0?t=42 the part at 0:42 is wild",
+    "found it: <https://vimeo.com/76979871> (the embed was huge)",
+    "https://x.com/someone/status/1712345678901234567",
+    "https://twitter.com/another_user/status/1698765432109876543?s=20 lmao",
+    "docs are at https://discordpy.readthedocs.io/en/stable/api.html#discord.Message",
+    "clip: https://cdn.discordapp.com/attachments/1/2/clip.mp4?ex=65&is=64&hm=abc",
+    "playlist https://www.youtube.com/watch?v=kJQP7kiw5Fk&list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI",
+    "two links https://youtu.be/JGwWNGJdvx8 and https://youtu.be/OPf0YbXqDm0, both good",
+    "not a link: youtube.com/watch?v=dQw4w9WgXcQ without the scheme",
+    "see https://github.com/pacnpal/Pac-cogs/issues for bugs",
+    "this message is a bit longer and talks about the weekend plans, "
+    "nothing to archive here but it has a lot of words to split",
+)
+
+
+def _legacy_extract(extractor: URLExtractor, content: str) -> List[str]:
+    """Per-word extraction as done before URLScanner, for comparison"""
+    urls = []
+    for word in content.split():
+        if extractor.validator.get_url_type(word) == URLType.UNKNOWN:
+            continue
+        if not extractor.validator.is_valid_url(word):
+            continue
+        if not extractor.pattern_manager.is_supported_site(word, None):
+            continue
+        metadata = extractor.metadata_extractor.extract_metadata(word)
+        if metadata:
+            urls.append(metadata.url)
+    return urls
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the benchmark"""
+    parser = argparse.ArgumentParser(
+        description="Compare per-word and single-pass URL extraction"
+    )
+    parser.add_argument("--messages", type=int, default=20_000, help="Corpus size")
+    parser.add_argument("--rounds", type=int, default=5, help="Best of N rounds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    corpus = [rng.choice(BENCHMARK_MESSAGES) for _ in range(args.messages)]
+    extractor = URLExtractor()
+
+    def best_of(extract) -> Tuple[float, int]:
+        best, found = float("inf"), 0
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            found = sum(len(extract(content)) for content in corpus)
+            best = min(best, time.perf_counter() - start)
+        return best, found
+
+    legacy_time, legacy_found = best_of(lambda c: _legacy_extract(extractor, c))
+    scan_time, scan_found = best_of(extractor.scanner.scan)
+
+    per_message = 1_000_000 / len(corpus)
+    print(f"messages: {len(corpus)}, best of {args.rounds}")
+    print(f"per-word:    {legacy_time * per_message:7.2f} us/msg, {legacy_found} urls")
+    print(f"single-pass: {scan_time * per_message:7.2f} us/msg, {scan_found} urls")
+    print(f"speedup:     {legacy_time / scan_time:.2f}x")
+    for content in BENCHMARK_MESSAGES:
+        old = _legacy_extract(extractor, content)
+        new = [m.url for m in extractor.scanner.scan(content)]
+        if old != new:
+            print(f"differs: {content[:60]!r}\n  per-word: {old}\n  single-pass: {new}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -219,6 +219,57 @@ class EnhancedVideoQueueManager(IQueueManager):
             logger.error(f"Error adding to queue: {e}")
             raise QueueError(f"Failed to add to queue: {str(e)}")
 
+    async def add_many(
+        self,
+        urls: List[str],
+        message_id: int,
+        channel_id: int,
+        guild_id: int,
+        author_id: int,
+        priority: int = 0,
+    ) -> List[bool]:
+        """Add several videos from one message to the processing queue
+
+        The batch is inserted under one state lock acquisition and the
+        queue state is persisted once.
+
+        Returns:
+            List[bool]: Whether each URL was added, in the order given
+        """
+        if self.coordinator.state in (QueueState.STOPPED, QueueState.ERROR):
+            raise QueueError("Queue manager is not running")
+
+        if not urls:
+            return []
+
+        # Wait if queue is paused
+        await self.coordinator.wait_if_paused()
+
+        try:
+            added_at = datetime.utcnow()
+            items = [
+                QueueItem(
+                    url=url,
+                    message_id=message_id,
+                    channel_id=channel_id,
+                    guild_id=guild_id,
+                    author_id=author_id,
+                    added_at=added_at,
+                    priority=priority,
+                )
+                for url in urls
+            ]
+
+            results = await self.state_manager.add_many(items)
+            if any(results) and self.persistence:
+                await self._persist_state()
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error adding batch to queue: {e}")
+            raise QueueError(f"Failed to add batch to queue: {str(e)}")
+
     def get_queue_status(self, guild_id: int) -> Dict[str, Any]:
         """Get current queue status for a guild"""
         try:
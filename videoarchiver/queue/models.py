@@ -26,6 +26,7 @@ class QueueItem:
     retry_count: int = 0
     priority: int = 0
     last_retry: Optional[datetime] = None
+    next_attempt_at: Optional[datetime] = None  # Earliest time a retry may run
     last_error: Optional[str] = None
     last_error_time: Optional[datetime] = None
     start_time: Optional[float] = None  # Added start_time for processing tracking
@@ -60,6 +61,20 @@ class QueueItem:
         elif not isinstance(self.last_error_time, datetime):
             self.last_error_time = None
 
+        if isinstance(self.next_attempt_at, str):
+            try:
+                self.next_attempt_at = datetime.fromisoformat(self.next_attempt_at)
+            except ValueError:
+                self.next_attempt_at = None
+        elif not isinstance(self.next_attempt_at, datetime):
+            self.next_attempt_at = None
+
+    def is_due(self, now: Optional[datetime] = None) -> bool:
+        """Check if the item may be processed now"""
+        if self.next_attempt_at is None:
+            return True
+        return (now or datetime.utcnow()) >= self.next_attempt_at
+
     def start_processing(self) -> None:
         """Mark item as started processing"""
         self.status = "processing"
@@ -93,6 +108,8 @@ class QueueItem:
             data['last_retry'] = self.last_retry.isoformat()
         if self.last_error_time:
             data['last_error_time'] = self.last_error_time.isoformat()
+        if self.next_attempt_at:
+            data['next_attempt_at'] = self.next_attempt_at.isoformat()
         return data
 
     @classmethod
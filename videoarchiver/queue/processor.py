@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from models import QueueItem
 from state_manager import QueueStateManager, ItemState
 from monitoring import QueueMonitor
+from utils.retry_policy import RetryPolicy
 
 logger = logging.getLogger("QueueProcessor")
 
@@ -182,6 +183,9 @@ class QueueProcessor:
         self.strategy = strategy
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.retry_policy = RetryPolicy(
+            max_attempts=max_retries + 1, base_delay=retry_delay
+        )
         
         self.batch_manager = BatchManager(batch_size, max_concurrent)
         self.metrics = ProcessingMetrics()
@@ -309,16 +313,23 @@ class QueueProcessor:
             self.metrics.record_success(processing_time)
             logger.info(f"Successfully processed: {item.url}")
         else:
-            if item.retry_count < self.max_retries:
+            decision = self.retry_policy.decide(error, item.retry_count)
+            if decision.retry:
                 item.retry_count += 1
-                await self.state_manager.retry_item(item)
+                # The delay is enforced by the state manager, not by sleeping here
+                await self.state_manager.retry_item(item, decision.delay)
                 self.metrics.record_retry()
-                logger.warning(f"Retrying: {item.url} (attempt {item.retry_count})")
-                await asyncio.sleep(self.retry_delay)
+                logger.warning(
+                    f"Retrying {item.url} in {decision.delay:.1f}s "
+                    f"(attempt {item.retry_count}, {decision.error_class.value})"
+                )
             else:
                 await self.state_manager.mark_completed(item, False, error)
                 self.metrics.record_failure(error or "Unknown error")
-                logger.error(f"Failed after {self.max_retries} attempts: {item.url}")
+                logger.error(
+                    f"Giving up on {item.url} after {item.retry_count + 1} attempts "
+                    f"({decision.reason}): {error}"
+                )
 
     async def stop_processing(self) -> None:
         """Stop processing queue items"""
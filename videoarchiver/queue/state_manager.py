@@ -5,7 +5,7 @@ import asyncio
 from enum import Enum
 from dataclasses import dataclass
 from typing import Dict, Set, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from models import QueueItem, QueueMetrics
 
@@ -161,48 +161,79 @@ class QueueStateManager:
 
     async def add_item(self, item: QueueItem) -> bool:
         """Add an item to the queue"""
-        if not self.validator.validate_item(item):
-            logger.error(f"Invalid queue item: {item}")
-            return False
+        return (await self.add_many([item]))[0]
 
+    async def add_many(self, items: List[QueueItem]) -> List[bool]:
+        """Add a batch of items to the queue under one lock acquisition
+
+        Items are validated and inserted in order until the queue is full,
+        and the queue is re-sorted once for the whole batch.
+
+        Args:
+            items: Items to add
+
+        Returns:
+            List[bool]: Whether each item was added, in the order given
+        """
+        valid = [self.validator.validate_item(item) for item in items]
+        for item, ok in zip(items, valid):
+            if not ok:
+                logger.error(f"Invalid queue item: {item}")
+
+        results = [False] * len(items)
         async with self._lock:
-            if len(self._queue) >= self.max_queue_size:
-                return False
+            start_size = len(self._queue)
+            for index, item in enumerate(items):
+                if not valid[index]:
+                    continue
+                if len(self._queue) >= self.max_queue_size:
+                    break
 
-            # Record transition
-            self.tracker.record_transition(StateTransition(
-                item_url=item.url,
-                from_state=ItemState.PENDING,
-                to_state=ItemState.PENDING,
-                timestamp=datetime.utcnow(),
-                reason="Initial add"
-            ))
+                # Record transition
+                self.tracker.record_transition(StateTransition(
+                    item_url=item.url,
+                    from_state=ItemState.PENDING,
+                    to_state=ItemState.PENDING,
+                    timestamp=datetime.utcnow(),
+                    reason="Initial add"
+                ))
 
-            # Add to main queue
-            self._queue.append(item)
-            self._queue.sort(key=lambda x: (-x.priority, x.added_at))
+                # Add to main queue
+                self._queue.append(item)
 
-            # Update tracking
-            if item.guild_id not in self._guild_queues:
-                self._guild_queues[item.guild_id] = set()
-            self._guild_queues[item.guild_id].add(item.url)
+                # Update tracking
+                if item.guild_id not in self._guild_queues:
+                    self._guild_queues[item.guild_id] = set()
+                self._guild_queues[item.guild_id].add(item.url)
 
-            if item.channel_id not in self._channel_queues:
-                self._channel_queues[item.channel_id] = set()
-            self._channel_queues[item.channel_id].add(item.url)
+                if item.channel_id not in self._channel_queues:
+                    self._channel_queues[item.channel_id] = set()
+                self._channel_queues[item.channel_id].add(item.url)
+
+                results[index] = True
 
-            # Take snapshot periodically
-            if len(self._queue) % 100 == 0:
-                self.tracker.take_snapshot(self)
+            if len(self._queue) > start_size:
+                self._queue.sort(key=lambda x: (-x.priority, x.added_at))
 
-            return True
+                # Take snapshot periodically
+                if len(self._queue) // 100 > start_size // 100:
+                    self.tracker.take_snapshot(self)
+
+        return results
 
     async def get_next_items(self, count: int = 5) -> List[QueueItem]:
         """Get the next batch of items to process"""
         items = []
         async with self._lock:
-            while len(items) < count and self._queue:
-                item = self._queue.pop(0)
+            now = datetime.utcnow()
+            index = 0
+            while len(items) < count and index < len(self._queue):
+                # Items waiting out a retry delay keep their place in line
+                if not self._queue[index].is_due(now):
+                    index += 1
+                    continue
+                item = self._queue.pop(index)
+                item.next_attempt_at = None
                 items.append(item)
                 self._processing[item.url] = item
                 
@@ -240,8 +271,13 @@ class QueueStateManager:
             else:
                 self._failed[item.url] = item
 
-    async def retry_item(self, item: QueueItem) -> None:
-        """Add an item back to the queue for retry"""
+    async def retry_item(self, item: QueueItem, delay: float = 0.0) -> None:
+        """Add an item back to the queue for retry
+
+        Args:
+            item: Item to requeue
+            delay: Seconds before the item becomes eligible for processing again
+        """
         if not self.validator.validate_transition(
             item,
             ItemState.FAILED,
@@ -254,6 +290,9 @@ class QueueStateManager:
             self._processing.pop(item.url, None)
             item.status = ItemState.PENDING.value
             item.last_retry = datetime.utcnow()
+            item.next_attempt_at = (
+                item.last_retry + timedelta(seconds=delay) if delay > 0 else None
+            )
             item.priority = max(0, item.priority - 1)
             
             # Record transitions
@@ -1,6 +1,9 @@
 """Shared functionality for the videoarchiver package"""
 
 from progress import (
+    ProgressSnapshot,
+    ProgressBus,
+    compression_progress_bus,
     compression_progress,
     download_progress,
     processing_progress,
@@ -16,6 +19,9 @@ from progress import (
 )
 
 __all__ = [
+    "ProgressSnapshot",
+    "ProgressBus",
+    "compression_progress_bus",
     "compression_progress",
     "download_progress",
     "processing_progress",
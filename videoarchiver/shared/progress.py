@@ -1,6 +1,77 @@
 """Shared progress tracking functionality"""
 
-from typing import Dict, Any
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger("VideoArchiver")
+
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    """Point-in-time state of one FFmpeg job, never mutated after publishing"""
+
+    key: str
+    percent: float
+    current_time: float
+    current_size: int
+    elapsed: float
+    speed: Optional[float] = None
+    fps: Optional[float] = None
+    frame: int = 0
+    done: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the field names used by progress dicts"""
+        data = asdict(self)
+        data["elapsed_time"] = f"{int(self.elapsed // 60)}:{int(self.elapsed % 60):02d}"
+        return data
+
+
+ProgressSubscriber = Callable[[ProgressSnapshot], None]
+
+
+class ProgressBus:
+    """Publishes progress snapshots to subscribers
+
+    Publishing replaces the latest snapshot for a key rather than updating a
+    shared dict, so readers always see a consistent state.
+    """
+
+    def __init__(self):
+        self._latest: Dict[str, ProgressSnapshot] = {}
+        self._subscribers: List[ProgressSubscriber] = []
+
+    def subscribe(self, subscriber: ProgressSubscriber) -> Callable[[], None]:
+        """Register a subscriber; returns a function that unsubscribes it"""
+        self._subscribers.append(subscriber)
+
+        def unsubscribe() -> None:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    def publish(self, snapshot: ProgressSnapshot) -> None:
+        """Record a snapshot and hand it to every subscriber"""
+        self._latest[snapshot.key] = snapshot
+        for subscriber in tuple(self._subscribers):
+            try:
+                subscriber(snapshot)
+            except Exception as e:
+                logger.error(f"Progress subscriber failed: {e}")
+
+    def latest(self, key: str) -> Optional[ProgressSnapshot]:
+        """Get the most recent snapshot for a key"""
+        return self._latest.get(key)
+
+    def clear(self, key: str) -> None:
+        """Forget a finished job"""
+        self._latest.pop(key, None)
+
+
+# Live compression progress; the dicts below only hold per-job settings
+compression_progress_bus = ProgressBus()
 
 # Global progress tracking
 compression_progress: Dict[str, Dict[str, Any]] = {}
@@ -9,7 +80,10 @@ processing_progress: Dict[str, Dict[str, Any]] = {}
 
 def get_compression_progress(file_id: str) -> Dict[str, Any]:
     """Get compression progress for a file"""
-    return compression_progress.get(file_id, {})
+    snapshot = compression_progress_bus.latest(file_id)
+    if snapshot is None:
+        return compression_progress.get(file_id, {})
+    return {**compression_progress.get(file_id, {}), **snapshot.to_dict()}
 
 def update_compression_progress(file_id: str, progress_data: Dict[str, Any]) -> None:
     """Update compression progress for a file"""
@@ -21,6 +95,7 @@ def update_compression_progress(file_id: str, progress_data: Dict[str, Any]) ->
 def clear_compression_progress(file_id: str) -> None:
     """Clear compression progress for a file"""
     compression_progress.pop(file_id, None)
+    compression_progress_bus.clear(file_id)
 
 def get_download_progress(url: str) -> Dict[str, Any]:
     """Get download progress for a URL"""
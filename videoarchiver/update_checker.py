@@ -19,6 +19,7 @@ import shutil
 # try:
 # Try relative imports first
 from utils.exceptions import UpdateError
+from utils.extractor_matcher import extractor_matcher
 
 # except ImportError:
 # Fall back to absolute imports if relative imports fail
@@ -307,6 +308,8 @@ class UpdateChecker:
                 raise UpdateError("Update process timed out")
 
             if process.returncode == 0:
+                # Pick up new and changed extractors for URL support checks
+                await extractor_matcher.reindex()
                 new_version = await self._get_current_version()
                 if new_version:
                     return True, f"Successfully updated to version {new_version}"
@@ -3,45 +3,66 @@
 import os
 import asyncio
 import logging
-import subprocess
+import itertools
+import tempfile
 from datetime import datetime
-from typing import Dict, Optional, Callable, Set, Tuple
+from typing import Any, Dict, List, Optional, Callable, Tuple
 
 from ffmpeg.ffmpeg_manager import FFmpegManager
 from ffmpeg.exceptions import CompressionError
+from ffmpeg.size_targeting import SizeTargetPlanner, EncodeAttempt
+from ffmpeg.reduction_planner import ReductionPlanner, ReductionPlan, ReductionTier
+from ffmpeg.segment_encoder import SegmentEncoder
+from shared.progress import compression_progress_bus
 from utils.exceptions import VideoVerificationError
 from utils.file_operations import FileOperations
+from utils.media_info import MediaInfo
 from utils.progress_handler import ProgressHandler
+from utils.ffmpeg_progress import FFmpegProgressReader
 
 logger = logging.getLogger("VideoArchiver")
 
 class CompressionHandler:
     """Handles video compression operations"""
 
+    MAX_ENCODE_ATTEMPTS = 3
+    # An encode slower than a tenth of realtime is assumed to be stuck
+    ENCODE_TIMEOUT_FACTOR = 10.0
+    ENCODE_TIMEOUT_MIN = 600.0
+
     def __init__(self, ffmpeg_mgr: FFmpegManager, progress_handler: ProgressHandler,
-                 file_ops: FileOperations):
+                 file_ops: FileOperations,
+                 progress_hz: float = FFmpegProgressReader.DEFAULT_HZ):
         self.ffmpeg_mgr = ffmpeg_mgr
         self.progress_handler = progress_handler
         self.file_ops = file_ops
-        self._active_processes: Set[subprocess.Popen] = set()
-        self._processes_lock = asyncio.Lock()
         self._shutting_down = False
         self.max_file_size = 0  # Will be set during compression
+        self.planner = SizeTargetPlanner(self.MAX_ENCODE_ATTEMPTS)
+        self.reducer = ReductionPlanner()
+        self.progress_reader = FFmpegProgressReader(progress_hz)
+        # Attempts per output file, claimed by the caller through pop_attempts
+        self._job_attempts: Dict[str, List[EncodeAttempt]] = {}
+        self._stats = {
+            "jobs": 0,
+            "attempts": 0,
+            "two_pass_encodes": 0,
+            "first_attempt_fits": 0,
+            "missed_target": 0,
+            "tier_remux": 0,
+            "tier_audio": 0,
+            "tier_video": 0,
+            "stream_copy_misses": 0,
+            "segmented_encodes": 0,
+        }
 
     async def cleanup(self) -> None:
         """Clean up compression resources"""
         self._shutting_down = True
         try:
-            async with self._processes_lock:
-                for process in self._active_processes:
-                    try:
-                        process.terminate()
-                        await asyncio.sleep(0.1)
-                        if process.poll() is None:
-                            process.kill()
-                    except Exception as e:
-                        logger.error(f"Error killing compression process: {e}")
-                self._active_processes.clear()
+            await self.ffmpeg_mgr.process_supervisor.terminate_owner(self)
+        except Exception as e:
+            logger.error(f"Error killing compression processes: {e}")
         finally:
             self._shutting_down = False
 
@@ -50,77 +71,282 @@ class CompressionHandler:
         input_file: str,
         output_file: str,
         max_size_mb: int,
-        progress_callback: Optional[Callable[[float], None]] = None
-    ) -> Tuple[bool, str]:
-        """Compress video to target size"""
+        progress_callback: Optional[Callable[[float], None]] = None,
+        media_info: Optional[MediaInfo] = None,
+        priority: int = 0,
+        allow_downmix: bool = False,
+        segmented: bool = False,
+    ) -> Tuple[bool, str, Optional[MediaInfo]]:
+        """Compress video to target size
+
+        First tries the cheapest reduction tier the probe says will fit: a
+        remux into a fresh MP4, or re-encoding only the audio with the video
+        stream copied. Otherwise, or if that output is still too large, the
+        video is encoded at an average bitrate computed from the size budget,
+        as a two-pass encode where the encoder supports it. If the result
+        still overshoots, the bitrate is corrected from the overshoot and the
+        video re-encoded, up to MAX_ENCODE_ATTEMPTS times.
+
+        Args:
+            input_file: Path to the input video
+            output_file: Path for the compressed video
+            max_size_mb: Target maximum size in MB
+            progress_callback: Optional progress callback
+            media_info: Probe result for the input, reused for parameter
+                selection and progress instead of probing again
+            priority: Encode scheduler priority (0-10, higher runs first)
+            allow_downmix: Allow mono audio when re-encoding only the audio
+            segmented: Encode long videos as parallel segments on the CPU
+
+        Returns:
+            Tuple of (success, error, output media info)
+        """
         if self._shutting_down:
-            return False, "Compression handler is shutting down"
+            return False, "Compression handler is shutting down", None
 
         self.max_file_size = max_size_mb
+        ffprobe_path = str(self.ffmpeg_mgr.get_ffprobe_path())
+        target_bytes = max_size_mb * 1024 * 1024
+        attempts: List[EncodeAttempt] = []
+        self._job_attempts[output_file] = attempts
+        self._stats["jobs"] += 1
 
         try:
+            if media_info is None:
+                media_info = await self.file_ops.probe_video(input_file, ffprobe_path)
+
+            # Stream copy tiers cost a fraction of an encode
+            if media_info:
+                output_info = await self._try_stream_copy(
+                    input_file, output_file, media_info, target_bytes,
+                    allow_downmix, progress_callback, attempts
+                )
+                if output_info:
+                    return True, "", output_info
+
             # Get optimal compression parameters
-            compression_params = self.ffmpeg_mgr.get_compression_params(
-                input_file, max_size_mb
+            compression_params = await self.ffmpeg_mgr.get_compression_params(
+                input_file, max_size_mb, media_info.probe if media_info else None
             )
-
-            # Try hardware acceleration first
-            success = await self._try_compression(
-                input_file,
-                output_file,
-                compression_params,
-                progress_callback,
-                use_hardware=True
+            duration = (
+                media_info.duration
+                if media_info
+                else await self.file_ops.get_video_duration(input_file, ffprobe_path)
             )
+            has_audio = media_info.has_audio if media_info else True
+            audio_bps = self.planner.audio_bitrate(compression_params, has_audio)
+            video_bitrate = self.planner.initial_bitrate(target_bytes, duration, audio_bps)
 
-            # Fall back to CPU if hardware acceleration fails
-            if not success:
-                logger.warning("Hardware acceleration failed, falling back to CPU encoding")
-                success = await self._try_compression(
-                    input_file,
-                    output_file,
-                    compression_params,
-                    progress_callback,
-                    use_hardware=False
+            # Try hardware acceleration first
+            use_hardware = True
+            encodes = 0
+            while encodes < self.planner.max_attempts:
+                encodes += 1
+                params = self.planner.apply_bitrate(compression_params, video_bitrate)
+                success, encoder, passes = await self._try_compression(
+                    input_file, output_file, params, duration,
+                    progress_callback, use_hardware=use_hardware, priority=priority,
+                    segmented=segmented, has_audio=has_audio,
                 )
 
-            if not success:
-                return False, "Failed to compress with both hardware and CPU encoding"
+                # Fall back to CPU if hardware acceleration fails
+                if not success and use_hardware:
+                    logger.warning("Hardware acceleration failed, falling back to CPU encoding")
+                    use_hardware = False
+                    success, encoder, passes = await self._try_compression(
+                        input_file, output_file, params, duration,
+                        progress_callback, use_hardware=False, priority=priority,
+                        segmented=segmented, has_audio=has_audio,
+                    )
+
+                if not success:
+                    return False, "Failed to compress with both hardware and CPU encoding", None
+
+                size = os.path.getsize(output_file)
+                attempt = EncodeAttempt(video_bitrate, size, encoder, passes, size <= target_bytes)
+                attempts.append(attempt)
+                self._stats["attempts"] += 1
+                if attempt.fits:
+                    break
+
+                next_bitrate = self.planner.next_bitrate(attempt, target_bytes, duration, audio_bps)
+                if next_bitrate is None:
+                    break
+                logger.info(
+                    f"Compressed {os.path.basename(input_file)} overshot target "
+                    f"({size} > {target_bytes} bytes), retrying at {next_bitrate}bps"
+                )
+                video_bitrate = next_bitrate
 
-            # Verify compressed file
-            if not self.file_ops.verify_video_file(output_file, str(self.ffmpeg_mgr.get_ffprobe_path())):
-                return False, "Compressed file verification failed"
+            logger.info(
+                f"Compression of {os.path.basename(input_file)} took {encodes} "
+                f"encode(s): {self.planner.summarize(attempts)}"
+            )
+            self.progress_handler.update(input_file, {"attempts": encodes})
+
+            if not attempts or not attempts[-1].fits:
+                self._stats["missed_target"] += 1
+                final_size = attempts[-1].size if attempts else 0
+                return (
+                    False,
+                    f"Failed to compress to target size after {encodes} "
+                    f"encode(s): {final_size} bytes",
+                    None,
+                )
+            if encodes == 1:
+                self._stats["first_attempt_fits"] += 1
 
-            # Check final size
-            within_limit, final_size = self.file_ops.check_file_size(output_file, max_size_mb)
-            if not within_limit:
-                return False, f"Failed to compress to target size: {final_size} bytes"
+            # Probe the output once for verification and metadata
+            output_info = await self.file_ops.probe_video(output_file, ffprobe_path)
+            if not output_info:
+                return False, "Compressed file verification failed", None
+            try:
+                output_info.validate()
+            except VideoVerificationError as e:
+                return False, f"Compressed file verification failed: {str(e)}", None
 
-            return True, ""
+            return True, "", output_info
 
         except Exception as e:
-            return False, str(e)
+            return False, str(e), None
+
+    async def _try_stream_copy(
+        self,
+        input_file: str,
+        output_file: str,
+        media_info: MediaInfo,
+        target_bytes: int,
+        allow_downmix: bool,
+        progress_callback: Optional[Callable[[float], None]],
+        attempts: List[EncodeAttempt],
+    ) -> Optional[MediaInfo]:
+        """Run the remux or audio-only tier if one is expected to fit
+
+        Returns:
+            Media info of the output if it is a valid video under the
+            target, otherwise None and a full encode is needed
+        """
+        if not output_file.lower().endswith((".mp4", ".m4v", ".mov")):
+            # The copy tiers only plan for MP4-family containers
+            return None
+
+        plan = self.reducer.plan(
+            media_info.probe, media_info.size, media_info.duration,
+            target_bytes, allow_downmix,
+        )
+        self._stats[f"tier_{plan.tier.value}"] += 1
+        logger.info(
+            f"Reduction plan for {os.path.basename(input_file)}: {plan.tier.value} "
+            f"(~{plan.estimated_size} of {target_bytes} bytes, {plan.reason})"
+        )
+        if plan.tier == ReductionTier.VIDEO:
+            return None
+
+        cmd = self._stream_copy_command(input_file, output_file, media_info, plan)
+        self.progress_handler.update(input_file, {
+            "active": True,
+            "filename": os.path.basename(input_file),
+            "start_time": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            "percent": 0,
+            "elapsed_time": "0:00",
+            "input_size": media_info.size,
+            "current_size": 0,
+            "target_size": target_bytes,
+            "codec": plan.encoder,
+            "hardware_accel": False,
+            "duration": media_info.duration,
+        })
+        if not await self._run_ffmpeg(
+            cmd, input_file, output_file, media_info.duration, progress_callback
+        ):
+            return None
+
+        size = os.path.getsize(output_file)
+        attempts.append(EncodeAttempt(0, size, plan.encoder, 0, size <= target_bytes))
+        if size > target_bytes:
+            self._stats["stream_copy_misses"] += 1
+            logger.info(
+                f"{plan.tier.value} of {os.path.basename(input_file)} produced "
+                f"{size} bytes, falling back to a full encode"
+            )
+            return None
+
+        output_info = await self.file_ops.probe_video(
+            output_file, str(self.ffmpeg_mgr.get_ffprobe_path())
+        )
+        try:
+            if not output_info:
+                raise VideoVerificationError("Could not probe output")
+            output_info.validate()
+        except VideoVerificationError as e:
+            logger.warning(f"Stream copy output failed verification: {e}")
+            return None
+        return output_info
+
+    def _stream_copy_command(
+        self,
+        input_file: str,
+        output_file: str,
+        media_info: MediaInfo,
+        plan: ReductionPlan,
+    ) -> List[str]:
+        """Build the FFmpeg command for a remux or audio-only tier"""
+        cmd = [
+            str(self.ffmpeg_mgr.get_ffmpeg_path()), "-y", "-nostats", "-loglevel", "error",
+            "-i", input_file, "-progress", "pipe:1",
+            "-map", "0:v:0", "-c:v", "copy",
+        ]
+        if media_info.has_audio:
+            cmd.extend(["-map", "0:a:0"])
+            if plan.tier == ReductionTier.AUDIO:
+                cmd.extend([
+                    "-c:a", "aac",
+                    "-b:a", str(plan.audio_bitrate),
+                    "-ac", str(plan.audio_channels),
+                ])
+            else:
+                cmd.extend(["-c:a", "copy"])
+        cmd.extend(["-map_metadata", "0", "-movflags", "+faststart", output_file])
+        return cmd
+
+    def pop_attempts(self, output_file: str) -> List[EncodeAttempt]:
+        """Claim the encode attempts recorded for a compression job"""
+        return self._job_attempts.pop(output_file, [])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get size-targeting statistics"""
+        jobs = self._stats["jobs"]
+        return {
+            **self._stats,
+            "avg_attempts": self._stats["attempts"] / jobs if jobs else 0.0,
+        }
 
     async def _try_compression(
         self,
         input_file: str,
         output_file: str,
         params: Dict[str, str],
+        duration: float,
         progress_callback: Optional[Callable[[float], None]] = None,
         use_hardware: bool = True,
-    ) -> bool:
-        """Attempt video compression with given parameters"""
+        priority: int = 0,
+        segmented: bool = False,
+        has_audio: bool = True,
+    ) -> Tuple[bool, str, int]:
+        """Attempt one encode with given parameters
+
+        The encode waits for cores from the shared encode scheduler and runs
+        with the thread count it grants. With ``segmented``, long CPU encodes
+        are split into segments encoded in parallel instead.
+
+        Returns:
+            Tuple of (success, encoder used, number of passes)
+        """
         if self._shutting_down:
-            return False
+            return False, "", 0
 
+        params = dict(params)
         try:
-            # Build FFmpeg command
-            ffmpeg_path = str(self.ffmpeg_mgr.get_ffmpeg_path())
-            cmd = [ffmpeg_path, "-y", "-i", input_file]
-
-            # Add progress monitoring
-            cmd.extend(["-progress", "pipe:1"])
-
             # Modify parameters based on hardware acceleration preference
             if use_hardware:
                 gpu_info = self.ffmpeg_mgr.gpu_info
@@ -132,18 +358,109 @@ class CompressionHandler:
                     params["c:v"] = "h264_qsv"
             else:
                 params["c:v"] = "libx264"
+            encoder = params["c:v"]
 
-            # Add all parameters to command
-            for key, value in params.items():
-                cmd.extend([f"-{key}", str(value)])
+            if segmented and encoder in SegmentEncoder.ENCODERS:
+                success = await self._try_segmented(
+                    input_file, output_file, params, duration,
+                    progress_callback, priority, has_audio
+                )
+                if success is not None:
+                    return success, encoder, 2 if self.planner.uses_two_pass(params) else 1
+
+            # Hardware encoders only need a core for demuxing and decoding
+            async with self.ffmpeg_mgr.encode_scheduler.reserve(
+                priority=priority,
+                threads=1 if encoder != "libx264" else None,
+                label=os.path.basename(input_file),
+            ) as slot:
+                params["threads"] = str(slot.threads)
+                return await self._run_encode(
+                    input_file, output_file, params, encoder, duration,
+                    progress_callback, use_hardware
+                )
 
-            # Add output file
-            cmd.append(output_file)
+        except Exception as e:
+            logger.error(f"Compression attempt failed: {str(e)}")
+            return False, "", 0
 
-            # Get video duration for progress calculation
-            duration = self.file_ops.get_video_duration(input_file, str(self.ffmpeg_mgr.get_ffprobe_path()))
+    async def _try_segmented(
+        self,
+        input_file: str,
+        output_file: str,
+        params: Dict[str, str],
+        duration: float,
+        progress_callback: Optional[Callable[[float], None]],
+        priority: int,
+        has_audio: bool,
+    ) -> Optional[bool]:
+        """Encode the video as parallel segments
+
+        Returns:
+            Whether the encode succeeded, or None if the video should be
+            encoded by a single process instead
+        """
+        segment_encoder = self.ffmpeg_mgr.segment_encoder
+        segments = await segment_encoder.plan(
+            str(self.ffmpeg_mgr.get_ffprobe_path()), input_file, duration,
+            self.ffmpeg_mgr.encode_scheduler.total_cores,
+        )
+        if not segments or self._shutting_down:
+            return None
+
+        runs = itertools.count(1)
+
+        async def run(
+            cmd: List[str], seconds: float, callback: Callable[[float], None]
+        ) -> bool:
+            # Each run reports under its own key; the job total goes to
+            # progress_callback
+            key = f"{input_file}#{next(runs)}"
+            try:
+                return await self._run_ffmpeg(cmd, key, output_file, seconds, callback)
+            finally:
+                compression_progress_bus.clear(key)
+                self.progress_handler.clear_snapshot(key)
+
+        logger.info(
+            f"Encoding {os.path.basename(input_file)} as {len(segments)} parallel segments"
+        )
+        self._stats["segmented_encodes"] += 1
+        success = await segment_encoder.encode(
+            str(self.ffmpeg_mgr.get_ffmpeg_path()), input_file, output_file, segments,
+            params, duration, has_audio, self.ffmpeg_mgr.encode_scheduler, run,
+            priority=priority,
+            two_pass=self.planner.uses_two_pass(params),
+            progress_callback=progress_callback,
+        )
+        if not success and not self._shutting_down:
+            logger.warning(
+                f"Segmented encode of {os.path.basename(input_file)} failed, "
+                f"falling back to a single process"
+            )
+            return None
+        return success
+
+    async def _run_encode(
+        self,
+        input_file: str,
+        output_file: str,
+        params: Dict[str, str],
+        encoder: str,
+        duration: float,
+        progress_callback: Optional[Callable[[float], None]],
+        use_hardware: bool,
+    ) -> Tuple[bool, str, int]:
+        """Run a single- or two-pass encode once cores are reserved"""
+        if self._shutting_down:
+            return False, encoder, 0
+
+        try:
+            # Build FFmpeg command prefix with progress monitoring
+            ffmpeg_path = str(self.ffmpeg_mgr.get_ffmpeg_path())
 
             # Initialize compression progress
+            self.progress_handler.clear_snapshot(input_file)
             self.progress_handler.update(input_file, {
                 "active": True,
                 "filename": os.path.basename(input_file),
@@ -153,7 +470,7 @@ class CompressionHandler:
                 "input_size": os.path.getsize(input_file),
                 "current_size": 0,
                 "target_size": self.max_file_size * 1024 * 1024,
-                "codec": params.get("c:v", "unknown"),
+                "codec": encoder,
                 "hardware_accel": use_hardware,
                 "preset": params.get("preset", "unknown"),
                 "crf": params.get("crf", "unknown"),
@@ -163,49 +480,94 @@ class CompressionHandler:
                 "audio_bitrate": params.get("b:a", "unknown"),
             })
 
-            # Run compression with progress monitoring
-            try:
-                process = await asyncio.create_subprocess_exec(
-                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            if not self.planner.uses_two_pass(params):
+                (cmd,) = self.planner.encode_commands(
+                    ffmpeg_path, input_file, output_file, params
+                )
+                success = await self._run_ffmpeg(
+                    cmd, input_file, output_file, duration, progress_callback
                 )
+                return success, encoder, 1
+
+            # Two-pass ABR; progress spans both passes
+            self._stats["two_pass_encodes"] += 1
+            with tempfile.TemporaryDirectory(prefix="ffmpeg_pass_") as temp_dir:
+                commands = self.planner.encode_commands(
+                    ffmpeg_path, input_file, output_file, params,
+                    os.path.join(temp_dir, "pass"),
+                )
+                for pass_number, cmd in enumerate(commands, 1):
+                    success = await self._run_ffmpeg(
+                        cmd, input_file, output_file, duration, progress_callback,
+                        time_offset=duration * (pass_number - 1),
+                        total_duration=duration * 2,
+                    )
+                    if not success:
+                        return False, encoder, pass_number
+            return True, encoder, 2
+
+        except Exception as e:
+            logger.error(f"Compression attempt failed: {str(e)}")
+            return False, "", 0
 
-                # Track the process
-                async with self._processes_lock:
-                    self._active_processes.add(process)
-
-                start_time = datetime.utcnow()
-
-                while True:
-                    if self._shutting_down:
-                        process.terminate()
-                        return False
-
-                    line = await process.stdout.readline()
-                    if not line:
-                        break
-
-                    try:
-                        line = line.decode().strip()
-                        if line.startswith("out_time_ms="):
-                            current_time = int(line.split("=")[1]) / 1000000
-                            self.progress_handler.handle_compression_progress(
-                                input_file, current_time, duration,
-                                output_file, start_time, progress_callback
-                            )
-                    except Exception as e:
-                        logger.error(f"Error parsing FFmpeg progress: {e}")
-
-                await process.wait()
-                return os.path.exists(output_file)
-
-            except Exception as e:
-                logger.error(f"Error during compression process: {e}")
+    async def _run_ffmpeg(
+        self,
+        cmd: List[str],
+        input_file: str,
+        output_file: str,
+        duration: float,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        time_offset: float = 0.0,
+        total_duration: Optional[float] = None,
+    ) -> bool:
+        """Run one FFmpeg invocation with progress monitoring"""
+        supervisor = self.ffmpeg_mgr.process_supervisor
+        process = None
+        try:
+            process = await supervisor.spawn(
+                cmd,
+                job=f"compress {os.path.basename(input_file)}",
+                owner=self,
+                timeout=max(self.ENCODE_TIMEOUT_MIN, duration * self.ENCODE_TIMEOUT_FACTOR),
+            )
+
+            # Drain stderr so a chatty encoder cannot fill the pipe
+            stderr_task = asyncio.ensure_future(process.stderr.read())
+
+            # Cleanup and timeouts terminate the process, which ends the stream
+            await self.progress_reader.run(
+                process.stdout,
+                input_file,
+                duration,
+                lambda snapshot: self.progress_handler.handle_compression_snapshot(
+                    snapshot, progress_callback
+                ),
+                time_offset=time_offset,
+                total_duration=total_duration,
+            )
+            returncode = await process.wait()
+            stderr = await stderr_task
+            if self._shutting_down:
                 return False
-            finally:
-                # Remove process from tracking
-                async with self._processes_lock:
-                    self._active_processes.discard(process)
+            if process.timed_out:
+                logger.error(f"FFmpeg timed out compressing {os.path.basename(input_file)}")
+                return False
+            if returncode != 0:
+                logger.error(
+                    f"FFmpeg exited with {returncode}: "
+                    f"{stderr.decode(errors='ignore')[-500:].strip()}"
+                )
+                return False
+            logger.debug(
+                f"FFmpeg used {process.usage.cpu_time:.1f}s CPU and "
+                f"{process.usage.max_rss / 1024 / 1024:.0f}MB peak RSS"
+            )
+            return True
 
         except Exception as e:
-            logger.error(f"Compression attempt failed: {str(e)}")
+            logger.error(f"Error during compression process: {e}")
             return False
+        finally:
+            # Covers cancellation and errors while the process still runs
+            if process:
+                await supervisor.stop(process)
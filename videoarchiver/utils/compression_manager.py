@@ -3,12 +3,13 @@
 import os
 import asyncio
 import logging
-import subprocess
 from datetime import datetime
-from typing import Dict, Any, Optional, Callable, List, Set, Tuple
+from typing import Dict, Any, Optional, Callable, List, Tuple
 
-from shared.progress import update_compression_progress
+from ffmpeg.process_supervisor import SupervisedProcess
+from shared.progress import ProgressSnapshot, update_compression_progress
 from utils.compression_handler import CompressionHandler
+from utils.ffmpeg_progress import FFmpegProgressReader
 from utils.progress_handler import ProgressHandler
 from utils.file_operations import FileOperations
 from utils.exceptions import CompressionError, VideoVerificationError
@@ -19,11 +20,12 @@ logger = logging.getLogger("VideoArchiver")
 class CompressionManager:
     """Manages video compression operations"""
 
-    def __init__(self, ffmpeg_mgr, max_file_size: int):
+    def __init__(self, ffmpeg_mgr, max_file_size: int,
+                 progress_hz: float = FFmpegProgressReader.DEFAULT_HZ):
         self.ffmpeg_mgr = ffmpeg_mgr
         self.max_file_size = max_file_size * 1024 * 1024  # Convert to bytes
-        self._active_processes: Set[subprocess.Popen] = set()
-        self._processes_lock = asyncio.Lock()
+        # Publishes to compression_progress_bus; the dict holds job settings
+        self.progress_reader = FFmpegProgressReader(progress_hz)
         self._shutting_down = False
 
     async def compress_video(
@@ -47,7 +49,7 @@ class CompressionManager:
 
         try:
             # Get optimal compression parameters
-            compression_params = self.ffmpeg_mgr.get_compression_params(
+            compression_params = await self.ffmpeg_mgr.get_compression_params(
                 input_file, self.max_file_size // (1024 * 1024)  # Convert to MB
             )
 
@@ -113,14 +115,9 @@ class CompressionManager:
             )
 
             # Run compression
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            process = await self.ffmpeg_mgr.process_supervisor.spawn(
+                cmd, job=f"compress {os.path.basename(input_file)}", owner=self
             )
-
-            # Track the process
-            async with self._processes_lock:
-                self._active_processes.add(process)
-
             try:
                 success = await self._monitor_compression(
                     process, input_file, output_file, duration, progress_callback
@@ -128,8 +125,7 @@ class CompressionManager:
                 return success, ""
 
             finally:
-                async with self._processes_lock:
-                    self._active_processes.discard(process)
+                await self.ffmpeg_mgr.process_supervisor.stop(process)
 
         except Exception as e:
             return False, str(e)
@@ -166,38 +162,27 @@ class CompressionManager:
 
     async def _monitor_compression(
         self,
-        process: asyncio.subprocess.Process,
+        process: SupervisedProcess,
         input_file: str,
         output_file: str,
         duration: float,
         progress_callback: Optional[Callable[[float], None]],
     ) -> bool:
         """Monitor compression progress"""
-        start_time = datetime.utcnow()
-
-        while True:
-            if self._shutting_down:
-                process.terminate()
-                return False
-
-            line = await process.stdout.readline()
-            if not line:
-                break
+        def on_snapshot(snapshot: ProgressSnapshot) -> None:
+            if progress_callback:
+                progress_callback(snapshot.percent)
 
-            try:
-                await self._update_progress(
-                    line.decode().strip(),
-                    input_file,
-                    output_file,
-                    duration,
-                    start_time,
-                    progress_callback,
-                )
-            except Exception as e:
-                logger.error(f"Error updating progress: {e}")
+        # Drain stderr so a chatty encoder cannot fill the pipe
+        stderr_task = asyncio.ensure_future(process.stderr.read())
 
-        await process.wait()
-        return os.path.exists(output_file)
+        # Cleanup terminates the process, which ends the stream
+        await self.progress_reader.run(process.stdout, input_file, duration, on_snapshot)
+        returncode = await process.wait()
+        await stderr_task
+        if self._shutting_down:
+            return False
+        return returncode == 0 and os.path.exists(output_file)
 
     async def _verify_output(self, input_file: str, output_file: str) -> bool:
         """Verify compressed output file"""
@@ -220,35 +205,12 @@ class CompressionManager:
     async def cleanup(self) -> None:
         """Clean up resources"""
         self._shutting_down = True
-        await self._terminate_processes()
+        await self.ffmpeg_mgr.process_supervisor.terminate_owner(self)
 
     async def force_cleanup(self) -> None:
         """Force cleanup of resources"""
         self._shutting_down = True
-        await self._kill_processes()
-
-    async def _terminate_processes(self) -> None:
-        """Terminate active processes gracefully"""
-        async with self._processes_lock:
-            for process in self._active_processes:
-                try:
-                    process.terminate()
-                    await asyncio.sleep(0.1)
-                    if process.returncode is None:
-                        process.kill()
-                except Exception as e:
-                    logger.error(f"Error terminating process: {e}")
-            self._active_processes.clear()
-
-    async def _kill_processes(self) -> None:
-        """Kill active processes immediately"""
-        async with self._processes_lock:
-            for process in self._active_processes:
-                try:
-                    process.kill()
-                except Exception as e:
-                    logger.error(f"Error killing process: {e}")
-            self._active_processes.clear()
+        self.ffmpeg_mgr.process_supervisor.kill_owner(self)
 
     async def _get_video_duration(self, file_path: str) -> float:
         """Get video duration in seconds"""
@@ -283,33 +245,5 @@ class CompressionManager:
             "bitrate": params.get("b:v", "unknown"),
             "audio_codec": params.get("c:a", "unknown"),
             "audio_bitrate": params.get("b:a", "unknown"),
-            "last_update": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
         }
         update_compression_progress(input_file, progress_data)
-
-    async def _update_progress(
-        self,
-        line: str,
-        input_file: str,
-        output_file: str,
-        duration: float,
-        start_time: datetime,
-        progress_callback: Optional[Callable[[float], None]],
-    ) -> None:
-        """Update compression progress"""
-        if line.startswith("out_time_ms="):
-            current_time = int(line.split("=")[1]) / 1000000
-            if duration > 0:
-                progress = min(100, (current_time / duration) * 100)
-
-                progress_data = {
-                    "percent": progress,
-                    "elapsed_time": str(datetime.utcnow() - start_time).split(".")[0],
-                    "current_size": os.path.getsize(output_file) if os.path.exists(output_file) else 0,
-                    "current_time": current_time,
-                    "last_update": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-                }
-                update_compression_progress(input_file, progress_data)
-
-                if progress_callback:
-                    progress_callback(progress)
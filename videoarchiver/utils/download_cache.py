@@ -0,0 +1,424 @@
+"""Content cache for downloaded and compressed videos"""
+
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import uuid
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Callable, Awaitable, Any, ClassVar
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+from processor.url_extractor import URLPatternManager, URLMetadataExtractor
+
+logger = logging.getLogger("VideoArchiver")
+
+# Query parameters that never change which video a URL points to
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "si", "feature", "fbclid", "gclid", "igshid", "ref", "ref_src", "s", "t",
+}
+
+DownloadResult = Tuple[bool, str, str]
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    """Identifies a produced file independent of which guild asked for it"""
+
+    site: str
+    video_id: str
+    video_format: str
+    quality: int
+    max_size: int
+
+    def digest(self) -> str:
+        """Get a filesystem-safe digest of the key"""
+        raw = (
+            f"{self.site}|{self.video_id}|{self.video_format}|"
+            f"{self.quality}|{self.max_size}"
+        )
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """A cached file on disk"""
+
+    key: CacheKey
+    path: str
+    size: int
+    created: float
+    last_access: float
+    hits: int = 0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class DownloadCache:
+    """LRU cache of produced video files with single-flight deduplication"""
+
+    DEFAULT_MAX_BYTES: ClassVar[int] = 2 * 1024 * 1024 * 1024  # 2 GB
+    DEFAULT_MAX_ENTRIES: ClassVar[int] = 500
+    DEFAULT_TTL: ClassVar[int] = 7 * 24 * 3600  # 1 week
+    INDEX_FILE: ClassVar[str] = "index.json"
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: int = DEFAULT_TTL,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        # Serializes index writes so an older snapshot never replaces a newer one
+        self._index_lock = asyncio.Lock()
+        self._total_bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "store_failures": 0,
+            "checkout_failures": 0,
+        }
+
+        self.pattern_manager = URLPatternManager()
+        self.metadata_extractor = URLMetadataExtractor(self.pattern_manager)
+
+        self._load_index()
+
+    def make_key(
+        self, url: str, video_format: str, quality: int, max_size: int
+    ) -> CacheKey:
+        """Build a cache key from a URL using its canonical video ID
+
+        Args:
+            url: Video URL
+            video_format: Container format of the produced file
+            quality: Maximum video height requested
+            max_size: Maximum file size in MB
+
+        Returns:
+            CacheKey for the URL
+        """
+        metadata = self.metadata_extractor.extract_metadata(url)
+        if metadata and metadata.video_id:
+            return CacheKey(
+                metadata.site, metadata.video_id, video_format, quality, max_size
+            )
+        return CacheKey(
+            "generic", self._normalize_url(url), video_format, quality, max_size
+        )
+
+    def _normalize_url(self, url: str) -> str:
+        """Normalize a URL so trivially different links share a key"""
+        try:
+            parsed = urlparse(url.strip())
+            host = parsed.netloc.lower()
+            if host.startswith("www."):
+                host = host[4:]
+            query = urlencode(
+                sorted(
+                    (k, v)
+                    for k, v in parse_qsl(parsed.query)
+                    if k.lower() not in TRACKING_PARAMS
+                )
+            )
+            path = parsed.path.rstrip("/")
+            return f"{host}{path}?{query}" if query else f"{host}{path}"
+        except Exception:
+            return url
+
+    async def fetch(
+        self,
+        key: CacheKey,
+        dest_dir: str,
+        producer: Callable[[], Awaitable[DownloadResult]],
+    ) -> DownloadResult:
+        """Get a file for a key, producing it at most once across callers
+
+        The returned path is always a private working copy in dest_dir that the
+        caller may delete; the cached copy stays under the cache directory.
+
+        Args:
+            key: Cache key
+            dest_dir: Directory to place the working copy in
+            producer: Coroutine factory that downloads and compresses the video
+
+        Returns:
+            Tuple of (success, file_path, error)
+        """
+        async with self._lock:
+            entry = self._get_entry(key)
+            if entry:
+                self._stats["hits"] += 1
+            else:
+                future, owner = self._join(key)
+
+        if entry:
+            path = await self._checkout(entry, dest_dir)
+            if path:
+                return True, path, ""
+            # The cached file went away meanwhile; produce it again
+            async with self._lock:
+                future, owner = self._join(key)
+
+        if not owner:
+            success, _, error = await asyncio.shield(future)
+            if not success:
+                return False, "", error
+            async with self._lock:
+                entry = self._get_entry(key)
+            if entry:
+                path = await self._checkout(entry, dest_dir)
+                if path:
+                    return True, path, ""
+            # Entry was not storable (too large), already evicted or its file
+            # went away during the checkout
+            return await producer()
+
+        result: DownloadResult = (False, "", "Download did not complete")
+        try:
+            result = await producer()
+            if result[0]:
+                await self._store(key, result[1])
+            return result
+        finally:
+            async with self._lock:
+                self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(result)
+
+    def _join(self, key: CacheKey) -> Tuple["asyncio.Future[DownloadResult]", bool]:
+        """Join the in-flight production of a key, or register a new one
+
+        Must be called with the lock held.
+
+        Returns:
+            Tuple of (future resolved with the result, whether the caller
+            owns the production)
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self._stats["coalesced"] += 1
+            return future, False
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._stats["misses"] += 1
+        return future, True
+
+    def _get_entry(self, key: CacheKey) -> Optional[CacheEntry]:
+        """Look up a live entry and mark it as recently used"""
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        if time.time() - entry.created > self.ttl or not os.path.exists(entry.path):
+            self._evict(key)
+            return None
+        entry.last_access = time.time()
+        entry.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _checkout(self, entry: CacheEntry, dest_dir: str) -> Optional[str]:
+        """Place a working copy of a cached file in dest_dir
+
+        The link or copy runs in a thread outside the lock, so a copy across
+        filesystems does not block the event loop or other lookups.
+
+        Returns:
+            Path of the working copy, or None if the cached file could not be
+            read, e.g. because it was evicted after the lookup
+        """
+        name = os.path.basename(entry.path).split("_", 1)[-1]
+        # Checkouts run concurrently, so a timestamp alone is not unique
+        dest = os.path.join(
+            dest_dir, f"{int(time.time() * 1000)}{uuid.uuid4().hex[:8]}_{name}"
+        )
+        try:
+            await asyncio.to_thread(self._link_or_copy, entry.path, dest)
+            return dest
+        except OSError as e:
+            self._stats["checkout_failures"] += 1
+            logger.warning(f"Failed to check out cached file {entry.path}: {e}")
+            self._remove_file(dest)
+            async with self._lock:
+                if self._entries.get(entry.key) is entry:
+                    self._evict(entry.key)
+            return None
+
+    async def _store(self, key: CacheKey, file_path: str) -> None:
+        """Store a produced file in the cache
+
+        The file is linked or copied into the cache in a thread before the
+        lock is taken; only the index update happens under the lock.
+        """
+        cached_path = self.cache_dir / f"{key.digest()}_{os.path.basename(file_path)}"
+        try:
+            size = os.path.getsize(file_path)
+            if size > self.max_bytes:
+                return
+            if os.path.exists(cached_path):
+                await asyncio.to_thread(os.unlink, cached_path)
+            await asyncio.to_thread(self._link_or_copy, file_path, str(cached_path))
+        except OSError as e:
+            self._stats["store_failures"] += 1
+            logger.error(f"Failed to store {file_path} in download cache: {e}")
+            return
+
+        async with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing:
+                self._total_bytes -= existing.size
+                if existing.path != str(cached_path):
+                    self._remove_file(existing.path)
+
+            now = time.time()
+            self._entries[key] = CacheEntry(key, str(cached_path), size, now, now)
+            self._total_bytes += size
+            self._enforce_limits()
+        await self._save_index()
+
+    def _enforce_limits(self) -> None:
+        """Evict least recently used entries until within budget"""
+        while self._entries and (
+            self._total_bytes > self.max_bytes
+            or len(self._entries) > self.max_entries
+        ):
+            oldest = next(iter(self._entries))
+            self._evict(oldest)
+            self._stats["evictions"] += 1
+
+    def _evict(self, key: CacheKey) -> None:
+        """Remove an entry and its file"""
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return
+        self._total_bytes -= entry.size
+        self._remove_file(entry.path)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        """Delete a cached file if it exists"""
+        try:
+            if os.path.exists(path):
+                os.unlink(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove cached file {path}: {e}")
+
+    @staticmethod
+    def _link_or_copy(src: str, dst: str) -> None:
+        """Hard link a file, falling back to a copy across filesystems"""
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    def _load_index(self) -> None:
+        """Load the persisted index, dropping entries whose files are gone"""
+        index_path = self.cache_dir / self.INDEX_FILE
+        if not index_path.exists():
+            return
+        try:
+            with open(index_path, "r") as f:
+                data = json.load(f)
+            for raw in sorted(data, key=lambda e: e["last_access"]):
+                # Indexes written before the format was part of the key
+                key = CacheKey(**{"video_format": "mp4", **raw["key"]})
+                entry = CacheEntry(
+                    key=key,
+                    path=raw["path"],
+                    size=raw["size"],
+                    created=raw["created"],
+                    last_access=raw["last_access"],
+                    hits=raw.get("hits", 0),
+                    metadata=raw.get("metadata", {}),
+                )
+                if os.path.exists(entry.path):
+                    self._entries[key] = entry
+                    self._total_bytes += entry.size
+            self._enforce_limits()
+            logger.info(f"Loaded {len(self._entries)} cached downloads")
+        except Exception as e:
+            logger.error(f"Failed to load download cache index: {e}")
+            self._entries.clear()
+            self._total_bytes = 0
+
+    async def _save_index(self) -> None:
+        """Persist the index so the cache survives restarts
+
+        The snapshot is taken on the event loop and written in a thread.
+        Writes are serialized, and each takes its snapshot only once the
+        previous write finished, so the file always ends up current.
+        """
+        async with self._index_lock:
+            snapshot = [asdict(e) for e in self._entries.values()]
+            await asyncio.to_thread(self._write_index, snapshot)
+
+    def _write_index(self, snapshot: List[Dict[str, Any]]) -> None:
+        """Atomically replace the index file"""
+        index_path = self.cache_dir / self.INDEX_FILE
+        try:
+            temp_path = f"{index_path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, index_path)
+        except Exception as e:
+            logger.error(f"Failed to save download cache index: {e}")
+
+    def get_metadata(self, key: CacheKey) -> Dict[str, Any]:
+        """Get media metadata recorded for a cached file"""
+        entry = self._entries.get(key)
+        return dict(entry.metadata) if entry else {}
+
+    async def set_metadata(self, key: CacheKey, metadata: Dict[str, Any]) -> None:
+        """Record media metadata for a cached file so hits need no probe"""
+        entry = self._entries.get(key)
+        if entry and entry.metadata != metadata:
+            entry.metadata = dict(metadata)
+            await self._save_index()
+
+    async def clear(self) -> None:
+        """Remove all cached files"""
+        async with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+        await self._save_index()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "total_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "inflight": len(self._inflight),
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
+# Shared instances keyed by cache directory so every guild's downloader
+# deduplicates against the same cache
+_caches: Dict[str, DownloadCache] = {}
+
+
+def get_download_cache(cache_dir: str) -> DownloadCache:
+    """Get the shared download cache for a directory"""
+    cache_dir = str(Path(cache_dir).resolve())
+    if cache_dir not in _caches:
+        _caches[cache_dir] = DownloadCache(cache_dir)
+    return _caches[cache_dir]
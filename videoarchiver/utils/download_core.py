@@ -1,17 +1,25 @@
 """Core download functionality for video archiver"""
 
 import os
+import time
 import asyncio
 import logging
 import yt_dlp # type: ignore
-from typing import Dict, Optional, Callable, Tuple
+from collections import OrderedDict
+from typing import Dict, Optional, Callable, Tuple, Any
 from pathlib import Path
 
 from utils.url_validator import check_url_support
 from utils.progress_handler import ProgressHandler, CancellableYTDLLogger
 from utils.file_operations import FileOperations
+from utils.media_info import MediaInfo
+from utils.exceptions import VideoVerificationError
 from utils.compression_handler import CompressionHandler
 from utils.process_manager import ProcessManager
+from utils.download_cache import DownloadCache
+from utils.retry_policy import RetryPolicy, ErrorClass
+from utils.host_limiter import HostLimiter, host_limiter
+from utils.site_registry import site_registry
 from ffmpeg.ffmpeg_manager import FFmpegManager
 
 logger = logging.getLogger("VideoArchiver")
@@ -19,6 +27,10 @@ logger = logging.getLogger("VideoArchiver")
 class DownloadCore:
     """Core download functionality for video archiver"""
 
+    INLINE_RETRY_ATTEMPTS = 2
+    INLINE_RETRY_MAX_DELAY = 5.0  # seconds
+    MAX_PROCESSING_INFO = 100  # Unclaimed per-file results kept
+
     def __init__(
         self,
         download_path: str,
@@ -28,6 +40,10 @@ class DownloadCore:
         enabled_sites: Optional[list[str]] = None,
         concurrent_downloads: int = 2,
         ffmpeg_mgr: Optional[FFmpegManager] = None,
+        download_cache: Optional[DownloadCache] = None,
+        limiter: Optional[HostLimiter] = None,
+        allow_audio_downmix: bool = False,
+        parallel_encoding: bool = False,
     ):
         self.download_path = Path(download_path)
         self.download_path.mkdir(parents=True, exist_ok=True)
@@ -36,13 +52,23 @@ class DownloadCore:
         self.video_format = video_format
         self.max_quality = max_quality
         self.max_file_size = max_file_size
+        self.allow_audio_downmix = allow_audio_downmix
+        self.parallel_encoding = parallel_encoding
         self.enabled_sites = enabled_sites
         self.ffmpeg_mgr = ffmpeg_mgr or FFmpegManager()
+        self.download_cache = download_cache
+        self.limiter = limiter or host_limiter
+        # Media metadata and stage timings per produced file, claimed by the
+        # caller through pop_processing_info
+        self._processing_info: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.retry_policy = RetryPolicy(
+            max_attempts=self.INLINE_RETRY_ATTEMPTS, base_delay=2.0
+        )
 
         # Initialize components
         self.process_manager = ProcessManager(concurrent_downloads)
         self.progress_handler = ProgressHandler()
-        self.file_ops = FileOperations()
+        self.file_ops = FileOperations(probe_service=self.ffmpeg_mgr.probe_service)
         self.compression_handler = CompressionHandler(
             self.ffmpeg_mgr, self.progress_handler, self.file_ops
         )
@@ -103,12 +129,90 @@ class DownloadCore:
 
     def is_supported_url(self, url: str) -> bool:
         """Check if URL is supported"""
-        return check_url_support(url, self.ydl_opts, self.enabled_sites)
+        return check_url_support(url, self.enabled_sites)
 
     async def download_video(
-        self, url: str, progress_callback: Optional[Callable[[float], None]] = None
+        self,
+        url: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        priority: int = 0,
+    ) -> Tuple[bool, str, str]:
+        """Download and process a video, serving repeats from the shared cache
+
+        Args:
+            url: URL to download
+            progress_callback: Callback for progress updates
+            priority: Queue priority of the item, used for the encode scheduler
+        """
+        if self.process_manager.is_shutting_down:
+            return False, "", "Download manager is shutting down"
+
+        if not self.download_cache:
+            return await self._download_uncached(url, progress_callback, priority)
+
+        start = time.monotonic()
+        key = self.download_cache.make_key(
+            url, self.video_format, self.max_quality, self.max_file_size
+        )
+        success, file_path, error = await self.download_cache.fetch(
+            key,
+            str(self.download_path),
+            lambda: self._download_uncached(url, progress_callback, priority),
+        )
+        if success:
+            info = self._processing_info.get(file_path)
+            if info:
+                # Produced here; remember the metadata for later cache hits
+                await self.download_cache.set_metadata(key, info["metadata"])
+            else:
+                self._record_processing_info(
+                    file_path,
+                    self.download_cache.get_metadata(key),
+                    {"cache": time.monotonic() - start},
+                )
+            if progress_callback:
+                progress_callback(100.0)
+        return success, file_path, error
+
+    def pop_processing_info(self, file_path: str) -> Dict[str, Any]:
+        """Claim the media metadata and stage timings for a produced file
+
+        Returns:
+            Dict with "metadata" (database metadata for the file), "timings"
+            (seconds spent per stage) and "encode_attempts" (number of
+            encodes needed to fit the size limit); empty if unknown
+        """
+        return self._processing_info.pop(file_path, {})
+
+    def _record_processing_info(
+        self,
+        file_path: str,
+        metadata: Dict[str, Any],
+        timings: Dict[str, float],
+        encode_attempts: int = 0,
+    ) -> None:
+        """Remember results for a produced file until the caller claims them"""
+        self._processing_info[file_path] = {
+            "metadata": metadata,
+            "timings": timings,
+            "encode_attempts": encode_attempts,
+        }
+        while len(self._processing_info) > self.MAX_PROCESSING_INFO:
+            self._processing_info.popitem(last=False)
+
+    async def _download_uncached(
+        self,
+        url: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        priority: int = 0,
     ) -> Tuple[bool, str, str]:
-        """Download and process a video"""
+        """Download and process a video without consulting the cache
+
+        After the download a single post-download stage runs: one probe whose
+        result is used for validation, the compression decision, encoder
+        parameters and database metadata. The file stays where yt-dlp wrote
+        it; only compression produces a second file.
+        """
         if self.process_manager.is_shutting_down:
             return False, "", "Download manager is shutting down"
 
@@ -116,67 +220,84 @@ class DownloadCore:
         self.progress_handler.initialize_progress(url)
         original_file = None
         compressed_file = None
+        timings: Dict[str, float] = {}
 
         try:
             # Download the video
+            stage_start = time.monotonic()
             success, file_path, error = await self._safe_download(
                 url, str(self.download_path), progress_callback
             )
+            timings["download"] = time.monotonic() - stage_start
             if not success:
                 return False, "", error
 
             original_file = file_path
             await self.process_manager.track_download(url, original_file)
 
-            # Check file size and compress if needed
-            within_limit, file_size = self.file_ops.check_file_size(original_file, self.max_file_size)
-            if not within_limit:
-                logger.info(f"Compressing video: {original_file}")
-                try:
-                    compressed_file = os.path.join(
-                        self.download_path,
-                        f"compressed_{os.path.basename(original_file)}",
-                    )
-
-                    # Attempt compression
-                    success, error = await self.compression_handler.compress_video(
-                        original_file,
-                        compressed_file,
-                        self.max_file_size,
-                        progress_callback
-                    )
-
-                    if not success:
-                        await self._cleanup_files(original_file, compressed_file)
-                        return False, "", error
+            # Probe once and validate
+            stage_start = time.monotonic()
+            media_info = await self.file_ops.probe_video(
+                original_file, str(self.ffmpeg_mgr.get_ffprobe_path())
+            )
+            timings["probe"] = time.monotonic() - stage_start
+            if not media_info:
+                await self._cleanup_files(original_file)
+                return False, "", "Downloaded file is not a valid video"
+            try:
+                media_info.validate()
+            except VideoVerificationError as e:
+                await self._cleanup_files(original_file)
+                return False, "", f"Downloaded file is not a valid video: {str(e)}"
+
+            if media_info.size <= self.max_file_size * 1024 * 1024:
+                self._record_processing_info(
+                    original_file, media_info.to_db_metadata(), timings
+                )
+                return True, original_file, ""
 
-                    # Verify compressed file
-                    if not self.file_ops.verify_video_file(
-                        compressed_file, 
-                        str(self.ffmpeg_mgr.get_ffprobe_path())
-                    ):
-                        await self._cleanup_files(original_file, compressed_file)
-                        return False, "", "Compressed file verification failed"
+            # Compress to fit the size limit
+            logger.info(f"Compressing video: {original_file}")
+            try:
+                compressed_file = os.path.join(
+                    self.download_path,
+                    f"compressed_{os.path.basename(original_file)}",
+                )
 
-                    # Delete original and return compressed
-                    await self.file_ops.safe_delete_file(original_file)
-                    return True, compressed_file, ""
+                stage_start = time.monotonic()
+                success, error, output_info = await self.compression_handler.compress_video(
+                    original_file,
+                    compressed_file,
+                    self.max_file_size,
+                    progress_callback,
+                    media_info=media_info,
+                    allow_downmix=self.allow_audio_downmix,
+                    segmented=self.parallel_encoding,
+                    priority=priority,
+                )
+                timings["compress"] = time.monotonic() - stage_start
+                attempts = self.compression_handler.pop_attempts(compressed_file)
 
-                except Exception as e:
-                    error_msg = f"Compression failed: {str(e)}"
+                if not success:
                     await self._cleanup_files(original_file, compressed_file)
-                    return False, "", error_msg
-            else:
-                # Move file to final location if no compression needed
-                final_path = os.path.join(
-                    self.download_path, 
-                    os.path.basename(original_file)
+                    return False, "", error
+
+                # Delete original and return compressed
+                await self.file_ops.safe_delete_file(original_file)
+                self._record_processing_info(
+                    compressed_file,
+                    output_info.to_db_metadata(),
+                    timings,
+                    encode_attempts=self.compression_handler.planner.count_encodes(
+                        attempts
+                    ),
                 )
-                success = await self.file_ops.safe_move_file(original_file, final_path)
-                if not success:
-                    await self._cleanup_files(original_file)
-                    return False, "", "Failed to move file to final location"
-                return True, final_path, ""
+                return True, compressed_file, ""
+
+            except Exception as e:
+                error_msg = f"Compression failed: {str(e)}"
+                await self._cleanup_files(original_file, compressed_file)
+                return False, "", error_msg
 
         except Exception as e:
             logger.error(f"Download error: {str(e)}")
@@ -187,6 +308,11 @@ class DownloadCore:
             # Clean up tracking
             await self.process_manager.untrack_download(url)
             self.progress_handler.complete(url)
+            if timings:
+                logger.debug(
+                    f"Post-download stages for {url}: "
+                    + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items())
+                )
 
     async def _safe_download(
         self,
@@ -198,11 +324,14 @@ class DownloadCore:
         if self.process_manager.is_shutting_down:
             return False, "", "Download manager is shutting down"
 
-        last_error = None
-        for attempt in range(5):  # Max retries
+        attempt = 0
+        while True:
             try:
                 ydl_opts = self.ydl_opts.copy()
+                ydl_opts.update(site_registry.profile_for(url).ydl_options)
                 ydl_opts["outtmpl"] = os.path.join(output_dir, ydl_opts["outtmpl"])
+                # Single-video downloads should raise so the error can be classified
+                ydl_opts["ignoreerrors"] = False
 
                 # Add progress callback
                 if progress_callback:
@@ -222,10 +351,11 @@ class DownloadCore:
                     ydl_opts["progress_hooks"] = [combined_progress_hook]
 
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = await asyncio.get_event_loop().run_in_executor(
-                        self.process_manager.download_pool,
-                        lambda: ydl.extract_info(url, download=True)
-                    )
+                    async with self.limiter.acquire(url):
+                        info = await asyncio.get_event_loop().run_in_executor(
+                            self.process_manager.download_pool,
+                            lambda: ydl.extract_info(url, download=True)
+                        )
 
                 if info is None:
                     raise Exception("Failed to extract video information")
@@ -234,22 +364,30 @@ class DownloadCore:
                 if not os.path.exists(file_path):
                     raise FileNotFoundError("Download completed but file not found")
 
-                if not self.file_ops.verify_video_file(
-                    file_path,
-                    str(self.ffmpeg_mgr.get_ffprobe_path())
-                ):
-                    raise Exception("Downloaded file is not a valid video")
-
+                # Validation happens in the post-download probe
                 return True, file_path, ""
 
             except Exception as e:
-                last_error = str(e)
-                logger.error(f"Download attempt {attempt + 1} failed: {str(e)}")
-                if attempt < 4:  # Less than max retries
-                    delay = 10 * (2**attempt) + (attempt * 2)  # Exponential backoff
-                    await asyncio.sleep(delay)
-                else:
-                    return False, "", f"All download attempts failed: {last_error}"
+                error = str(e)
+                decision = self.retry_policy.decide(error, attempt)
+                logger.error(
+                    f"Download attempt {attempt + 1} failed "
+                    f"({decision.error_class.value}): {error}"
+                )
+
+                # Only short transient retries happen here; anything longer is
+                # handed back to the queue so the worker slot is freed
+                if (
+                    decision.retry
+                    and decision.error_class == ErrorClass.TRANSIENT
+                    and decision.delay <= self.INLINE_RETRY_MAX_DELAY
+                    and not self.process_manager.is_shutting_down
+                ):
+                    attempt += 1
+                    await asyncio.sleep(decision.delay)
+                    continue
+
+                return False, "", f"Download failed: {error}"
 
     async def _cleanup_files(self, *files: str) -> None:
         """Clean up multiple files"""
@@ -152,7 +152,10 @@ class DownloadManager:
         progress_tracker.clear_progress()
 
     async def download_video(
-        self, url: str, progress_callback: Optional[Callable[[float], None]] = None
+        self,
+        url: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        priority: int = 0,
     ) -> Tuple[bool, str, str]:
         """Download and process a video"""
         if self._shutting_down:
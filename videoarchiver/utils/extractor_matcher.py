@@ -0,0 +1,639 @@
+"""Offline URL matcher built from yt-dlp extractor patterns"""
+
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+import threading
+from dataclasses import dataclass, field
+from importlib.metadata import version as get_package_version
+from typing import Dict, List, Optional, Set, Tuple, ClassVar, Pattern, Union
+from urllib.parse import urlparse
+
+logger = logging.getLogger("VideoArchiver")
+
+# (extractor name, _VALID_URL patterns) in yt-dlp priority order
+ExtractorSpec = Tuple[str, List[str]]
+# A compiled step of a lookup plan: either a combined regex whose alternatives
+# map back to pattern positions, or a single regex for one pattern
+PlanStep = Tuple[Pattern, Union[List[int], int]]
+
+# Run in a fresh interpreter so a just-upgraded yt-dlp is indexed without
+# reloading the copy already imported into the bot
+_DUMP_SCRIPT = """
+import json
+from yt_dlp.extractor import gen_extractor_classes
+from yt_dlp.utils import variadic
+specs = []
+for ie in gen_extractor_classes():
+    valid = getattr(ie, "_VALID_URL", None)
+    if valid:
+        specs.append([ie.ie_key(), list(variadic(valid))])
+print(json.dumps(specs))
+"""
+
+
+class _TooManyExpansions(Exception):
+    """Raised when a pattern expands into too many strings to index"""
+
+
+class HostExpander:
+    """Expands a URL regex into the hosts it can match
+
+    Literal text is kept and everything that is not a fixed string, such as
+    character classes, ``.`` and repeated groups, becomes a ``*`` wildcard.
+    Alternations and optional parts expand into every combination, so
+    ``(?:www\\.)?tiktokv?\\.com`` gives ``tiktok.com``, ``tiktokv.com``,
+    ``www.tiktok.com`` and ``www.tiktokv.com``. Expansion of a string stops
+    at the first ``/`` after ``//``, so paths do not multiply the result.
+    """
+
+    WILDCARD: ClassVar[str] = "*"
+    MAX_EXPANSIONS: ClassVar[int] = 512
+    QUANTIFIER: ClassVar[Pattern] = re.compile(r"\{(\d*)(?:(,)(\d*))?\}")
+    HEX_ESCAPES: ClassVar[Dict[str, int]] = {"x": 2, "u": 4, "U": 8}
+    SCHEMES: ClassVar[Tuple[str, ...]] = ("http://", "https://", "//")
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.pos = 0
+        self.verbose = False
+
+    def hosts(self) -> Optional[Set[str]]:
+        """Get the hosts the pattern can match
+
+        Returns:
+            Set of host strings, None if a wildcard could stand for the host
+        """
+        try:
+            strings = self._alternation()
+        except (_TooManyExpansions, IndexError, ValueError):
+            return None
+        if self.pos != len(self.pattern):
+            return None
+
+        hosts = set()
+        for string in strings:
+            start = string.find("//")
+            if start < 0:
+                # Pseudo-URLs such as "ytsearch:" cannot match a web link,
+                # unless a wildcard could stand for the scheme
+                prefix = string.split(self.WILDCARD, 1)[0]
+                if self.WILDCARD in string and any(
+                    scheme.startswith(prefix) or prefix.startswith(scheme)
+                    for scheme in self.SCHEMES
+                ):
+                    return None
+                continue
+            end = string.find("/", start + 2)
+            hosts.add(string[start + 2 : end] if end >= 0 else string[start + 2 :])
+        return hosts
+
+    def _alternation(self) -> Set[str]:
+        result = self._sequence()
+        while self.pos < len(self.pattern) and self.pattern[self.pos] == "|":
+            self.pos += 1
+            result |= self._sequence()
+        return result
+
+    def _sequence(self) -> Set[str]:
+        result = {""}
+        while self.pos < len(self.pattern) and self.pattern[self.pos] not in "|)":
+            options = self._atom()
+            if options is None:
+                continue
+            result = self._concat(result, self._quantify(options))
+        return result
+
+    def _atom(self) -> Optional[Set[str]]:
+        """Expand the next atom, None for atoms that match no text"""
+        pattern = self.pattern
+        char = pattern[self.pos]
+
+        if self.verbose and char.isspace():
+            self.pos += 1
+            return None
+        if self.verbose and char == "#":
+            end = pattern.find("\n", self.pos)
+            self.pos = end if end >= 0 else len(pattern)
+            return None
+
+        if char == "(":
+            return self._group()
+        if char == "[":
+            end = self.pos + 1
+            if pattern[end] == "^":
+                end += 1
+            if pattern[end] == "]":
+                end += 1
+            while pattern[end] != "]":
+                end += 2 if pattern[end] == "\\" else 1
+            self.pos = end + 1
+            return {self.WILDCARD}
+        if char == "\\":
+            escaped = pattern[self.pos + 1]
+            self.pos += 2
+            if escaped in "bBAZ":
+                return None
+            if escaped in self.HEX_ESCAPES:
+                self.pos += self.HEX_ESCAPES[escaped]
+                return {self.WILDCARD}
+            if escaped.isdigit():
+                while self.pos < len(pattern) and pattern[self.pos].isdigit():
+                    self.pos += 1
+                return {self.WILDCARD}
+            if escaped.isalpha():
+                return {self.WILDCARD}
+            return {escaped}
+        self.pos += 1
+        if char == ".":
+            return {self.WILDCARD}
+        if char in "^$*+?":
+            return None
+        return {char.lower()}
+
+    def _group(self) -> Optional[Set[str]]:
+        """Expand a parenthesized group"""
+        pattern = self.pattern
+        start = self.pos
+        verbose = self.verbose
+        if pattern.startswith("(?", start):
+            kind = pattern[start + 2]
+            if kind in "=!" or pattern.startswith(("(?<=", "(?<!"), start):
+                # Lookarounds match no text
+                self.pos = start + (4 if kind == "<" else 3)
+                self._alternation()
+                self._close()
+                return None
+            if kind == "#":
+                self.pos = pattern.index(")", start) + 1
+                return None
+            if pattern.startswith("(?P=", start):
+                self.pos = pattern.index(")", start) + 1
+                return {self.WILDCARD}
+            if pattern.startswith("(?P<", start):
+                self.pos = pattern.index(">", start) + 1
+            elif kind == "(":
+                # Conditional: either branch may apply
+                self.pos = pattern.index(")", start + 3) + 1
+            elif kind == ":":
+                self.pos = start + 3
+            else:
+                end = start + 2
+                while pattern[end].isalpha() or pattern[end] == "-":
+                    end += 1
+                flags = pattern[start + 2 : end].split("-")[0]
+                self.pos = end + 1
+                if pattern[end] == ")":
+                    # Global flags, e.g. (?x) at the start of the pattern
+                    self.verbose = self.verbose or "x" in flags
+                    return None
+                self.verbose = self.verbose or "x" in flags
+        else:
+            self.pos = start + 1
+
+        result = self._alternation()
+        self._close()
+        self.verbose = verbose
+        return result
+
+    def _close(self) -> None:
+        if self.pattern[self.pos] != ")":
+            raise ValueError(f"Unbalanced group at {self.pos}")
+        self.pos += 1
+
+    def _quantify(self, options: Set[str]) -> Set[str]:
+        """Apply a quantifier following an atom"""
+        pattern = self.pattern
+        if self.pos >= len(pattern):
+            return options
+
+        char = pattern[self.pos]
+        if char in "?*+":
+            low, high = {"?": (0, 1), "*": (0, None), "+": (1, None)}[char]
+            self.pos += 1
+        else:
+            match = self.QUANTIFIER.match(pattern, self.pos)
+            if char != "{" or not match or not (match.group(1) or match.group(3)):
+                return options
+            low = int(match.group(1) or 0)
+            if match.group(2):
+                high = int(match.group(3)) if match.group(3) else None
+            else:
+                high = low
+            self.pos = match.end()
+        if self.pos < len(pattern) and pattern[self.pos] in "?+":
+            # Lazy or possessive
+            self.pos += 1
+
+        if high != 1:
+            # Repeats of subdomain groups such as (?:[^/]+\.)+ keep their
+            # labels; any other repeat has unknown text
+            if not all(option.endswith(".") for option in options if option):
+                options = {self.WILDCARD}
+        if low == 0:
+            options = options | {""}
+        return options
+
+    def _concat(self, left: Set[str], right: Set[str]) -> Set[str]:
+        result = set()
+        for prefix in left:
+            start = prefix.find("//")
+            if start >= 0 and prefix.find("/", start + 2) >= 0:
+                # Host already complete
+                result.add(prefix)
+                continue
+            for suffix in right:
+                string = prefix + suffix
+                while self.WILDCARD * 2 in string:
+                    string = string.replace(self.WILDCARD * 2, self.WILDCARD)
+                result.add(string)
+        if len(result) > self.MAX_EXPANSIONS:
+            raise _TooManyExpansions()
+        return result
+
+
+@dataclass
+class ExtractorIndex:
+    """Patterns indexed by the host labels they require"""
+
+    version: str
+    patterns: List[Tuple[str, str]] = field(default_factory=list)
+    labels: Dict[str, List[int]] = field(default_factory=dict)
+    unindexed: List[int] = field(default_factory=list)
+    unindexed_plan: List[PlanStep] = field(default_factory=list)
+    plans: Dict[str, List[PlanStep]] = field(default_factory=dict)
+
+
+class ExtractorMatcher:
+    """Answers URL support and extractor-name questions without network access
+
+    Every extractor's ``_VALID_URL`` is expanded into the hosts it can match
+    and indexed under the literal labels of those hosts, e.g. ``youtube`` for
+    ``(?:www\\.)?youtube\\.com``. A lookup only tries the extractors indexed
+    under one of the URL's host labels, plus the few whose host could not be
+    pinned to a literal label. Candidates are compiled into combined regexes;
+    the shared unindexed plan is compiled with the index, per-label plans on
+    first use or all at once by build().
+    """
+
+    EXCLUDED_EXTRACTORS: ClassVar[frozenset] = frozenset({"generic"})
+    # Labels shared by unrelated sites, never used as index keys
+    GENERIC_LABELS: ClassVar[frozenset] = frozenset(
+        {"www", "m", "co", "com", "net", "org"}
+    )
+    LEADING_FLAGS: ClassVar[Pattern] = re.compile(r"^\(\?([imsx]+)\)")
+    GROUP_NAME: ClassVar[Pattern] = re.compile(r"\(\?P([<=])([A-Za-z_][A-Za-z0-9_]*)(>?)")
+    CONDITIONAL: ClassVar[Pattern] = re.compile(r"\(\?\(([A-Za-z_][A-Za-z0-9_]*)\)")
+    # Backreferences and conditionals by group number
+    NUMERIC_BACKREF: ClassVar[Pattern] = re.compile(r"(?<!\\)\\[1-9]|\(\?\(\d+\)")
+    MAX_COMBINED: ClassVar[int] = 200
+
+    def __init__(self):
+        self._index: Optional[ExtractorIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        """yt-dlp version the index was built from"""
+        return self._index.version if self._index else None
+
+    def _ensure_built(self) -> ExtractorIndex:
+        """Build the index from the imported yt-dlp on first use"""
+        index = self._index
+        if index is not None:
+            return index
+        with self._lock:
+            if self._index is None:
+                self._index = self._build(*self._load_specs())
+            return self._index
+
+    @staticmethod
+    def _load_specs() -> Tuple[List[ExtractorSpec], str]:
+        """Read extractor patterns from the imported yt-dlp"""
+        try:
+            from yt_dlp.extractor import gen_extractor_classes  # type: ignore
+            from yt_dlp.utils import variadic  # type: ignore
+
+            specs = [
+                (ie.ie_key(), list(variadic(ie._VALID_URL)))
+                for ie in gen_extractor_classes()
+                if getattr(ie, "_VALID_URL", None)
+            ]
+            return specs, get_package_version("yt-dlp")
+        except Exception as e:
+            logger.error(f"Failed to load yt-dlp extractors: {e}")
+            return [], "unavailable"
+
+    async def build(self) -> None:
+        """Build the index and compile every plan in a worker thread
+
+        Called at startup so neither the index nor a cold plan is built on
+        the event loop by the first lookup.
+        """
+        await asyncio.to_thread(self._precompile)
+
+    def _precompile(self) -> None:
+        index = self._ensure_built()
+        for label in list(index.labels):
+            self._plan(index, label)
+
+    def _build(self, specs: List[ExtractorSpec], version: str) -> ExtractorIndex:
+        """Index extractor patterns by the host labels they require"""
+        index = ExtractorIndex(version)
+
+        for name, patterns in specs:
+            if name.lower() in self.EXCLUDED_EXTRACTORS:
+                continue
+            for pattern in patterns:
+                position = len(index.patterns)
+                index.patterns.append((name, pattern))
+                labels = self._pattern_labels(pattern)
+                if labels is None:
+                    index.unindexed.append(position)
+                    continue
+                for label in labels:
+                    index.labels.setdefault(label, []).append(position)
+
+        index.unindexed_plan = self._compile(index, index.unindexed)
+        logger.info(
+            f"Indexed {len(index.patterns)} yt-dlp URL patterns under "
+            f"{len(index.labels)} host labels ({len(index.unindexed)} unindexed, "
+            f"yt-dlp {version})"
+        )
+        return index
+
+    def _pattern_labels(self, pattern: str) -> Optional[Set[str]]:
+        """Get the labels a URL host must contain one of to match a pattern
+
+        Returns:
+            Set of labels, None if some matching host has no literal label
+        """
+        hosts = HostExpander(pattern).hosts()
+        if not hosts:
+            return None
+        labels: Set[str] = set()
+        for host in hosts:
+            keys = {
+                label
+                for label in host.split(".")[:-1]
+                if label
+                and HostExpander.WILDCARD not in label
+                and label not in self.GENERIC_LABELS
+            }
+            if not keys:
+                return None
+            labels |= keys
+        return labels
+
+    @staticmethod
+    def _host_labels(host: str) -> List[str]:
+        """Get the labels of a URL host that can be index keys"""
+        return host.lower().strip(".").split(".")[:-1]
+
+    def _plan(self, index: ExtractorIndex, label: str) -> List[PlanStep]:
+        """Get the compiled lookup plan for a label, building it once"""
+        plan = index.plans.get(label)
+        if plan is None:
+            plan = self._compile(index, index.labels.get(label, []))
+            index.plans[label] = plan
+        return plan
+
+    def _compile(self, index: ExtractorIndex, positions: List[int]) -> List[PlanStep]:
+        """Compile patterns into steps that preserve their priority order"""
+        plan: List[PlanStep] = []
+        batch: List[int] = []
+
+        def flush() -> None:
+            if not batch:
+                return
+            combined = self._combine([index.patterns[p][1] for p in batch])
+            if combined is not None:
+                plan.append((combined, list(batch)))
+            else:
+                plan.extend(self._single(index, position) for position in batch)
+            batch.clear()
+
+        for position in sorted(positions):
+            if self.NUMERIC_BACKREF.search(index.patterns[position][1]):
+                # Group numbers shift when combined, so match it on its own
+                flush()
+                plan.append(self._single(index, position))
+                continue
+            batch.append(position)
+            if len(batch) >= self.MAX_COMBINED:
+                flush()
+        flush()
+
+        return [step for step in plan if step[0] is not None]
+
+    def _combine(self, patterns: List[str]) -> Optional[Pattern]:
+        """Compile several patterns into one alternation, preserving priority"""
+        parts = []
+        for i, pattern in enumerate(patterns):
+            prefix = f"_e{i}_"
+            body = self.GROUP_NAME.sub(
+                lambda m: f"(?P{m.group(1)}{prefix}{m.group(2)}{m.group(3)}", pattern
+            )
+            body = self.CONDITIONAL.sub(lambda m: f"(?({prefix}{m.group(1)})", body)
+            flags = self.LEADING_FLAGS.match(body)
+            if flags:
+                # In verbose mode a newline ends any trailing comment
+                end = "\n" if "x" in flags.group(1) else ""
+                body = f"(?{flags.group(1)}:{body[flags.end():]}{end})"
+            parts.append(f"(?P<_e{i}>{body})")
+        try:
+            return re.compile("|".join(parts))
+        except re.error:
+            return None
+
+    @staticmethod
+    def _single(index: ExtractorIndex, position: int) -> PlanStep:
+        """Compile one extractor pattern"""
+        name, pattern = index.patterns[position]
+        try:
+            return re.compile(pattern), position
+        except re.error as e:
+            logger.debug(f"Skipping invalid pattern for {name}: {e}")
+            return None, position  # type: ignore
+
+    @staticmethod
+    def _first_match(plan: List[PlanStep], url: str) -> Optional[int]:
+        """Get the position of the first pattern in a plan that matches"""
+        for regex, positions in plan:
+            match = regex.match(url)
+            if not match:
+                continue
+            if isinstance(positions, int):
+                return positions
+            for i, position in enumerate(positions):
+                if match.group(f"_e{i}") is not None:
+                    return position
+        return None
+
+    def get_extractor(self, url: str) -> Optional[str]:
+        """Get the name of the first extractor that accepts a URL
+
+        Args:
+            url: URL to match
+
+        Returns:
+            Extractor name, or None if no extractor matches
+        """
+        index = self._ensure_built()
+        try:
+            host = urlparse(url).hostname or ""
+        except ValueError:
+            return None
+
+        plans = [index.unindexed_plan]
+        plans.extend(
+            self._plan(index, label)
+            for label in dict.fromkeys(self._host_labels(host))
+            if label in index.labels
+        )
+        matches = [
+            position
+            for position in (self._first_match(plan, url) for plan in plans)
+            if position is not None
+        ]
+        return index.patterns[min(matches)][0] if matches else None
+
+    def is_supported(self, url: str, enabled_sites: Optional[List[str]] = None) -> bool:
+        """Check whether a URL is handled by an enabled extractor"""
+        extractor = self.get_extractor(url)
+        if extractor is None:
+            return False
+        if enabled_sites and not any(
+            site.lower() in extractor.lower() for site in enabled_sites
+        ):
+            logger.info(f"Site {extractor} not in enabled sites list")
+            return False
+        return True
+
+    async def reindex(self) -> bool:
+        """Rebuild the index from the installed yt-dlp
+
+        Called after yt-dlp is upgraded so new and changed extractors are
+        recognized. The patterns are read in a subprocess because the upgraded
+        package is not importable in place of the loaded one, and the index
+        is built in a worker thread. Lookups use the old index until the new
+        one replaces it.
+
+        Returns:
+            True if the index was rebuilt
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-c",
+                _DUMP_SCRIPT,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=120)
+            if process.returncode != 0:
+                logger.error(f"Failed to dump yt-dlp extractors: {stderr.decode(errors='ignore')}")
+                return False
+            specs = [(name, patterns) for name, patterns in json.loads(stdout)]
+            version = get_package_version("yt-dlp")
+        except Exception as e:
+            logger.error(f"Failed to reindex yt-dlp extractors: {e}")
+            return False
+
+        index = await asyncio.to_thread(self._build, specs, version)
+        with self._lock:
+            self._index = index
+        await self.build()
+        return True
+
+    def get_stats(self) -> Dict[str, Union[int, str, None]]:
+        """Get index statistics"""
+        index = self._index
+        return {
+            "version": index.version if index else None,
+            "patterns": len(index.patterns) if index else 0,
+            "labels": len(index.labels) if index else 0,
+            "unindexed": len(index.unindexed) if index else 0,
+            "compiled_plans": len(index.plans) if index else 0,
+        }
+
+
+# Shared matcher, built lazily on first lookup or by build() at startup
+extractor_matcher = ExtractorMatcher()
+
+
+def compare_with_ytdlp(
+    matcher: ExtractorMatcher, urls: Optional[List[str]] = None
+) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """Compare support answers with yt-dlp's own suitable() checks
+
+    Names may differ where an extractor overrides suitable() to defer to
+    another one, so only URLs that one side supports and the other does
+    not are reported.
+
+    Args:
+        matcher: Matcher to check
+        urls: URLs to check, defaults to every extractor's test URLs
+
+    Returns:
+        List of (url, matcher extractor, yt-dlp extractor) that disagree
+    """
+    from yt_dlp.extractor import gen_extractor_classes  # type: ignore
+
+    extractors = [
+        ie
+        for ie in gen_extractor_classes()
+        if ie.ie_key().lower() not in ExtractorMatcher.EXCLUDED_EXTRACTORS
+    ]
+    if urls is None:
+        urls = [
+            test["url"]
+            for ie in extractors
+            for test in ie.get_testcases(include_onlymatching=True)
+            if test.get("url", "").startswith(("http://", "https://"))
+        ]
+
+    def suitable(url: str) -> Optional[str]:
+        for ie in extractors:
+            try:
+                if ie.suitable(url):
+                    return ie.ie_key()
+            except Exception:
+                continue
+        return None
+
+    mismatches = []
+    for url in dict.fromkeys(urls):
+        expected = suitable(url)
+        found = matcher.get_extractor(url)
+        if (expected is None) != (found is None):
+            mismatches.append((url, found, expected))
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the yt-dlp comparison"""
+    parser = argparse.ArgumentParser(
+        description="Check the offline matcher against yt-dlp's suitable()"
+    )
+    parser.add_argument("urls", nargs="*", help="URLs to check, default test URLs")
+    args = parser.parse_args(argv)
+
+    matcher = ExtractorMatcher()
+    start = time.perf_counter()
+    matcher._precompile()
+    print(f"built and compiled in {time.perf_counter() - start:.2f}s: {matcher.get_stats()}")
+
+    mismatches = compare_with_ytdlp(matcher, args.urls or None)
+    for url, found, expected in mismatches:
+        print(f"{url}\n  matcher: {found}, yt-dlp: {expected}")
+    print(f"{len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
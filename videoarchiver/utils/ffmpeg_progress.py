@@ -0,0 +1,150 @@
+"""Batched, rate-limited parsing of FFmpeg -progress output"""
+
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, ClassVar
+
+from shared.progress import ProgressBus, ProgressSnapshot, compression_progress_bus
+
+logger = logging.getLogger("VideoArchiver")
+
+
+class FFmpegProgressReader:
+    """Turns an FFmpeg ``-progress pipe:1`` stream into progress snapshots
+
+    FFmpeg writes a block of key=value lines ending in a ``progress=`` line.
+    The stream is read in chunks, and only the last complete block in a
+    chunk is parsed. At most ``hz`` snapshots per second are published. The
+    final block is always published. Output size comes from FFmpeg's own
+    ``total_size`` field rather than from stat calls on the output file.
+    """
+
+    DEFAULT_HZ: ClassVar[float] = 2.0
+    CHUNK_SIZE: ClassVar[int] = 64 * 1024
+    BLOCK_END: ClassVar[bytes] = b"\nprogress="
+
+    def __init__(self, hz: float = DEFAULT_HZ, bus: ProgressBus = compression_progress_bus):
+        """Initialize the reader
+
+        Args:
+            hz: Maximum snapshots published per second per job, 0 for no limit
+            bus: Bus the snapshots are published to
+        """
+        self.hz = hz
+        self.bus = bus
+
+    @staticmethod
+    def parse_block(block: bytes) -> Dict[bytes, bytes]:
+        """Parse one progress block into raw key/value pairs"""
+        fields: Dict[bytes, bytes] = {}
+        for line in block.split(b"\n"):
+            key, sep, value = line.partition(b"=")
+            if sep:
+                fields[key.strip()] = value.strip()
+        return fields
+
+    @staticmethod
+    def _number(value: Optional[bytes], cast=float):
+        """Parse a numeric field, None for missing or N/A values"""
+        if not value:
+            return None
+        try:
+            return cast(value.rstrip(b"x"))
+        except ValueError:
+            return None
+
+    def _snapshot(
+        self,
+        key: str,
+        fields: Dict[bytes, bytes],
+        elapsed: float,
+        time_offset: float,
+        total_duration: float,
+    ) -> ProgressSnapshot:
+        """Build a snapshot from the fields of a progress block"""
+        # out_time_ms is also in microseconds; newer builds add out_time_us
+        out_us = self._number(fields.get(b"out_time_us") or fields.get(b"out_time_ms"), int)
+        current_time = time_offset + max(0, out_us or 0) / 1_000_000
+        percent = (
+            min(100.0, current_time / total_duration * 100) if total_duration > 0 else 0.0
+        )
+        return ProgressSnapshot(
+            key=key,
+            percent=percent,
+            current_time=current_time,
+            current_size=self._number(fields.get(b"total_size"), int) or 0,
+            elapsed=elapsed,
+            speed=self._number(fields.get(b"speed")),
+            fps=self._number(fields.get(b"fps")),
+            frame=self._number(fields.get(b"frame"), int) or 0,
+            done=fields.get(b"progress") == b"end",
+        )
+
+    async def run(
+        self,
+        stream: asyncio.StreamReader,
+        key: str,
+        duration: float,
+        callback: Optional[Callable[[ProgressSnapshot], None]] = None,
+        time_offset: float = 0.0,
+        total_duration: Optional[float] = None,
+    ) -> Optional[ProgressSnapshot]:
+        """Read a progress stream until EOF, publishing snapshots
+
+        Args:
+            stream: FFmpeg stdout with ``-progress pipe:1``
+            key: Job key the snapshots are published under
+            duration: Duration of the input in seconds
+            callback: Called with every published snapshot
+            time_offset: Seconds already done, e.g. by an earlier pass
+            total_duration: Duration progress is measured against, if it
+                spans several invocations
+
+        Returns:
+            The last snapshot, or None if FFmpeg reported no progress
+        """
+        total_duration = total_duration or duration
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        interval = 1 / self.hz if self.hz > 0 else 0.0
+        last_publish = float("-inf")
+        buffer = b"\n"
+        pending: Optional[Dict[bytes, bytes]] = None
+        last: Optional[ProgressSnapshot] = None
+
+        def publish(fields: Dict[bytes, bytes], now: float) -> ProgressSnapshot:
+            snapshot = self._snapshot(key, fields, now - started, time_offset, total_duration)
+            self.bus.publish(snapshot)
+            if callback:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.error(f"Error in progress callback: {e}")
+            return snapshot
+
+        while True:
+            chunk = await stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+
+            # Skip to the last block whose closing line is complete
+            marker = buffer.rfind(self.BLOCK_END)
+            while marker != -1 and buffer.find(b"\n", marker + 1) == -1:
+                marker = buffer.rfind(self.BLOCK_END, 0, marker)
+            if marker == -1:
+                continue
+            line_end = buffer.find(b"\n", marker + 1)
+            start = buffer.rfind(self.BLOCK_END, 0, marker)
+            pending = self.parse_block(buffer[start + 1 if start != -1 else 0:line_end])
+            buffer = buffer[line_end:]
+
+            now = loop.time()
+            if now - last_publish >= interval or pending.get(b"progress") == b"end":
+                last = publish(pending, now)
+                last_publish = now
+                pending = None
+
+        if pending is not None:
+            last = publish(pending, loop.time())
+        return last
@@ -4,13 +4,13 @@ import os
 import shutil
 import asyncio
 import logging
-import json
-import subprocess
-from typing import Tuple
+from typing import Tuple, Optional
 from pathlib import Path
 
 from utils.exceptions import VideoVerificationError
 from utils.file_deletion import SecureFileDeleter
+from utils.media_info import MediaInfo
+from ffmpeg.probe_service import ProbeService
 
 logger = logging.getLogger("VideoArchiver")
 
@@ -18,9 +18,15 @@ logger = logging.getLogger("VideoArchiver")
 class FileOperations:
     """Handles safe file operations with retries"""
 
-    def __init__(self, max_retries: int = 3, retry_delay: int = 1):
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_delay: int = 1,
+        probe_service: Optional[ProbeService] = None,
+    ):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.probe_service = probe_service or ProbeService()
 
     async def safe_delete_file(self, file_path: str) -> bool:
         """Safely delete a file with retries"""
@@ -50,85 +56,38 @@ class FileOperations:
                 await asyncio.sleep(self.retry_delay * (attempt + 1))
         return False
 
-    def verify_video_file(self, file_path: str, ffprobe_path: str) -> bool:
-        """Verify video file integrity"""
-        try:
-            cmd = [
-                ffprobe_path,
-                "-v",
-                "quiet",
-                "-print_format",
-                "json",
-                "-show_format",
-                "-show_streams",
-                file_path,
-            ]
-
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=30,
-            )
-
-            if result.returncode != 0:
-                raise VideoVerificationError(f"FFprobe failed: {result.stderr}")
-
-            probe = json.loads(result.stdout)
+    async def probe_video(self, file_path: str, ffprobe_path: str) -> Optional[MediaInfo]:
+        """Probe a video file for its format and streams
 
-            # Verify video stream
-            video_streams = [s for s in probe["streams"] if s["codec_type"] == "video"]
-            if not video_streams:
-                raise VideoVerificationError("No video streams found")
+        Results are cached per file version by the probe service, so repeated
+        calls for an unchanged file do not run ffprobe again.
 
-            # Verify duration
-            duration = float(probe["format"].get("duration", 0))
-            if duration <= 0:
-                raise VideoVerificationError("Invalid video duration")
-
-            # Verify file is readable
-            try:
-                with open(file_path, "rb") as f:
-                    f.seek(0, 2)
-                    if f.tell() == 0:
-                        raise VideoVerificationError("Empty file")
-            except Exception as e:
-                raise VideoVerificationError(f"File read error: {str(e)}")
-
-            return True
+        Returns:
+            MediaInfo for the file, or None if it could not be probed
+        """
+        try:
+            probe = await self.probe_service.probe(file_path, ffprobe_path)
+            return MediaInfo.from_probe(file_path, os.path.getsize(file_path), probe)
+        except Exception as e:
+            logger.error(f"Error probing video file {file_path}: {e}")
+            return None
 
-        except subprocess.TimeoutExpired:
-            logger.error(f"FFprobe timed out for {file_path}")
-            return False
-        except json.JSONDecodeError:
-            logger.error(f"Invalid FFprobe output for {file_path}")
+    async def verify_video_file(self, file_path: str, ffprobe_path: str) -> bool:
+        """Verify video file integrity"""
+        info = await self.probe_video(file_path, ffprobe_path)
+        if not info:
             return False
-        except Exception as e:
+        try:
+            info.validate()
+            return True
+        except VideoVerificationError as e:
             logger.error(f"Error verifying video file {file_path}: {e}")
             return False
 
-    def get_video_duration(self, file_path: str, ffprobe_path: str) -> float:
+    async def get_video_duration(self, file_path: str, ffprobe_path: str) -> float:
         """Get video duration in seconds"""
-        try:
-            cmd = [
-                ffprobe_path,
-                "-v",
-                "quiet",
-                "-print_format",
-                "json",
-                "-show_format",
-                file_path,
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"FFprobe failed: {result.stderr}")
-
-            data = json.loads(result.stdout)
-            return float(data["format"]["duration"])
-        except Exception as e:
-            logger.error(f"Error getting video duration: {e}")
-            return 0
+        info = await self.probe_video(file_path, ffprobe_path)
+        return info.duration if info else 0
 
     def check_file_size(self, file_path: str, max_size_mb: int) -> Tuple[bool, int]:
         """Check if file size is within limits"""
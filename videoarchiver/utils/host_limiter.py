@@ -0,0 +1,323 @@
+"""Per-host rate limiting and connection budget for outbound fetches"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Deque,
+    Dict,
+    Any,
+    Optional,
+    ClassVar,
+    FrozenSet,
+    Iterator,
+    AsyncIterator,
+)
+from urllib.parse import urlparse
+
+from utils.retry_policy import ErrorClass, default_policy
+from utils.site_registry import site_registry
+
+logger = logging.getLogger("VideoArchiver")
+
+
+@dataclass
+class HostState:
+    """Token bucket, in-flight count and recent outcomes for one host"""
+
+    base_rate: float
+    burst: float
+    max_concurrent: int
+    rate: float = 0.0
+    tokens: float = 0.0
+    last_refill: float = field(default_factory=time.monotonic)
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    last_slowdown: float = 0.0
+    outcomes: Deque[bool] = field(default_factory=lambda: deque(maxlen=20))
+    requests: int = 0
+    failures: int = 0
+    rate_limited: int = 0
+    throttled: int = 0
+    total_wait: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.rate = self.base_rate
+        self.tokens = self.burst
+
+    def refill(self, now: float) -> None:
+        """Add tokens for the time elapsed since the last refill"""
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of recent requests that failed for host-side reasons"""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class HostLimiter:
+    """Host-keyed token bucket and concurrency limiter with adaptive slow-down
+
+    Every outbound request to a video site (downloads, support probes and any
+    prefetching) should go through the shared instance so a burst of links to
+    one site is paced instead of getting the bot throttled.
+    """
+
+    DEFAULT_RATE: ClassVar[float] = 1.0  # requests per second
+    DEFAULT_BURST: ClassVar[float] = 3.0
+    DEFAULT_CONCURRENCY: ClassVar[int] = 2
+    MIN_RATE: ClassVar[float] = 0.05  # one request every 20 seconds
+    SLOWDOWN_FACTOR: ClassVar[float] = 0.5
+    SLOWDOWN_INTERVAL: ClassVar[float] = 10.0  # seconds between slow-downs
+    RECOVERY_STEP: ClassVar[float] = 0.1  # fraction of base rate per success
+    ERROR_RATE_THRESHOLD: ClassVar[float] = 0.3
+    MIN_SAMPLES: ClassVar[int] = 5
+    RATE_LIMIT_COOLDOWN: ClassVar[float] = 30.0
+    POLL_INTERVAL: ClassVar[float] = 0.25
+    # Second-level labels that country-code TLDs sell registrations under
+    SECOND_LEVEL_SUFFIXES: ClassVar[FrozenSet[str]] = frozenset(
+        {"co", "com", "net", "org", "gov", "edu", "ac", "ne", "or", "go", "gob"}
+    )
+    HOST_ALIASES: ClassVar[Dict[str, str]] = {
+        "youtu.be": "youtube.com",
+        "redd.it": "reddit.com",
+        "x.com": "twitter.com",
+    }
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        max_concurrent: int = DEFAULT_CONCURRENCY,
+        overrides: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        """Initialize the limiter
+
+        Args:
+            rate: Sustained requests per second allowed per host
+            burst: Number of requests a host may receive back to back
+            max_concurrent: Maximum simultaneous connections per host
+            overrides: Per-host values for rate, burst and max_concurrent
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.overrides = overrides or {}
+        self._hosts: Dict[str, HostState] = {}
+        # Sync probes run in executor threads, so state is guarded by a
+        # thread lock rather than an asyncio lock
+        self._lock = threading.Lock()
+
+    def host_key(self, url: str) -> str:
+        """Map a URL to the host bucket it is accounted against"""
+        try:
+            host = (urlparse(url).hostname or "").lower()
+        except ValueError:
+            host = ""
+        if not host:
+            return "unknown"
+        registered = site_registry.registered_domain(host)
+        if registered:
+            host = registered
+        else:
+            labels = host.split(".")
+            # Keep the label under a public suffix such as co.uk or com.au,
+            # so unrelated sites under it do not share one bucket
+            keep = (
+                3
+                if len(labels[-1]) == 2 and labels[-2] in self.SECOND_LEVEL_SUFFIXES
+                else 2
+            )
+            if len(labels) > keep:
+                host = ".".join(labels[-keep:])
+        return self.HOST_ALIASES.get(host, host)
+
+    def _get_state(self, host: str) -> HostState:
+        """Get or create the state for a host"""
+        state = self._hosts.get(host)
+        if state is None:
+            override = self.overrides.get(host, {})
+            state = HostState(
+                base_rate=override.get("rate", self.rate),
+                burst=override.get("burst", self.burst),
+                max_concurrent=int(override.get("max_concurrent", self.max_concurrent)),
+            )
+            self._hosts[host] = state
+        return state
+
+    def _try_acquire(self, host: str) -> float:
+        """Take a token and a connection slot if possible
+
+        Returns:
+            0 if acquired, otherwise the number of seconds to wait before
+            trying again
+        """
+        with self._lock:
+            state = self._get_state(host)
+            now = time.monotonic()
+            if now < state.cooldown_until:
+                return state.cooldown_until - now
+            if state.in_flight >= state.max_concurrent:
+                return self.POLL_INTERVAL
+            state.refill(now)
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+            state.tokens -= 1
+            state.in_flight += 1
+            state.requests += 1
+            return 0.0
+
+    def _release(
+        self,
+        host: str,
+        waited: float,
+        error: Optional[Exception],
+        record: bool = True,
+    ) -> None:
+        """Release a slot and feed the outcome into the adaptive rate
+
+        Args:
+            host: Host key the slot was acquired for
+            waited: Seconds spent waiting for the slot
+            error: Exception the request failed with, None on success
+            record: False when the request was interrupted, e.g. cancelled,
+                so it says nothing about the host's health
+        """
+        with self._lock:
+            state = self._get_state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            if waited > 0:
+                state.throttled += 1
+                state.total_wait += waited
+
+            if not record:
+                return
+            if error is None:
+                self._record_success(state)
+                return
+
+            state.failures += 1
+            error_class = default_policy.classify(str(error))
+            if error_class == ErrorClass.PERMANENT:
+                # The site answered; the video itself is the problem
+                self._record_success(state)
+                return
+
+            state.outcomes.append(False)
+            now = time.monotonic()
+            if error_class == ErrorClass.RATE_LIMITED:
+                state.rate_limited += 1
+                cooldown = default_policy.parse_retry_after(str(error))
+                state.cooldown_until = now + (cooldown or self.RATE_LIMIT_COOLDOWN)
+                self._slow_down(host, state, now, "rate limited")
+            elif (
+                len(state.outcomes) >= self.MIN_SAMPLES
+                and state.error_rate >= self.ERROR_RATE_THRESHOLD
+            ):
+                self._slow_down(host, state, now, f"error rate {state.error_rate:.0%}")
+
+    def _record_success(self, state: HostState) -> None:
+        """Record a healthy response and recover the rate additively"""
+        state.outcomes.append(True)
+        if state.rate < state.base_rate:
+            state.rate = min(
+                state.base_rate, state.rate + state.base_rate * self.RECOVERY_STEP
+            )
+
+    def _slow_down(self, host: str, state: HostState, now: float, reason: str) -> None:
+        """Multiplicatively reduce a host's rate, at most once per interval"""
+        if now - state.last_slowdown < self.SLOWDOWN_INTERVAL:
+            return
+        state.last_slowdown = now
+        state.rate = max(self.MIN_RATE, state.rate * self.SLOWDOWN_FACTOR)
+        state.tokens = min(state.tokens, 0.0)
+        logger.warning(f"Slowing requests to {host} to {state.rate:.2f}/s ({reason})")
+
+    @asynccontextmanager
+    async def acquire(self, url: str) -> AsyncIterator[None]:
+        """Wait for a slot for the URL's host
+
+        Exceptions raised inside the block count as failed requests;
+        cancellation only releases the slot.
+
+        Args:
+            url: URL about to be fetched
+        """
+        host = self.host_key(url)
+        waited = 0.0
+        while True:
+            delay = self._try_acquire(host)
+            if delay <= 0:
+                break
+            waited += delay
+            await asyncio.sleep(delay)
+
+        try:
+            yield
+        except Exception as e:
+            self._release(host, waited, e)
+            raise
+        except BaseException:
+            # Cancellation or shutdown, not an answer from the host
+            self._release(host, waited, None, record=False)
+            raise
+        else:
+            self._release(host, waited, None)
+
+    @contextmanager
+    def acquire_sync(self, url: str) -> Iterator[None]:
+        """Blocking variant of acquire for code running in executor threads"""
+        host = self.host_key(url)
+        waited = 0.0
+        while True:
+            delay = self._try_acquire(host)
+            if delay <= 0:
+                break
+            waited += delay
+            time.sleep(delay)
+
+        try:
+            yield
+        except Exception as e:
+            self._release(host, waited, e)
+            raise
+        except BaseException:
+            # Cancellation or shutdown, not an answer from the host
+            self._release(host, waited, None, record=False)
+            raise
+        else:
+            self._release(host, waited, None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-host statistics"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "rate_limited": state.rate_limited,
+                    "throttled": state.throttled,
+                    "avg_wait": (
+                        state.total_wait / state.throttled if state.throttled else 0.0
+                    ),
+                    "in_flight": state.in_flight,
+                    "rate": state.rate,
+                    "base_rate": state.base_rate,
+                    "error_rate": state.error_rate,
+                    "cooling_down": now < state.cooldown_until,
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+# Shared limiter so every guild's downloads and probes count against the
+# same per-host budget, paced per site by the registry's download profiles
+host_limiter = HostLimiter(overrides=site_registry.limiter_overrides())
@@ -0,0 +1,91 @@
+"""Media information gathered from a single ffprobe run"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+
+from utils.exceptions import VideoVerificationError
+
+
+@dataclass
+class MediaInfo:
+    """Probe result for a video file, shared by every post-download stage"""
+
+    path: str
+    size: int
+    duration: float
+    format_name: str
+    width: int = 0
+    height: int = 0
+    video_codec: Optional[str] = None
+    bitrate: int = 0
+    has_video: bool = False
+    has_audio: bool = False
+    probe: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_probe(cls, path: str, size: int, probe: Dict[str, Any]) -> "MediaInfo":
+        """Build media info from ffprobe JSON output
+
+        Args:
+            path: Path of the probed file
+            size: File size in bytes
+            probe: Parsed output of ffprobe -show_format -show_streams
+
+        Returns:
+            MediaInfo for the file
+        """
+        streams = probe.get("streams", [])
+        fmt = probe.get("format", {})
+        video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+        def _number(value: Any, cast=float) -> Any:
+            try:
+                return cast(value)
+            except (TypeError, ValueError):
+                return cast(0)
+
+        return cls(
+            path=path,
+            size=size,
+            duration=_number(fmt.get("duration")),
+            format_name=fmt.get("format_name", ""),
+            width=_number(video.get("width"), int) if video else 0,
+            height=_number(video.get("height"), int) if video else 0,
+            video_codec=video.get("codec_name") if video else None,
+            bitrate=_number(fmt.get("bit_rate"), int),
+            has_video=video is not None,
+            has_audio=audio is not None,
+            probe=probe,
+        )
+
+    @property
+    def resolution(self) -> Optional[str]:
+        """Resolution as WIDTHxHEIGHT"""
+        if not self.width or not self.height:
+            return None
+        return f"{self.width}x{self.height}"
+
+    def validate(self) -> None:
+        """Check that the file is a playable video
+
+        Raises:
+            VideoVerificationError: If the file has no video stream, no
+                duration or no content
+        """
+        if not self.has_video:
+            raise VideoVerificationError("No video streams found")
+        if self.duration <= 0:
+            raise VideoVerificationError("Invalid video duration")
+        if self.size <= 0:
+            raise VideoVerificationError("Empty file")
+
+    def to_db_metadata(self) -> Dict[str, Any]:
+        """Get the metadata stored alongside an archived video"""
+        return {
+            "file_size": self.size,
+            "duration": int(self.duration),
+            "format": self.format_name.split(",")[0] if self.format_name else None,
+            "resolution": self.resolution,
+            "bitrate": self.bitrate or None,
+        }
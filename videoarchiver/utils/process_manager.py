@@ -1,20 +1,21 @@
-"""Process management and cleanup utilities"""
+"""Download thread pool and tracking utilities"""
 
 import asyncio
 import logging
-import subprocess
-from typing import Set, Dict, Any
+from typing import Dict, Any
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger("VideoArchiver")
 
 class ProcessManager:
-    """Manages processes and resources for video operations"""
+    """Manages download threads and tracking for video operations
+
+    FFmpeg and FFprobe processes are owned by the FFmpeg manager's
+    ProcessSupervisor, not by this class.
+    """
 
     def __init__(self, concurrent_downloads: int = 2):
-        self._active_processes: Set[subprocess.Popen] = set()
-        self._processes_lock = asyncio.Lock()
         self._shutting_down = False
         
         # Create thread pool with proper naming
@@ -32,18 +33,6 @@ class ProcessManager:
         self._shutting_down = True
 
         try:
-            # Kill any active processes
-            async with self._processes_lock:
-                for process in self._active_processes:
-                    try:
-                        process.terminate()
-                        await asyncio.sleep(0.1)  # Give process time to terminate
-                        if process.poll() is None:
-                            process.kill()  # Force kill if still running
-                    except Exception as e:
-                        logger.error(f"Error killing process: {e}")
-                self._active_processes.clear()
-
             # Clean up thread pool
             self.download_pool.shutdown(wait=False, cancel_futures=True)
 
@@ -59,15 +48,6 @@ class ProcessManager:
     async def force_cleanup(self) -> None:
         """Force cleanup of all resources"""
         try:
-            # Kill all processes immediately
-            async with self._processes_lock:
-                for process in self._active_processes:
-                    try:
-                        process.kill()
-                    except Exception as e:
-                        logger.error(f"Error force killing process: {e}")
-                self._active_processes.clear()
-
             # Force shutdown thread pool
             self.download_pool.shutdown(wait=False, cancel_futures=True)
 
@@ -91,16 +71,6 @@ class ProcessManager:
         async with self._downloads_lock:
             self.active_downloads.pop(url, None)
 
-    async def track_process(self, process: subprocess.Popen) -> None:
-        """Track a new process"""
-        async with self._processes_lock:
-            self._active_processes.add(process)
-
-    async def untrack_process(self, process: subprocess.Popen) -> None:
-        """Remove process from tracking"""
-        async with self._processes_lock:
-            self._active_processes.discard(process)
-
     @property
     def is_shutting_down(self) -> bool:
         """Check if manager is shutting down"""
@@ -108,4 +78,4 @@ class ProcessManager:
 
     def get_active_downloads(self) -> Dict[str, Dict[str, Any]]:
         """Get current active downloads"""
-        return self.acti
\ No newline at end of file
+        return self.active_downloads.copy()
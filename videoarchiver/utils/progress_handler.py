@@ -1,7 +1,8 @@
 import logging
 from datetime import datetime
 from typing import Dict, Any, Optional, Callable
-import os
+
+from shared.progress import ProgressSnapshot
 
 logger = logging.getLogger("VideoArchiver")
 
@@ -29,6 +30,8 @@ class ProgressHandler:
     """Handles progress tracking and callbacks for video operations"""
     def __init__(self):
         self.progress_data: Dict[str, Dict[str, Any]] = {}
+        # Latest compression snapshot per key; replaced, never mutated
+        self.snapshots: Dict[str, ProgressSnapshot] = {}
 
     def initialize_progress(self, url: str) -> None:
         """Initialize progress tracking for a URL"""
@@ -57,13 +60,26 @@ class ProgressHandler:
 
     def complete(self, key: str) -> None:
         """Mark progress as complete for a key"""
+        self.clear_snapshot(key)
         if key in self.progress_data:
             self.progress_data[key]["active"] = False
             self.progress_data[key]["percent"] = 100
 
     def get_progress(self, key: str) -> Optional[Dict[str, Any]]:
-        """Get progress data for a key"""
-        return self.progress_data.get(key)
+        """Get progress data for a key, with the latest compression snapshot"""
+        data = self.progress_data.get(key)
+        snapshot = self.snapshots.get(key)
+        if snapshot is None:
+            return data
+        return {**(data or {}), **snapshot.to_dict()}
+
+    def get_snapshot(self, key: str) -> Optional[ProgressSnapshot]:
+        """Get the latest compression snapshot for a key"""
+        return self.snapshots.get(key)
+
+    def clear_snapshot(self, key: str) -> None:
+        """Forget the compression snapshot of a finished encode"""
+        self.snapshots.pop(key, None)
 
     def handle_download_progress(self, d: Dict[str, Any], url: str, 
                                progress_callback: Optional[Callable[[float], None]] = None) -> None:
@@ -102,24 +118,19 @@ class ProgressHandler:
         except Exception as e:
             logger.error(f"Error in progress handler: {str(e)}")
 
-    def handle_compression_progress(self, input_file: str, current_time: float, duration: float,
-                                  output_file: str, start_time: datetime,
-                                  progress_callback: Optional[Callable[[float], None]] = None) -> None:
-        """Handle compression progress updates"""
-        try:
-            if duration > 0:
-                progress = min(100, (current_time / duration) * 100)
-                elapsed = datetime.utcnow() - start_time
+    def handle_compression_snapshot(self, snapshot: ProgressSnapshot,
+                                    progress_callback: Optional[Callable[[float], None]] = None) -> None:
+        """Handle a compression progress snapshot from FFmpegProgressReader
 
-                self.update(input_file, {
-                    "percent": progress,
-                    "elapsed_time": str(elapsed).split(".")[0],
-                    "current_size": os.path.getsize(output_file) if os.path.exists(output_file) else 0,
-                    "current_time": current_time,
-                })
+        The snapshot replaces the previous one for its key instead of being
+        copied field by field into the progress dict, so readers never see
+        a half-updated state.
+        """
+        try:
+            self.snapshots[snapshot.key] = snapshot
 
-                if progress_callback:
-                    progress_callback(progress)
+            if progress_callback:
+                progress_callback(snapshot.percent)
 
         except Exception as e:
             logger.error(f"Error updating compression progress: {str(e)}")
@@ -0,0 +1,161 @@
+"""Retry policy with error classification for downloads and encodes"""
+
+import re
+import random
+import logging
+from enum import Enum
+from dataclasses import dataclass
+from typing import Optional, ClassVar, Tuple, Pattern
+
+logger = logging.getLogger("VideoArchiver")
+
+
+class ErrorClass(Enum):
+    """How an error should be treated by the retry policy"""
+
+    PERMANENT = "permanent"  # Retrying cannot succeed
+    RATE_LIMITED = "rate_limited"  # Retry after the site's cool-down
+    TRANSIENT = "transient"  # Retry with backoff
+
+
+@dataclass(frozen=True)
+class RetryDecision:
+    """Outcome of applying the policy to a failed attempt"""
+
+    error_class: ErrorClass
+    retry: bool
+    delay: float
+    reason: str
+
+
+class RetryPolicy:
+    """Classifies yt-dlp/FFmpeg errors and computes jittered backoff"""
+
+    PERMANENT_PATTERNS: ClassVar[Tuple[str, ...]] = (
+        r"unsupported url",
+        r"private video",
+        r"video unavailable",
+        r"this video is (?:private|unavailable|not available)",
+        r"has been removed",
+        r"account .*(?:terminated|suspended)",
+        r"not available in your country",
+        r"geo[- ]?(?:restricted|blocked)",
+        r"sign in to confirm your age",
+        r"members[- ]only",
+        r"requested format is not available",
+        r"no video formats found",
+        r"http error 40[14]",
+        r"http error 410",
+        r"invalid data found when processing input",
+        r"no video streams found",
+        r"unknown encoder",
+        r"permission denied",
+        r"failed to compress to target size",
+        r"file is larger than max",
+        r"\bdrm\b",
+    )
+    RATE_LIMIT_PATTERNS: ClassVar[Tuple[str, ...]] = (
+        r"http error 429",
+        r"too many requests",
+        r"rate[- ]?limit",
+        r"try again later",
+        r"http error 503",
+    )
+    RETRY_AFTER_PATTERN: ClassVar[Pattern] = re.compile(
+        r"retry[- ]after[:= ]*(\d+(?:\.\d+)?)\s*(ms|s|sec|seconds|m|min|minutes)?",
+        re.IGNORECASE,
+    )
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 5.0,
+        max_delay: float = 300.0,
+        rate_limit_delay: float = 60.0,
+    ):
+        """Initialize the policy
+
+        Args:
+            max_attempts: Maximum number of attempts including the first one
+            base_delay: Base delay in seconds for transient backoff
+            max_delay: Upper bound for any computed delay
+            rate_limit_delay: Default cool-down when a site rate limits us
+                without sending a Retry-After hint
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_delay = rate_limit_delay
+        self._permanent = re.compile("|".join(self.PERMANENT_PATTERNS), re.IGNORECASE)
+        self._rate_limited = re.compile(
+            "|".join(self.RATE_LIMIT_PATTERNS), re.IGNORECASE
+        )
+
+    def classify(self, error: Optional[str]) -> ErrorClass:
+        """Classify an error message
+
+        Args:
+            error: Error message from yt-dlp, FFmpeg or our own wrappers
+
+        Returns:
+            ErrorClass for the error
+        """
+        if not error:
+            return ErrorClass.TRANSIENT
+        if self._rate_limited.search(error):
+            return ErrorClass.RATE_LIMITED
+        if self._permanent.search(error):
+            return ErrorClass.PERMANENT
+        return ErrorClass.TRANSIENT
+
+    def parse_retry_after(self, error: Optional[str]) -> Optional[float]:
+        """Extract a Retry-After style hint in seconds from an error message"""
+        if not error:
+            return None
+        match = self.RETRY_AFTER_PATTERN.search(error)
+        if not match:
+            return None
+        value = float(match.group(1))
+        unit = (match.group(2) or "s").lower()
+        if unit == "ms":
+            value /= 1000
+        elif unit in ("m", "min", "minutes"):
+            value *= 60
+        return value
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for a zero-based attempt number"""
+        ceiling = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def decide(self, error: Optional[str], attempt: int) -> RetryDecision:
+        """Decide whether and when to retry after a failed attempt
+
+        Args:
+            error: Error message of the failed attempt
+            attempt: Zero-based number of the attempt that just failed
+
+        Returns:
+            RetryDecision describing what to do next
+        """
+        error_class = self.classify(error)
+
+        if error_class == ErrorClass.PERMANENT:
+            return RetryDecision(error_class, False, 0.0, "permanent error")
+
+        if attempt + 1 >= self.max_attempts:
+            return RetryDecision(error_class, False, 0.0, "attempts exhausted")
+
+        hint = self.parse_retry_after(error)
+        if error_class == ErrorClass.RATE_LIMITED:
+            delay = hint if hint is not None else self.rate_limit_delay * (2**attempt)
+            # Small jitter so throttled items don't all return at once
+            delay = min(self.max_delay, delay) * random.uniform(1.0, 1.2)
+            return RetryDecision(error_class, True, delay, "rate limited")
+
+        delay = hint if hint is not None else self.backoff(attempt)
+        return RetryDecision(error_class, True, min(self.max_delay, delay), "transient")
+
+
+# Shared policy instance for callers that don't need custom limits
+default_policy = RetryPolicy()
@@ -0,0 +1,238 @@
+"""Declarative registry of supported video sites
+
+The sites are described in ``sites.json`` next to this module:
+
+- ``direct_extensions``: file extensions downloaded as direct video links
+- ``sites``: one entry per site with
+    - ``name``: identifier used in logs, metadata and enabled_sites
+    - ``domains``: registrable domains of the site
+    - ``patterns``: objects with a ``regex`` matched from the start of the
+      URL, which captures the video ID in a group named ``id``, and an
+      optional ``canonical`` URL template using ``{id}``
+    - ``supports_timestamp``, ``supports_playlist``, ``requires_api``
+    - ``profile``: download profile with host limiter ``rate``, ``burst``
+      and ``max_concurrent``, and ``ydl_options`` merged into yt-dlp options
+
+All patterns are compiled once, when this module is imported.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Pattern, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("VideoArchiver")
+
+REGISTRY_PATH = Path(__file__).with_name("sites.json")
+
+
+@dataclass(frozen=True)
+class SiteProfile:
+    """Per-site download settings"""
+
+    rate: Optional[float] = None
+    burst: Optional[float] = None
+    max_concurrent: Optional[int] = None
+    ydl_options: Mapping[str, Any] = field(default_factory=dict)
+
+    def limiter_override(self) -> Dict[str, float]:
+        """Host limiter values this profile sets"""
+        return {
+            key: value
+            for key, value in (
+                ("rate", self.rate),
+                ("burst", self.burst),
+                ("max_concurrent", self.max_concurrent),
+            )
+            if value is not None
+        }
+
+
+@dataclass(frozen=True)
+class SiteSpec:
+    """A supported video site"""
+
+    name: str
+    domains: Tuple[str, ...]
+    pattern: Pattern
+    supports_timestamp: bool = False
+    supports_playlist: bool = False
+    requires_api: bool = False
+    profile: SiteProfile = field(default_factory=SiteProfile)
+
+
+@dataclass(frozen=True)
+class SiteMatch:
+    """A URL matched against the registry"""
+
+    site: SiteSpec
+    video_id: Optional[str]
+    canonical_url: Optional[str]
+
+
+class SiteRegistry:
+    """Compiled form of the site registry
+
+    Every pattern of every site is combined into one alternation. The
+    ``id`` group of each pattern is renamed so the combination compiles,
+    and the outer group a match ends in identifies the site and pattern.
+    """
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        """Compile a registry
+
+        Args:
+            data: Parsed registry file
+
+        Raises:
+            ValueError: If a site or pattern is invalid
+        """
+        self.direct_extensions: Tuple[str, ...] = tuple(
+            ext.lower() for ext in data.get("direct_extensions", ())
+        )
+        self.sites: Dict[str, SiteSpec] = {}
+        self._domains: Dict[str, SiteSpec] = {}
+        # Outer group name -> (site, id group name, canonical template)
+        self._groups: Dict[str, Tuple[SiteSpec, str, Optional[str]]] = {}
+        alternatives: List[str] = []
+
+        for entry in data.get("sites", ()):
+            name = entry["name"].lower()
+            site_alternatives = []
+            pending = []
+            for pattern in entry["patterns"]:
+                group = f"_p{len(self._groups) + len(pending)}"
+                if "(?P<id>" not in pattern["regex"]:
+                    raise ValueError(f"Pattern for {name} has no id group")
+                body = pattern["regex"].replace("(?P<id>", f"(?P<{group}_id>")
+                site_alternatives.append(pattern["regex"])
+                alternatives.append(f"(?P<{group}>{body})")
+                pending.append((group, pattern.get("canonical")))
+
+            try:
+                site_pattern = re.compile(
+                    "|".join(
+                        f"(?:{regex.replace('(?P<id>', f'(?P<id{i}>')})"
+                        for i, regex in enumerate(site_alternatives)
+                    )
+                )
+            except re.error as e:
+                raise ValueError(f"Invalid pattern for {name}: {e}")
+
+            profile = entry.get("profile", {})
+            site = SiteSpec(
+                name=name,
+                domains=tuple(d.lower() for d in entry.get("domains", ())),
+                pattern=site_pattern,
+                supports_timestamp=entry.get("supports_timestamp", False),
+                supports_playlist=entry.get("supports_playlist", False),
+                requires_api=entry.get("requires_api", False),
+                profile=SiteProfile(
+                    rate=profile.get("rate"),
+                    burst=profile.get("burst"),
+                    max_concurrent=profile.get("max_concurrent"),
+                    ydl_options=dict(profile.get("ydl_options", {})),
+                ),
+            )
+            self.sites[name] = site
+            for domain in site.domains:
+                self._domains[domain] = site
+            for group, canonical in pending:
+                self._groups[group] = (site, f"{group}_id", canonical)
+
+        self.alternation = "|".join(alternatives)
+        try:
+            self.combined: Pattern = re.compile(self.alternation)
+        except re.error as e:
+            raise ValueError(f"Invalid site registry: {e}")
+
+    @classmethod
+    def load(cls, path: Path = REGISTRY_PATH) -> "SiteRegistry":
+        """Load and compile a registry file"""
+        with open(path, "r", encoding="utf-8") as f:
+            registry = cls(json.load(f))
+        logger.debug(
+            f"Loaded {len(registry.sites)} sites with {len(registry._groups)} "
+            f"patterns from {path}"
+        )
+        return registry
+
+    def resolve(self, match: "re.Match") -> Optional[SiteMatch]:
+        """Turn a match of a pattern containing ``alternation`` into a site
+
+        Args:
+            match: Match whose last closed group is one of the site groups
+
+        Returns:
+            SiteMatch, or None if no site alternative took part in the match
+        """
+        entry = self._groups.get(match.lastgroup or "")
+        if entry is None:
+            return None
+        site, id_group, canonical = entry
+        video_id = match.group(id_group)
+        return SiteMatch(
+            site=site,
+            video_id=video_id,
+            canonical_url=canonical.format(id=video_id) if canonical and video_id else None,
+        )
+
+    def match(self, url: str) -> Optional[SiteMatch]:
+        """Match a URL against every site
+
+        Args:
+            url: URL, with or without scheme
+
+        Returns:
+            SiteMatch, or None if the URL is not from a known site
+        """
+        match = self.combined.match(url)
+        return self.resolve(match) if match else None
+
+    def is_direct(self, url: str) -> bool:
+        """Check whether a URL points straight at a video file"""
+        try:
+            path = urlsplit(url).path.lower()
+        except ValueError:
+            return False
+        return path.endswith(self.direct_extensions)
+
+    def registered_domain(self, domain: str) -> Optional[str]:
+        """Get the registry domain that a domain is or is a subdomain of"""
+        labels = domain.lower().split(".")
+        for i in range(len(labels) - 1):
+            candidate = ".".join(labels[i:])
+            if candidate in self._domains:
+                return candidate
+        return None
+
+    def site_for_domain(self, domain: str) -> Optional[SiteSpec]:
+        """Get the site a domain or any of its subdomains belongs to"""
+        registered = self.registered_domain(domain)
+        return self._domains[registered] if registered else None
+
+    def profile_for(self, url: str) -> SiteProfile:
+        """Get the download profile for a URL, empty for unknown sites"""
+        try:
+            host = urlsplit(url).hostname or ""
+        except ValueError:
+            host = ""
+        site = self.site_for_domain(host) if host else None
+        return site.profile if site else SiteProfile()
+
+    def limiter_overrides(self) -> Dict[str, Dict[str, float]]:
+        """Host limiter overrides for every domain with a profile"""
+        overrides: Dict[str, Dict[str, float]] = {}
+        for site in self.sites.values():
+            override = site.profile.limiter_override()
+            if override:
+                for domain in site.domains:
+                    overrides[domain] = override
+        return overrides
+
+
+# Shared registry, compiled at import
+site_registry = SiteRegistry.load()
@@ -0,0 +1,167 @@
+"""Size- and time-bounded LRU cache"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Dict, Generic, Iterator, List, Optional, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+@dataclass
+class _Entry(Generic[V]):
+    """A cached value and when it stops being valid"""
+
+    value: V
+    expires_at: float
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache whose entries also expire after a period without use
+
+    Entries are kept in an OrderedDict in order of last use, so the least
+    recently used entry is evicted in O(1) when the cache is full. Because
+    every read or write pushes an entry's expiry forward and moves it to
+    the end, expired entries are always at the front and are dropped in
+    amortized O(1) as new entries are added.
+    """
+
+    DEFAULT_MAX_SIZE: ClassVar[int] = 1000
+    DEFAULT_TTL: ClassVar[float] = 3600.0
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: Optional[float] = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache
+
+        Args:
+            max_size: Most entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid after its last use, None for no expiry
+            clock: Monotonic time source
+        """
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[K, _Entry[V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _deadline(self, now: float) -> float:
+        return now + self.ttl if self.ttl is not None else float("inf")
+
+    def _prune(self, now: float) -> None:
+        """Drop expired entries from the least recently used end"""
+        entries = self._entries
+        while entries:
+            entry = next(iter(entries.values()))
+            if entry.expires_at > now:
+                break
+            entries.popitem(last=False)
+            self.expirations += 1
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Get a value and mark it as recently used
+
+        Args:
+            key: Cache key
+            default: Returned if the key is missing or expired
+
+        Returns:
+            The cached value or default
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        now = self._clock()
+        if entry.expires_at <= now:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        entry.expires_at = self._deadline(now)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def peek(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Get a value without counting a hit or changing its position"""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= self._clock():
+            return default
+        return entry.value
+
+    def set(self, key: K, value: V) -> None:
+        """Add or replace a value, evicting the least recently used if full"""
+        now = self._clock()
+        self._prune(now)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.value = value
+            entry.expires_at = self._deadline(now)
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = _Entry(value, self._deadline(now))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K, default: Any = _MISSING) -> Any:
+        """Remove a key and return its value
+
+        Raises:
+            KeyError: If the key is missing and no default is given
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return entry.value
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        self._entries.clear()
+
+    def keys(self) -> List[K]:
+        """Keys of unexpired entries, least recently used first"""
+        now = self._clock()
+        return [key for key, entry in self._entries.items() if entry.expires_at > now]
+
+    def items(self) -> Iterator[tuple]:
+        """Unexpired (key, value) pairs, least recently used first"""
+        now = self._clock()
+        return (
+            (key, entry.value)
+            for key, entry in list(self._entries.items())
+            if entry.expires_at > now
+        )
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[arg-type]
+        return entry is not None and entry.expires_at > self._clock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get size, hit rate, eviction and expiry counts"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,76 +1,33 @@
 """URL validation utilities for video downloads"""
 
-import re
 import logging
-import yt_dlp # type: ignore
 from typing import List, Optional
 
+from utils.extractor_matcher import extractor_matcher
+from utils.site_registry import site_registry
+
 logger = logging.getLogger("VideoArchiver")
 
 def is_video_url_pattern(url: str) -> bool:
-    """Check if URL matches common video platform patterns"""
-    video_patterns = [
-        r"youtube\.com/watch\?v=",
-        r"youtu\.be/",
-        r"vimeo\.com/",
-        r"tiktok\.com/",
-        r"twitter\.com/.*/video/",
-        r"x\.com/.*/video/",
-        r"bsky\.app/",
-        r"facebook\.com/.*/videos/",
-        r"instagram\.com/.*/(tv|reel|p)/",
-        r"twitch\.tv/.*/clip/",
-        r"streamable\.com/",
-        r"v\.redd\.it/",
-        r"clips\.twitch\.tv/",
-        r"dailymotion\.com/video/",
-        r"\.mp4$",
-        r"\.webm$",
-        r"\.mov$",
-    ]
-    return any(re.search(pattern, url, re.IGNORECASE) for pattern in video_patterns)
+    """Check if URL is a direct video link or from a site in the registry"""
+    return site_registry.is_direct(url) or site_registry.match(url) is not None
+
+def check_url_support(url: str, enabled_sites: Optional[List[str]] = None) -> bool:
+    """Check if URL is supported by an enabled yt-dlp extractor
 
-def check_url_support(url: str, ydl_opts: dict, enabled_sites: Optional[List[str]] = None) -> bool:
-    """Check if URL is supported by attempting a simulated download"""
+    Matching is done offline against yt-dlp's extractor patterns, so no
+    request is made to the site.
+    """
     if not is_video_url_pattern(url):
         return False
 
     try:
-        simulate_opts = {
-            **ydl_opts,
-            "simulate": True,
-            "quiet": True,
-            "no_warnings": True,
-            "extract_flat": True,
-            "skip_download": True,
-            "format": "best",
-        }
-
-        with yt_dlp.YoutubeDL(simulate_opts) as ydl:
-            try:
-                info = ydl.extract_info(url, download=False)
-                if info is None:
-                    return False
-
-                if enabled_sites:
-                    extractor = info.get("extractor", "").lower()
-                    if not any(
-                        site.lower() in extractor for site in enabled_sites
-                    ):
-                        logger.info(f"Site {extractor} not in enabled sites list")
-                        return False
-
-                logger.info(
-                    f"URL supported: {url} (Extractor: {info.get('extractor', 'unknown')})"
-                )
-                return True
-
-            except yt_dlp.utils.UnsupportedError:
-                return False
-            except Exception as e:
-                if "Unsupported URL" not in str(e):
-                    logger.error(f"Error checking URL {url}: {str(e)}")
-                return False
-
+        supported = extractor_matcher.is_supported(url, enabled_sites)
+        if supported:
+            logger.debug(
+                f"URL supported: {url} (Extractor: {extractor_matcher.get_extractor(url)})"
+            )
+        return supported
     except Exception as e:
-        logger.error
\ No newline at end of file
+        logger.error(f"Error checking URL support for {url}: {str(e)}")
+        return False